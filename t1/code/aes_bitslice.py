@@ -0,0 +1,234 @@
+import time
+import numpy as np
+from aes_core import (
+    chaves_para_array,
+    tabela_para_array,
+    bytes_para_estado,
+    criptografar_estado,
+    criptografar_ttable,
+    gerar_tabela_substituicao,
+    expansao_chave
+)
+
+# Motor bitsliced: os blocos são transpostos em planos de bits. O estado tem forma
+# (16 posições de byte, 8 bits, W palavras uint64), e o bit j da palavra w de um plano
+# pertence ao bloco 64 * w + j. Cada operação lógica sobre uma palavra processa 64 blocos.
+
+UNS = np.uint64(0xFFFFFFFFFFFFFFFF)
+# Palavras uint64 processadas por vez na S-Box (64 palavras = 4096 blocos), limitando a memória da rede
+PALAVRAS_POR_LOTE = 64
+# Permutações do ShiftRows sobre as 16 posições de byte (linha a linha), aplicadas aos planos
+_SHIFT_ROWS = np.array([4 * r + (c + r) % 4 for r in range(4) for c in range(4)])
+_SHIFT_ROWS_INV = np.array([4 * r + (c - r) % 4 for r in range(4) for c in range(4)])
+
+def estado_para_planos(estado):
+    """
+    Transpõe um estado (N, 4, 4) em planos de bits (16, 8, W), com W = ceil(N / 64).
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8.
+    Returns:
+        numpy.ndarray: Planos de bits (16, 8, W) uint64.
+    """
+    blocos = np.asarray(estado, dtype=np.uint8).reshape(-1, 16)
+    num_blocos = len(blocos)
+    total = -(-num_blocos // 64) * 64
+    if total != num_blocos:
+        blocos = np.concatenate([blocos, np.zeros((total - num_blocos, 16), dtype=np.uint8)])
+    # bits[n, posição, bit], com o bit 0 sendo o menos significativo
+    bits = np.unpackbits(blocos[:, :, None], axis=2, bitorder='little')
+    planos = np.packbits(bits.transpose(1, 2, 0), axis=2, bitorder='little')
+    return np.ascontiguousarray(planos).view('<u8')
+
+def planos_para_estado(planos, num_blocos):
+    """
+    Transpõe planos de bits (16, 8, W) de volta em um estado (N, 4, 4).
+    Args:
+        planos (numpy.ndarray): Planos de bits (16, 8, W) uint64.
+        num_blocos (int): Número de blocos originais (descarta o preenchimento).
+    Returns:
+        numpy.ndarray: Array (N, 4, 4) uint8.
+    """
+    bits = np.unpackbits(np.ascontiguousarray(planos, dtype='<u8').view(np.uint8), axis=2, bitorder='little')
+    blocos = np.packbits(bits.transpose(2, 0, 1), axis=2, bitorder='little').reshape(-1, 16)
+    return np.ascontiguousarray(blocos[:num_blocos]).reshape(-1, 4, 4)
+
+def _constantes_sbox(tabela_array):
+    """
+    Calcula as folhas da rede de multiplexadores da S-Box: para cada bit de saída k e cada
+    par de entradas (2i, 2i + 1), as máscaras do primeiro nível da rede.
+    Returns:
+        tuple: (base, diferenca), arrays (8, 128, 1, 1) uint64 com 0 ou todos os bits em 1.
+    """
+    bits = (tabela_array[None, :].astype(np.uint16) >> np.arange(8)[:, None]) & 1  # (8 saídas, 256 entradas)
+    par, impar = bits[:, 0::2], bits[:, 1::2]
+    base = np.where(par == 1, UNS, np.uint64(0))[:, :, None, None]
+    diferenca = np.where(par != impar, UNS, np.uint64(0))[:, :, None, None]
+    return base, diferenca
+
+def substitute_bytes_bitslice(planos, constantes):
+    """
+    SubBytes bitsliced para uma S-Box arbitrária, avaliada como uma rede de multiplexadores
+    (decomposição de Shannon): a cada nível, o bit de entrada i escolhe entre pares de sub-redes,
+    v = v0 ^ (x_i & (v0 ^ v1)). Todos os 8 bits de saída e as 16 posições são avaliados juntos.
+    Args:
+        planos (numpy.ndarray): Planos de bits (16, 8, W) uint64.
+        constantes (tuple): Folhas da rede, retornadas por `_constantes_sbox`.
+    Returns:
+        numpy.ndarray: Novos planos de bits (16, 8, W) com os bytes substituídos.
+    """
+    base, diferenca = constantes
+    resultado = np.empty_like(planos)
+    for inicio in range(0, planos.shape[2], PALAVRAS_POR_LOTE):
+        x = planos[:, :, inicio:inicio + PALAVRAS_POR_LOTE]  # (16, 8, w)
+        # Primeiro nível: as folhas são constantes, então cada multiplexador vira um AND e um XOR
+        v = base ^ (x[None, None, :, 0] & diferenca)  # (8, 128, 16, w)
+        for i in range(1, 8):
+            v0, v1 = v[:, 0::2], v[:, 1::2]
+            v = v0 ^ (x[None, None, :, i] & (v0 ^ v1))
+        resultado[:, :, inicio:inicio + PALAVRAS_POR_LOTE] = v[:, 0].transpose(1, 0, 2)
+    return resultado
+
+def shift_rows_bitslice(planos, inverso=False):
+    """ShiftRows bitsliced: uma permutação fixa das posições de byte (os planos não mudam)."""
+    return planos[_SHIFT_ROWS_INV if inverso else _SHIFT_ROWS]
+
+def _xtime(planos):
+    """
+    Multiplicação por 2 em GF(2⁸) sobre planos (..., 8, W): desloca os bits e, se o bit 7
+    estava ativo, aplica a redução pelo polinômio 0x11B (bits 0, 1, 3 e 4).
+    """
+    resultado = np.empty_like(planos)
+    alto = planos[..., 7, :]
+    resultado[..., 0, :] = alto
+    resultado[..., 1, :] = planos[..., 0, :] ^ alto
+    resultado[..., 2, :] = planos[..., 1, :]
+    resultado[..., 3, :] = planos[..., 2, :] ^ alto
+    resultado[..., 4, :] = planos[..., 3, :] ^ alto
+    resultado[..., 5, :] = planos[..., 4, :]
+    resultado[..., 6, :] = planos[..., 5, :]
+    resultado[..., 7, :] = planos[..., 6, :]
+    return resultado
+
+def mix_columns_bitslice(planos, inverso=False):
+    """
+    MixColumns bitsliced: a linha i de cada bloco recebe m0*s[i] ^ m1*s[i+1] ^ m2*s[i+2] ^ m3*s[i+3],
+    com as multiplicações feitas por cadeias de `_xtime` e XORs entre planos.
+    Args:
+        planos (numpy.ndarray): Planos de bits (16, 8, W) uint64.
+        inverso (bool, opcional): Se True, usa os coeficientes inversos (14, 11, 13, 9).
+    Returns:
+        numpy.ndarray: Novos planos de bits após o MixColumns.
+    """
+    linhas = planos.reshape(4, 4, 8, -1)  # (linha, coluna, bit, W)
+    deslocadas = [linhas[[(i + j) % 4 for i in range(4)]] for j in range(4)]
+    if not inverso:
+        # 2*a ^ 3*b ^ c ^ d = 2*(a ^ b) ^ b ^ c ^ d
+        resultado = _xtime(deslocadas[0] ^ deslocadas[1]) ^ deslocadas[1] ^ deslocadas[2] ^ deslocadas[3]
+    else:
+        # 14*a ^ 11*b ^ 13*c ^ 9*d, com 9 = 8+1, 11 = 8+2+1, 13 = 8+4+1 e 14 = 8+4+2
+        a, b, c, d = deslocadas
+        dois = _xtime(a ^ b)
+        quatro = _xtime(_xtime(a ^ c))
+        oito = _xtime(_xtime(_xtime(a ^ b ^ c ^ d)))
+        resultado = oito ^ quatro ^ dois ^ b ^ c ^ d
+    return resultado.reshape(16, 8, -1)
+
+def chaves_para_planos(chaves):
+    """
+    Converte as chaves de rodada em máscaras de planos: cada bit 1 da chave vira uma palavra
+    com todos os bits em 1, de modo que o AddRoundKey seja um XOR por plano.
+    Args:
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+    Returns:
+        numpy.ndarray: Array (num_rodadas + 1, 16, 8, 1) uint64.
+    """
+    chaves_array = chaves_para_array(chaves).reshape(-1, 16)
+    bits = (chaves_array[:, :, None] >> np.arange(8, dtype=np.uint8)) & 1
+    return np.where(bits == 1, UNS, np.uint64(0))[..., None]
+
+def criptografar_bitslice(estado, chaves, tabela, num_rodadas=10):
+    """
+    Criptografa todos os blocos de um estado (N, 4, 4) com o motor bitsliced.
+    Produz exatamente os mesmos bytes que `criptografar` e `criptografar_estado`.
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8 com os blocos em claro.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+    Returns:
+        numpy.ndarray: Novo array (N, 4, 4) uint8 com os blocos criptografados.
+    """
+    num_blocos = len(np.asarray(estado).reshape(-1, 16))
+    constantes = _constantes_sbox(tabela_para_array(tabela))
+    chaves_planos = chaves_para_planos(chaves)
+    planos = estado_para_planos(estado) ^ chaves_planos[0]
+    for j in range(1, num_rodadas):
+        planos = substitute_bytes_bitslice(planos, constantes)
+        planos = shift_rows_bitslice(planos)
+        planos = mix_columns_bitslice(planos)
+        planos ^= chaves_planos[j]
+    planos = substitute_bytes_bitslice(planos, constantes)
+    planos = shift_rows_bitslice(planos)
+    planos ^= chaves_planos[num_rodadas]
+    return planos_para_estado(planos, num_blocos)
+
+def descriptografar_bitslice(estado, chaves, tabela_inversa, num_rodadas=10):
+    """
+    Descriptografa todos os blocos de um estado (N, 4, 4) com o motor bitsliced.
+    Produz exatamente os mesmos bytes que `descriptografar` e `descriptografar_estado`.
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8 com os blocos criptografados.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela_inversa (dict | numpy.ndarray): Tabela de substituição inversa.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+    Returns:
+        numpy.ndarray: Novo array (N, 4, 4) uint8 com os blocos descriptografados.
+    """
+    num_blocos = len(np.asarray(estado).reshape(-1, 16))
+    constantes = _constantes_sbox(tabela_para_array(tabela_inversa))
+    chaves_planos = chaves_para_planos(chaves)
+    planos = estado_para_planos(estado) ^ chaves_planos[num_rodadas]
+    planos = shift_rows_bitslice(planos, inverso=True)
+    planos = substitute_bytes_bitslice(planos, constantes)
+    for j in range(num_rodadas - 1, 0, -1):
+        planos ^= chaves_planos[j]
+        planos = mix_columns_bitslice(planos, inverso=True)
+        planos = shift_rows_bitslice(planos, inverso=True)
+        planos = substitute_bytes_bitslice(planos, constantes)
+    planos ^= chaves_planos[0]
+    return planos_para_estado(planos, num_blocos)
+
+def comparar_motores(tamanhos=(64, 256, 1024, 4096, 16384), repeticoes=3):
+    """
+    Compara o motor bitsliced com os motores baseados em tabelas (vetorizado e T-table)
+    para lotes de blocos de tamanhos variados, com uma tabela e uma chave aleatórias.
+    Args:
+        tamanhos (tuple, opcional): Números de blocos por lote.
+        repeticoes (int, opcional): Repetições por medida (é usado o melhor tempo).
+    Returns:
+        list: Uma tupla (blocos, tempo_vetorizado, tempo_ttable, tempo_bitslice) por tamanho, em segundos.
+    """
+    tabela = gerar_tabela_substituicao()
+    chaves = expansao_chave(list(np.random.randint(0, 256, 16)), tabela)
+    motores = (criptografar_estado, criptografar_ttable, criptografar_bitslice)
+    resultados = []
+    for num_blocos in tamanhos:
+        estado = bytes_para_estado(np.random.bytes(16 * num_blocos))
+        tempos = []
+        for motor in motores:
+            melhor = float('inf')
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                motor(estado, chaves, tabela)
+                melhor = min(melhor, time.perf_counter() - inicio)
+            tempos.append(melhor)
+        resultados.append((num_blocos, *tempos))
+    return resultados
+
+def main():
+    print(f"{'Blocos':>8} {'Vetorizado (s)':>15} {'T-table (s)':>12} {'Bitslice (s)':>13} {'MB/s bitslice':>14}")
+    for num_blocos, vetorizado, ttable, bitslice in comparar_motores():
+        print(f"{num_blocos:>8} {vetorizado:>15.6f} {ttable:>12.6f} {bitslice:>13.6f} {16 * num_blocos / bitslice / 1e6:>14.2f}")
+
+if __name__ == "__main__":
+    main()
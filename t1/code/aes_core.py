@@ -1,5 +1,8 @@
+import time
+import threading
 import random
 import numpy as np
+from corpo_finito import MULTIPLICACAO
 
 def galois_multiply(a, b):
     """
@@ -65,21 +68,8 @@ def texto_para_blocos(texto):
     Returns:
         list: Uma lista de blocos, onde cada bloco é uma matriz numpy 4x4 de inteiros (uint8).
     """
-    # Converte o texto para bytes usando a codificação UTF-8
-    texto_bytes = texto.encode('utf-8')
-    # Calcula o número de bytes de padding necessário para atingir múltiplos de 16 bytes
-    padding_len = (16 - len(texto_bytes) % 16) % 16
-    # Adiciona padding (bytes de valor 0) ao final do texto para completar múltiplos de 16 bytes
-    texto_bytes_padded = texto_bytes + b'\x00' * padding_len
-    # Inicializa a lista para armazenar os blocos
-    blocos = []
-    # Divide o texto em blocos de 16 bytes
-    for i in range(0, len(texto_bytes_padded), 16):
-        # Cria uma matriz 4x4 para cada bloco de 16 bytes
-        bloco = np.array([list(texto_bytes_padded[j:j+4]) for j in range(i, i+16, 4)], dtype=np.uint8)
-        blocos.append(bloco)
-    # Retorna a lista de blocos
-    return blocos
+    # Codifica e agrupa o texto em um único array (N, 4, 4); cada bloco da lista é uma vista desse array
+    return list(texto_para_estado(texto))
 
 def blocos_para_texto(blocos):
     """
@@ -90,13 +80,8 @@ def blocos_para_texto(blocos):
     Returns:
         str: O texto resultante da concatenação dos blocos.
     """
-    # Concatena todos os bytes dos blocos em uma única string
-    texto = ''.join(
-        ''.join(chr(b) for b in linha) # Converte cada byte (int) de uma linha para caractere
-        for bloco in blocos            # Itera sobre cada bloco
-        for linha in bloco             # Itera sobre cada linha dentro do bloco
-    )
-    return texto
+    # Cada byte vira o caractere de mesmo código (equivalente a chr(b)), sem passar por listas
+    return np.asarray(blocos, dtype=np.uint8).tobytes().decode('latin-1')
 
 def blocos_para_lista_bytes(blocos):
     """
@@ -108,13 +93,8 @@ def blocos_para_lista_bytes(blocos):
     Returns:
         list: Uma lista linear de bytes (valores inteiros de 0 a 255).
     """
-    # Itera sobre todos os blocos, linhas e bytes, criando uma lista linear
-    return [
-        byte                 # Adiciona cada byte individualmente à lista
-        for bloco in blocos  # Itera sobre cada bloco
-        for linha in bloco   # Itera sobre cada linha dentro do bloco
-        for byte in linha    # Itera sobre cada byte dentro da linha
-    ]
+    # Achata todos os blocos de uma vez e converte os bytes em inteiros
+    return list(np.asarray(blocos, dtype=np.uint8).tobytes())
 
 def bytes_para_texto(lista_bytes):
     """
@@ -122,15 +102,17 @@ def bytes_para_texto(lista_bytes):
     Essa função transforma uma sequência de bytes em uma string, decodificando os 
     valores com a codificação UTF-8 e removendo padding adicional, como bytes nulos.
     Args:
-        lista_bytes (list): Uma lista de bytes (valores inteiros de 0 a 255) a ser convertida.
+        lista_bytes (list | bytes-like): Uma lista de bytes (valores inteiros de 0 a 255) ou qualquer
+                                         objeto com o protocolo de buffer (bytes, bytearray, memoryview, array numpy).
     Returns:
         str: A string de texto resultante da decodificação dos bytes.
     """
-    # Converte a lista de bytes em um objeto do tipo bytes
-    bytes_data = bytes(lista_bytes)
+    # Objetos com o protocolo de buffer são decodificados diretamente, sem cópia; listas são convertidas antes
+    if isinstance(lista_bytes, list):
+        lista_bytes = bytes(lista_bytes)
     # Decodifica os bytes para uma string UTF-8
     # O parâmetro `errors='ignore'` ignora valores inválidos durante a decodificação
-    texto = bytes_data.decode('utf-8', errors='ignore')
+    texto = str(memoryview(lista_bytes).cast('B'), 'utf-8', errors='ignore')
     # Remove bytes nulos ('\x00') adicionais ao final da string
     texto = texto.rstrip('\x00')
     # Retorna a string decodificada e limpa
@@ -327,7 +309,7 @@ def descriptografar(blocos, chaves, tabela_inversa, num_rodadas=10):
     # Retorna a lista de blocos descriptografados
     return blocos
 
-def descriptografar_texto(conteudo, chaves, tabela_inversa, num_rodadas=10):
+def descriptografar_texto(conteudo, chaves, tabela_inversa, num_rodadas=10, tabelas_t_inversas=None, chaves_inversas=None, executor=None):
     """
     Lê texto criptografado em formato hexadecimal, converte em blocos e realiza a descriptografia.
     Essa função decodifica texto criptografado representado como uma sequência hexadecimal,
@@ -338,26 +320,606 @@ def descriptografar_texto(conteudo, chaves, tabela_inversa, num_rodadas=10):
         chaves (list): Lista de chaves expandidas, onde cada chave é uma lista linear de 16 bytes.
         tabela_inversa (dict): Tabela de substituição inversa (S-Box inversa) para substituição de bytes.
         num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+        tabelas_t_inversas (numpy.ndarray, opcional): T-tables inversas pré-calculadas.
+        chaves_inversas (numpy.ndarray, opcional): Chaves da cifra inversa equivalente pré-calculadas.
+        executor (paralelo.ExecutorParalelo, opcional): Executor para descriptografar os blocos em vários núcleos.
     Returns:
         str: Texto original descriptografado.
     """
-    # Converte o conteúdo hexadecimal em uma lista de bytes
-    bytes_conteudo = [int(conteudo[i:i+2], 16) for i in range(0, len(conteudo), 2)]
+    # Converte o conteúdo hexadecimal diretamente em bytes
+    bytes_conteudo = bytes.fromhex(conteudo)
     print(f"Total de bytes convertidos: {len(bytes_conteudo)}")
-    blocos = []
-    for i in range(0, len(bytes_conteudo), 16):
-        # Agrupa os bytes em blocos de 16 bytes
-        bloco = bytes_conteudo[i:i+16]
-        # Preenche com zeros se o último bloco tiver menos de 16 bytes(padding)
-        if len(bloco) < 16:
-            bloco += [0] * (16 - len(bloco))
-        # Converte o bloco em uma matriz 4x4
-        bloco_array = np.array(bloco).reshape(4, 4)
-        blocos.append(bloco_array)
-    # Descriptografa os blocos utilizando a função de descriptografia AES
-    blocos_descriptografados = descriptografar(blocos, chaves, tabela_inversa, num_rodadas)
-    # Converte os blocos descriptografados em uma lista linear de bytes
-    lista_bytes = blocos_para_lista_bytes(blocos_descriptografados)
-    # Decodifica a lista de bytes de volta em texto legível
-    texto_original = bytes_para_texto(lista_bytes)
-    return texto_original
\ No newline at end of file
+    if executor is not None:
+        # Agrupa os bytes em um estado (N, 4, 4), com padding, e descriptografa no executor
+        claro = executor.descriptografar(bytes_para_estado(bytes_conteudo))
+    else:
+        # Descriptografa diretamente em um buffer pré-alocado, com o motor T-table
+        claro = bytearray(tamanho_com_padding(len(bytes_conteudo)))
+        descriptografar_em(
+            bytes_conteudo, claro, chaves, tabela_inversa, tabelas_t_inversas, chaves_inversas, num_rodadas
+        )
+    # Decodifica os bytes de volta em texto legível
+    texto_original = bytes_para_texto(claro)
+    return texto_original
+
+# ---------------------------------------------------------------------------
+# Motor vetorizado: a mensagem inteira é mantida como um único array (N, 4, 4)
+# e cada etapa da rodada é aplicada de uma só vez a todos os N blocos.
+# ---------------------------------------------------------------------------
+
+# Índices fixos do ShiftRows sobre o bloco achatado (16 bytes, linha a linha)
+_SHIFT_ROWS = np.array([4 * r + (c + r) % 4 for r in range(4) for c in range(4)])
+_SHIFT_ROWS_INV = np.array([4 * r + (c - r) % 4 for r in range(4) for c in range(4)])
+
+def tabela_para_array(tabela):
+    """
+    Converte uma tabela de substituição (dict) em um array numpy de 256 posições.
+    O array permite aplicar a substituição a todos os bytes de uma só vez por indexação.
+    Args:
+        tabela (dict | numpy.ndarray): Tabela de substituição (0-255 -> 0-255).
+    Returns:
+        numpy.ndarray: Array (uint8) de 256 posições, onde a posição i contém tabela[i].
+    """
+    if isinstance(tabela, np.ndarray):
+        return tabela.astype(np.uint8, copy=False)
+    return np.array([tabela[i] for i in range(256)], dtype=np.uint8)
+
+def chaves_para_array(chaves):
+    """
+    Converte a lista de chaves expandidas em um array (num_rodadas + 1, 4, 4).
+    Args:
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+    Returns:
+        numpy.ndarray: Array (uint8) com uma matriz 4x4 por rodada.
+    """
+    return np.asarray(chaves, dtype=np.uint8).reshape(-1, 4, 4)
+
+def bytes_para_estado(dados):
+    """
+    Converte uma sequência de bytes em um estado (N, 4, 4), com padding de zeros.
+    Args:
+        dados (bytes): Bytes a serem convertidos.
+    Returns:
+        numpy.ndarray: Array contíguo (uint8) com N blocos 4x4.
+    """
+    padding_len = (16 - len(dados) % 16) % 16
+    estado = np.zeros(len(dados) + padding_len, dtype=np.uint8)
+    estado[:len(dados)] = np.frombuffer(dados, dtype=np.uint8)
+    return estado.reshape(-1, 4, 4)
+
+def texto_para_estado(texto):
+    """
+    Equivalente vetorizado de `texto_para_blocos`: codifica o texto em UTF-8 e
+    retorna todos os blocos em um único array (N, 4, 4).
+    Args:
+        texto (str): O texto a ser convertido em blocos.
+    Returns:
+        numpy.ndarray: Array contíguo (uint8) com N blocos 4x4.
+    """
+    return bytes_para_estado(texto.encode('utf-8'))
+
+def substitute_bytes_lote(estado, tabela_array):
+    """
+    SubBytes aplicado a todos os blocos de uma vez, por busca no array de 256 posições.
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8.
+        tabela_array (numpy.ndarray): Tabela de substituição em forma de array (ver `tabela_para_array`).
+    Returns:
+        numpy.ndarray: Novo estado com os bytes substituídos.
+    """
+    return tabela_array[estado]
+
+def shift_rows_lote(estado, inverso=False):
+    """
+    ShiftRows aplicado a todos os blocos de uma vez, por indexação fixa.
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8.
+        inverso (bool, opcional): Se True, desloca as linhas para a direita.
+    Returns:
+        numpy.ndarray: Novo estado com as linhas deslocadas.
+    """
+    indices = _SHIFT_ROWS_INV if inverso else _SHIFT_ROWS
+    return estado.reshape(-1, 16)[:, indices].reshape(-1, 4, 4)
+
+def mix_columns_lote(estado, inverso=False):
+    """
+    MixColumns aplicado a todos os blocos de uma vez, com tabelas de multiplicação e XOR.
+    A linha i de cada bloco resulta de m0*s[i] ^ m1*s[i+1] ^ m2*s[i+2] ^ m3*s[i+3],
+    com os índices tomados módulo 4, exatamente como em `mix_columns`.
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8.
+        inverso (bool, opcional): Se True, executa a versão inversa (descriptografia).
+    Returns:
+        numpy.ndarray: Novo estado após o MixColumns.
+    """
+    multiplicadores = (0x0e, 0x0b, 0x0d, 0x09) if inverso else (0x02, 0x03, 0x01, 0x01)
+    resultado = np.zeros_like(estado)
+    for j, m in enumerate(multiplicadores):
+        # Linhas deslocadas em j posições: linha i recebe s[(i + j) % 4]
+        linhas = estado[:, [(i + j) % 4 for i in range(4)], :]
+        resultado ^= linhas if m == 0x01 else MULTIPLICACAO[m][linhas]
+    return resultado
+
+def add_round_key_lote(estado, chave_rodada):
+    """
+    AddRoundKey aplicado a todos os blocos de uma vez (XOR no lugar).
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8, modificado no lugar.
+        chave_rodada (numpy.ndarray): Chave da rodada (4, 4) uint8.
+    Returns:
+        numpy.ndarray: O próprio estado, após o XOR com a chave.
+    """
+    return np.bitwise_xor(estado, chave_rodada, out=estado)
+
+def criptografar_estado(estado, chaves, tabela, num_rodadas=10):
+    """
+    Criptografa todos os blocos de um estado (N, 4, 4) com o AES modificado.
+    Produz exatamente os mesmos bytes que `criptografar`, mas executa cada etapa
+    da rodada uma única vez para todos os blocos.
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8 com os blocos em claro.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+    Returns:
+        numpy.ndarray: Novo array (N, 4, 4) uint8 com os blocos criptografados.
+    """
+    tabela_array = tabela_para_array(tabela)
+    chaves_array = chaves_para_array(chaves)
+    # Cópia: o estado de entrada não é modificado
+    estado = add_round_key_lote(np.array(estado, dtype=np.uint8), chaves_array[0])
+    for j in range(1, num_rodadas):
+        estado = substitute_bytes_lote(estado, tabela_array)
+        estado = shift_rows_lote(estado)
+        estado = mix_columns_lote(estado)
+        estado = add_round_key_lote(estado, chaves_array[j])
+    estado = substitute_bytes_lote(estado, tabela_array)
+    estado = shift_rows_lote(estado)
+    estado = add_round_key_lote(estado, chaves_array[num_rodadas])
+    return estado
+
+def descriptografar_estado(estado, chaves, tabela_inversa, num_rodadas=10):
+    """
+    Descriptografa todos os blocos de um estado (N, 4, 4) com o AES modificado.
+    Equivalente vetorizado de `descriptografar`.
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8 com os blocos criptografados.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela_inversa (dict | numpy.ndarray): Tabela de substituição inversa.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+    Returns:
+        numpy.ndarray: Novo array (N, 4, 4) uint8 com os blocos descriptografados.
+    """
+    tabela_array = tabela_para_array(tabela_inversa)
+    chaves_array = chaves_para_array(chaves)
+    # Cópia: o estado de entrada não é modificado
+    estado = add_round_key_lote(np.array(estado, dtype=np.uint8), chaves_array[num_rodadas])
+    estado = shift_rows_lote(estado, inverso=True)
+    estado = substitute_bytes_lote(estado, tabela_array)
+    for j in range(num_rodadas - 1, 0, -1):
+        estado = add_round_key_lote(estado, chaves_array[j])
+        estado = mix_columns_lote(estado, inverso=True)
+        estado = shift_rows_lote(estado, inverso=True)
+        estado = substitute_bytes_lote(estado, tabela_array)
+    estado = add_round_key_lote(estado, chaves_array[0])
+    return estado
+
+
+# ---------------------------------------------------------------------------
+# Motor T-table: SubBytes, ShiftRows e MixColumns fundidos em buscas de palavras
+# de 32 bits. Cada coluna do estado é uma palavra (linha 0 no byte menos
+# significativo) e cada rodada custa quatro buscas e quatro XORs por coluna.
+# ---------------------------------------------------------------------------
+
+def _montar_tabelas_t(tabela_array, multiplicadores):
+    """
+    Monta as quatro T-tables a partir de uma S-Box e dos coeficientes do MixColumns.
+    A tabela T_r[x] contém a contribuição do byte x, vindo da linha r, para as quatro
+    linhas da coluna de saída: M[i][r] * S[x] no byte i, com M[i][r] = m[(r - i) % 4].
+    Args:
+        tabela_array (numpy.ndarray): S-Box em forma de array de 256 posições.
+        multiplicadores (tuple): Coeficientes (m0, m1, m2, m3) do MixColumns.
+    Returns:
+        numpy.ndarray: Array (4, 256) de palavras uint32.
+    """
+    tabelas = np.zeros((4, 256), dtype=np.uint32)
+    for r in range(4):
+        for i in range(4):
+            m = multiplicadores[(r - i) % 4]
+            tabelas[r] |= MULTIPLICACAO[m][tabela_array].astype(np.uint32) << np.uint32(8 * i)
+    return tabelas
+
+def gerar_tabelas_t(tabela):
+    """
+    Gera as T-tables de criptografia a partir da tabela de substituição personalizada.
+    Args:
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+    Returns:
+        numpy.ndarray: Array (4, 256) de palavras uint32.
+    """
+    return _montar_tabelas_t(tabela_para_array(tabela), (0x02, 0x03, 0x01, 0x01))
+
+def gerar_tabelas_t_inversas(tabela_inversa):
+    """
+    Gera as T-tables da cifra inversa equivalente a partir da tabela inversa.
+    Args:
+        tabela_inversa (dict | numpy.ndarray): Tabela de substituição inversa.
+    Returns:
+        numpy.ndarray: Array (4, 256) de palavras uint32.
+    """
+    return _montar_tabelas_t(tabela_para_array(tabela_inversa), (0x0e, 0x0b, 0x0d, 0x09))
+
+def gerar_chaves_inversas(chaves, num_rodadas=10):
+    """
+    Gera as chaves de rodada da cifra inversa equivalente.
+    Como o MixColumns inverso é linear, InvMixColumns(x ^ K) = InvMixColumns(x) ^ InvMixColumns(K);
+    as chaves das rodadas intermediárias recebem o MixColumns inverso, e a primeira e a última
+    permanecem inalteradas.
+    Args:
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+    Returns:
+        numpy.ndarray: Array (num_rodadas + 1, 4, 4) uint8.
+    """
+    chaves_inversas = chaves_para_array(chaves).copy()
+    chaves_inversas[1:num_rodadas] = mix_columns_lote(chaves_inversas[1:num_rodadas], inverso=True)
+    return chaves_inversas
+
+def _estado_para_colunas(estado):
+    """Converte um estado (N, 4, 4) em palavras de coluna (N, 4) uint32."""
+    estado = np.asarray(estado, dtype=np.uint8).reshape(-1, 4, 4)
+    return np.ascontiguousarray(estado.transpose(0, 2, 1)).view('<u4').reshape(-1, 4)
+
+def _colunas_para_estado(colunas, saida=None):
+    """Converte palavras de coluna (N, 4) uint32 de volta em um estado (N, 4, 4), opcionalmente em `saida`."""
+    estado = colunas.astype('<u4', copy=False).view(np.uint8).reshape(-1, 4, 4).transpose(0, 2, 1)
+    if saida is None:
+        return np.ascontiguousarray(estado)
+    np.copyto(saida, estado)
+    return saida
+
+def _chaves_para_colunas(chaves_array):
+    """Converte as chaves de rodada (R, 4, 4) em palavras de coluna (R, 4) uint32."""
+    return _estado_para_colunas(chaves_array)
+
+def _rodadas_ttable(colunas, tabelas_t, tabela_array, chaves_colunas, num_rodadas, inverso):
+    """
+    Executa as rodadas do motor T-table sobre palavras de coluna.
+    No sentido direto, a coluna c de saída usa o byte da linha r da coluna (c + r) % 4;
+    no sentido inverso, da coluna (c - r) % 4 (ShiftRows inverso).
+    """
+    sinal = -1 if inverso else 1
+    # Para cada linha r, a posição (coluna * 4 + linha) do byte de origem de cada coluna de saída
+    origem = [np.array([4 * ((c + sinal * r) % 4) + r for c in range(4)]) for r in range(4)]
+    for j in range(1, num_rodadas + 1):
+        estado_bytes = colunas.view(np.uint8).reshape(-1, 16)
+        if j < num_rodadas:
+            novas = tabelas_t[0][estado_bytes[:, origem[0]]]
+            for r in range(1, 4):
+                novas ^= tabelas_t[r][estado_bytes[:, origem[r]]]
+        else:
+            # Última rodada: apenas SubBytes e ShiftRows, sem MixColumns
+            novas = tabela_array[estado_bytes[:, origem[0]]].astype(np.uint32)
+            for r in range(1, 4):
+                novas |= tabela_array[estado_bytes[:, origem[r]]].astype(np.uint32) << np.uint32(8 * r)
+        novas ^= chaves_colunas[j]
+        # A indexação avançada devolve o resultado em ordem de coluna; restaura a ordem C
+        colunas = np.ascontiguousarray(novas, dtype='<u4')
+    return colunas
+
+def criptografar_ttable(estado, chaves, tabela, tabelas_t=None, num_rodadas=10, saida=None):
+    """
+    Criptografa todos os blocos de um estado (N, 4, 4) com o motor T-table.
+    Produz exatamente os mesmos bytes que `criptografar` e `criptografar_estado`.
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8 com os blocos em claro.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+        tabelas_t (numpy.ndarray, opcional): T-tables pré-calculadas com `gerar_tabelas_t`.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+        saida (numpy.ndarray, opcional): Array (N, 4, 4) uint8 onde o resultado é escrito (pode ser o próprio estado).
+    Returns:
+        numpy.ndarray: Array (N, 4, 4) uint8 com os blocos criptografados (`saida`, se informado).
+    """
+    tabela_array = tabela_para_array(tabela)
+    if tabelas_t is None:
+        tabelas_t = gerar_tabelas_t(tabela_array)
+    chaves_colunas = _chaves_para_colunas(chaves_para_array(chaves))
+    colunas = _estado_para_colunas(estado) ^ chaves_colunas[0]
+    colunas = _rodadas_ttable(colunas, tabelas_t, tabela_array, chaves_colunas, num_rodadas, inverso=False)
+    return _colunas_para_estado(colunas, saida)
+
+def descriptografar_ttable(estado, chaves, tabela_inversa, tabelas_t_inversas=None, chaves_inversas=None, num_rodadas=10,
+                           saida=None):
+    """
+    Descriptografa todos os blocos de um estado (N, 4, 4) com a cifra inversa equivalente
+    (InvSubBytes, InvShiftRows e InvMixColumns fundidos em T-tables).
+    Produz exatamente os mesmos bytes que `descriptografar` e `descriptografar_estado`.
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8 com os blocos criptografados.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela_inversa (dict | numpy.ndarray): Tabela de substituição inversa.
+        tabelas_t_inversas (numpy.ndarray, opcional): T-tables de `gerar_tabelas_t_inversas`.
+        chaves_inversas (numpy.ndarray, opcional): Chaves de `gerar_chaves_inversas`.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+        saida (numpy.ndarray, opcional): Array (N, 4, 4) uint8 onde o resultado é escrito (pode ser o próprio estado).
+    Returns:
+        numpy.ndarray: Array (N, 4, 4) uint8 com os blocos descriptografados (`saida`, se informado).
+    """
+    tabela_array = tabela_para_array(tabela_inversa)
+    if tabelas_t_inversas is None:
+        tabelas_t_inversas = gerar_tabelas_t_inversas(tabela_array)
+    if chaves_inversas is None:
+        chaves_inversas = gerar_chaves_inversas(chaves, num_rodadas)
+    # A cifra inversa equivalente percorre as chaves da última para a primeira
+    chaves_colunas = _chaves_para_colunas(chaves_para_array(chaves_inversas)[num_rodadas::-1])
+    colunas = _estado_para_colunas(estado) ^ chaves_colunas[0]
+    colunas = _rodadas_ttable(colunas, tabelas_t_inversas, tabela_array, chaves_colunas, num_rodadas, inverso=True)
+    return _colunas_para_estado(colunas, saida)
+
+def _rodadas_ttable_multichave(colunas, indices, tabelas_t, tabelas, chaves_colunas, num_rodadas, inverso):
+    """
+    Executa as rodadas do motor T-table com uma chave e uma tabela por bloco.
+    As T-tables (K, 4, 256), as S-Boxes (K, 256) e as chaves (K, R + 1, 4) de todas as chaves
+    ficam empilhadas; cada bloco busca as suas pelo índice em `indices` (gather), de modo que
+    blocos de chaves diferentes passam juntos pelas mesmas operações vetorizadas.
+    """
+    sinal = -1 if inverso else 1
+    origem = [np.array([4 * ((c + sinal * r) % 4) + r for c in range(4)]) for r in range(4)]
+    tabelas_t = tabelas_t.reshape(-1)
+    tabelas = tabelas.reshape(-1)
+    # Deslocamento da T-table da linha 0 e da S-Box de cada bloco nos arrays achatados
+    base_t = (indices.astype(np.intp) * 1024)[:, None]
+    base_s = (indices.astype(np.intp) * 256)[:, None]
+    for j in range(1, num_rodadas + 1):
+        estado_bytes = colunas.view(np.uint8).reshape(-1, 16)
+        if j < num_rodadas:
+            novas = tabelas_t[base_t + estado_bytes[:, origem[0]]]
+            for r in range(1, 4):
+                novas ^= tabelas_t[base_t + (256 * r) + estado_bytes[:, origem[r]]]
+        else:
+            novas = tabelas[base_s + estado_bytes[:, origem[0]]].astype(np.uint32)
+            for r in range(1, 4):
+                novas |= tabelas[base_s + estado_bytes[:, origem[r]]].astype(np.uint32) << np.uint32(8 * r)
+        novas ^= chaves_colunas[indices, j]
+        colunas = np.ascontiguousarray(novas, dtype='<u4')
+    return colunas
+
+def criptografar_ttable_multichave(estado, indices, chaves, tabelas, tabelas_t, num_rodadas=10):
+    """
+    Criptografa blocos de chaves diferentes em uma única passada do motor T-table.
+    O bloco i é criptografado com a chave e a tabela de índice `indices[i]`; o resultado de cada bloco
+    é idêntico ao de `criptografar_ttable` com a sua própria chave.
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8 com os blocos em claro.
+        indices (numpy.ndarray): Índice (N,) da chave de cada bloco.
+        chaves (numpy.ndarray): Chaves expandidas empilhadas (K, num_rodadas + 1, 4, 4) uint8.
+        tabelas (numpy.ndarray): Tabelas de substituição empilhadas (K, 256) uint8.
+        tabelas_t (numpy.ndarray): T-tables empilhadas (K, 4, 256) uint32.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+    Returns:
+        numpy.ndarray: Array (N, 4, 4) uint8 com os blocos criptografados.
+    """
+    indices = np.asarray(indices)
+    chaves_colunas = _chaves_para_colunas(chaves.reshape(-1, 4, 4)).reshape(len(chaves), -1, 4)
+    colunas = _estado_para_colunas(estado) ^ chaves_colunas[indices, 0]
+    colunas = _rodadas_ttable_multichave(colunas, indices, tabelas_t, tabelas, chaves_colunas, num_rodadas, inverso=False)
+    return _colunas_para_estado(colunas)
+
+def descriptografar_ttable_multichave(estado, indices, chaves_inversas, tabelas_inversas, tabelas_t_inversas, num_rodadas=10):
+    """
+    Descriptografa blocos de chaves diferentes em uma única passada da cifra inversa equivalente.
+    Args:
+        estado (numpy.ndarray): Array (N, 4, 4) uint8 com os blocos criptografados.
+        indices (numpy.ndarray): Índice (N,) da chave de cada bloco.
+        chaves_inversas (numpy.ndarray): Chaves de `gerar_chaves_inversas` empilhadas (K, num_rodadas + 1, 4, 4).
+        tabelas_inversas (numpy.ndarray): Tabelas inversas empilhadas (K, 256) uint8.
+        tabelas_t_inversas (numpy.ndarray): T-tables inversas empilhadas (K, 4, 256) uint32.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+    Returns:
+        numpy.ndarray: Array (N, 4, 4) uint8 com os blocos descriptografados.
+    """
+    indices = np.asarray(indices)
+    # A cifra inversa equivalente percorre as chaves da última para a primeira
+    chaves_colunas = _chaves_para_colunas(chaves_inversas[:, num_rodadas::-1].reshape(-1, 4, 4))
+    chaves_colunas = chaves_colunas.reshape(len(chaves_inversas), -1, 4)
+    colunas = _estado_para_colunas(estado) ^ chaves_colunas[indices, 0]
+    colunas = _rodadas_ttable_multichave(
+        colunas, indices, tabelas_t_inversas, tabelas_inversas, chaves_colunas, num_rodadas, inverso=True
+    )
+    return _colunas_para_estado(colunas)
+
+
+
+# ---------------------------------------------------------------------------
+# API sobre buffers: lê de qualquer objeto com o protocolo de buffer e escreve
+# diretamente no buffer de saída fornecido, sem listas, strings ou arrays por bloco.
+# ---------------------------------------------------------------------------
+
+def tamanho_com_padding(tamanho):
+    """Retorna o tamanho, em bytes, de `tamanho` bytes completados até um múltiplo de 16."""
+    return tamanho + (16 - tamanho % 16) % 16
+
+def _buffer_uint8(buffer, gravavel=False):
+    """Vista uint8 unidimensional (sem cópia) de um objeto com o protocolo de buffer."""
+    vista = np.frombuffer(memoryview(buffer).cast('B'), dtype=np.uint8)
+    if gravavel and not vista.flags.writeable:
+        raise TypeError("O buffer de saída é somente leitura (use bytearray, memoryview gravável ou array numpy).")
+    return vista
+
+def _processar_em(entrada, saida, processar):
+    """
+    Aplica `processar(estado, saida)` aos blocos completos da entrada, direto sobre vistas dos buffers,
+    e ao último bloco incompleto (completado com zeros) em separado.
+    """
+    origem = _buffer_uint8(entrada)
+    destino = _buffer_uint8(saida, gravavel=True)
+    tamanho = len(origem)
+    total = tamanho_com_padding(tamanho)
+    if len(destino) < total:
+        raise ValueError(f"O buffer de saída precisa de pelo menos {total} bytes (tem {len(destino)}).")
+    completos = tamanho - tamanho % 16
+    if completos:
+        processar(origem[:completos].reshape(-1, 4, 4), destino[:completos].reshape(-1, 4, 4))
+    if completos < tamanho:
+        ultimo = np.zeros((1, 4, 4), dtype=np.uint8)
+        ultimo.reshape(-1)[:tamanho - completos] = origem[completos:]
+        processar(ultimo, destino[completos:total].reshape(-1, 4, 4))
+    return total
+
+def criptografar_em(entrada, saida, chaves, tabela, tabelas_t=None, num_rodadas=10):
+    """
+    Criptografa os bytes de `entrada` e escreve o resultado em `saida`, no lugar.
+    Produz os mesmos bytes que `criptografar_ttable(bytes_para_estado(entrada))`: o último bloco
+    incompleto é completado com zeros. `entrada` e `saida` podem ser o mesmo buffer.
+    Args:
+        entrada (bytes-like): Dados em claro (bytes, bytearray, memoryview, mmap, array numpy...).
+        saida (bytes-like): Buffer gravável com pelo menos `tamanho_com_padding(len(entrada))` bytes.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+        tabelas_t (numpy.ndarray, opcional): T-tables pré-calculadas com `gerar_tabelas_t`.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+    Returns:
+        int: Quantidade de bytes escritos em `saida`.
+    Raises:
+        TypeError: Se `saida` for somente leitura.
+        ValueError: Se `saida` for pequeno demais.
+    """
+    tabela_array = tabela_para_array(tabela)
+    if tabelas_t is None:
+        tabelas_t = gerar_tabelas_t(tabela_array)
+    return _processar_em(entrada, saida, lambda estado, destino: criptografar_ttable(
+        estado, chaves, tabela_array, tabelas_t, num_rodadas, saida=destino
+    ))
+
+def descriptografar_em(entrada, saida, chaves, tabela_inversa, tabelas_t_inversas=None, chaves_inversas=None,
+                       num_rodadas=10):
+    """
+    Descriptografa os bytes de `entrada` e escreve o resultado em `saida`, no lugar.
+    O padding de zeros não é removido (ver `bytes_para_texto`). `entrada` e `saida` podem ser o mesmo buffer.
+    Args:
+        entrada (bytes-like): Dados criptografados.
+        saida (bytes-like): Buffer gravável com pelo menos `tamanho_com_padding(len(entrada))` bytes.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela_inversa (dict | numpy.ndarray): Tabela de substituição inversa.
+        tabelas_t_inversas (numpy.ndarray, opcional): T-tables de `gerar_tabelas_t_inversas`.
+        chaves_inversas (numpy.ndarray, opcional): Chaves de `gerar_chaves_inversas`.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+    Returns:
+        int: Quantidade de bytes escritos em `saida`.
+    Raises:
+        TypeError: Se `saida` for somente leitura.
+        ValueError: Se `saida` for pequeno demais.
+    """
+    tabela_array = tabela_para_array(tabela_inversa)
+    if tabelas_t_inversas is None:
+        tabelas_t_inversas = gerar_tabelas_t_inversas(tabela_array)
+    if chaves_inversas is None:
+        chaves_inversas = gerar_chaves_inversas(chaves, num_rodadas)
+    return _processar_em(entrada, saida, lambda estado, destino: descriptografar_ttable(
+        estado, chaves, tabela_array, tabelas_t_inversas, chaves_inversas, num_rodadas, saida=destino
+    ))
+
+# ---------------------------------------------------------------------------
+# Instrumentação por etapa. Quando ativada, as funções de cada etapa são trocadas,
+# no próprio módulo, por versões que acumulam tempo, chamadas e bytes; quando
+# desativada, as funções originais são restauradas e o custo é nulo.
+# ---------------------------------------------------------------------------
+
+# Função instrumentada -> (etapa em que é contabilizada, bytes processados a partir do primeiro argumento)
+_FUNCOES_INSTRUMENTADAS = {
+    "substitute_bytes": ("substitute_bytes", np.size),
+    "substitute_bytes_lote": ("substitute_bytes", np.size),
+    "shift_rows": ("shift_rows", np.size),
+    "shift_rows_lote": ("shift_rows", np.size),
+    "mix_columns": ("mix_columns", np.size),
+    "mix_columns_lote": ("mix_columns", np.size),
+    "add_round_key": ("add_round_key", np.size),
+    "add_round_key_lote": ("add_round_key", np.size),
+    "expansao_chave": ("expansao_chave", len),
+    # No motor T-table, SubBytes, ShiftRows, MixColumns e AddRoundKey são fundidos em uma única etapa
+    "_rodadas_ttable": ("rodadas_ttable", lambda colunas: colunas.size * 4),
+    "_rodadas_ttable_multichave": ("rodadas_ttable", lambda colunas: colunas.size * 4),
+    "_estado_para_colunas": ("conversao_colunas", np.size),
+    "_colunas_para_estado": ("conversao_colunas", lambda colunas: colunas.size * 4),
+}
+# Funções originais, guardadas enquanto a instrumentação está ativa
+_funcoes_originais = {}
+# Contadores acumulados por etapa: {"chamadas", "bytes", "segundos"}
+_estatisticas = {}
+# Os motores podem ser chamados por vários threads ao mesmo tempo (ver `motores.Motor`)
+_trava_estatisticas = threading.Lock()
+
+def _instrumentar(funcao, etapa, medir_bytes):
+    """Envolve uma função de etapa, acumulando tempo, chamadas e bytes em `_estatisticas`."""
+    def funcao_instrumentada(*args, **kwargs):
+        inicio = time.perf_counter()
+        resultado = funcao(*args, **kwargs)
+        decorrido = time.perf_counter() - inicio
+        processados = int(medir_bytes(args[0]))
+        with _trava_estatisticas:
+            contadores = _estatisticas.setdefault(etapa, {"chamadas": 0, "bytes": 0, "segundos": 0.0})
+            contadores["chamadas"] += 1
+            contadores["bytes"] += processados
+            contadores["segundos"] += decorrido
+        return resultado
+    funcao_instrumentada.__name__ = funcao.__name__
+    funcao_instrumentada.__doc__ = funcao.__doc__
+    return funcao_instrumentada
+
+def ativar_estatisticas():
+    """
+    Ativa a contagem de tempo, chamadas e bytes por etapa do AES neste processo.
+    Cobre os motores escalar, vetorizado e T-table (trabalhadores do motor paralelo não são contabilizados).
+    """
+    if _funcoes_originais:
+        return
+    modulo = globals()
+    for nome, (etapa, medir_bytes) in _FUNCOES_INSTRUMENTADAS.items():
+        _funcoes_originais[nome] = modulo[nome]
+        modulo[nome] = _instrumentar(modulo[nome], etapa, medir_bytes)
+
+def desativar_estatisticas():
+    """Restaura as funções originais; os contadores acumulados são preservados."""
+    modulo = globals()
+    for nome, funcao in _funcoes_originais.items():
+        modulo[nome] = funcao
+    _funcoes_originais.clear()
+
+def estatisticas_ativas():
+    """Retorna True se a instrumentação por etapa estiver ativa."""
+    return bool(_funcoes_originais)
+
+def zerar_estatisticas():
+    """Zera os contadores de todas as etapas."""
+    with _trava_estatisticas:
+        _estatisticas.clear()
+
+def obter_estatisticas():
+    """
+    Retorna uma cópia dos contadores acumulados.
+    Returns:
+        dict: Etapa -> {"chamadas": int, "bytes": int, "segundos": float}.
+    """
+    with _trava_estatisticas:
+        return {etapa: dict(contadores) for etapa, contadores in _estatisticas.items()}
+
+def formatar_estatisticas(estatisticas=None):
+    """
+    Formata os contadores por etapa em uma tabela de texto, da etapa mais custosa para a menos custosa.
+    Args:
+        estatisticas (dict, opcional): Contadores no formato de `obter_estatisticas`; padrão são os atuais.
+    Returns:
+        str: Tabela com chamadas, bytes, tempo total, fração do tempo e vazão de cada etapa.
+    """
+    if estatisticas is None:
+        estatisticas = obter_estatisticas()
+    total = sum(c["segundos"] for c in estatisticas.values()) or 1.0
+    linhas = [f"{'Etapa':<18} {'Chamadas':>10} {'Bytes':>14} {'Tempo (s)':>11} {'%':>6} {'MB/s':>10}"]
+    for etapa, c in sorted(estatisticas.items(), key=lambda item: -item[1]["segundos"]):
+        vazao = c["bytes"] / c["segundos"] / 1e6 if c["segundos"] else 0.0
+        linhas.append(
+            f"{etapa:<18} {c['chamadas']:>10} {c['bytes']:>14} {c['segundos']:>11.4f} "
+            f"{100 * c['segundos'] / total:>5.1f}% {vazao:>10.2f}"
+        )
+    return "\n".join(linhas)
\ No newline at end of file
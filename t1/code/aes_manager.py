@@ -4,26 +4,58 @@ import time
 import json
 from typing import Dict, Any
 from aes_core import (
-    criptografar, 
     descriptografar_texto, 
-    expansao_chave, 
-    texto_para_blocos, 
-    gerar_tabela_substituicao, 
-    gerar_tabela_inversa
+    texto_para_estado, 
+    gerar_tabela_substituicao,
+    ativar_estatisticas,
+    formatar_estatisticas
 )
+from modos import CacheKeystream, criptografar_ctr, criptografar_cbc, descriptografar_cbc
+from fluxo import (
+    TAMANHO_CHUNK,
+    ler_texto_em_chunks,
+    ler_hex_em_chunks,
+    criptografar_fluxo,
+    descriptografar_fluxo,
+    bytes_para_texto_fluxo,
+    escrever_hex,
+    verificar_ida_e_volta,
+    anexar_hex
+)
+from conteiner import MAGICO, escrever_conteiner, anexar_conteiner, LeitorConteiner
+from motores import MOTOR_PADRAO, criar_motor, nomes_motores, com_memo
+from memo import MemoBlocos
+from lote import TAREFAS_PADRAO, ler_manifesto, expandir_entradas, processar_lote, imprimir_resumo
+from contexto_chave import ContextoChave, obter_contexto, registrar_contexto
 
 class GerenciadorAES:
-    def __init__(self, arquivo_dados=None):
+    def __init__(self, arquivo_dados=None, trabalhadores=1, motor=None, memo=None):
         """
         Inicializa o gerenciador AES, configurando o arquivo de dados para armazenar as configurações de tabela de substituição e chave.
         Args:
             arquivo_dados (str, opcional): Caminho para o arquivo JSON de configurações.Se não fornecido, usa um caminho padrão.
+            trabalhadores (int, opcional): Número de processos usados na criptografia (1 = serial; 0 = todos os núcleos).
+            motor (str, opcional): Nome do motor de cifra (ver `motores.nomes_motores`); padrão é o T-table,
+                                   ou o paralelo quando mais de um processo é pedido. Motores que não
+                                   implementam o AES modificado (ex.: libcrypto) são recusados.
+            memo (int, opcional): Número máximo de blocos no memo de blocos repetidos (ver `memo.MemoBlocos`);
+                                  se omitido, o memo não é usado.
+        Raises:
+            ValueError: Se o motor for desconhecido ou não implementar o AES modificado.
         """
         # Determina o caminho do arquivo JSON que armazena as configurações
         if arquivo_dados is None:
             script_dir = os.path.dirname(os.path.abspath(__file__)) # Diretório do script atual
             arquivo_dados = os.path.join(script_dir, "../utils/key.json")
         self.arquivo_dados = arquivo_dados
+        # Cache de keystream do modo CTR, compartilhado por todas as mensagens deste gerenciador
+        self.cache_keystream = CacheKeystream()
+        # Motor de cifra: criado em carregar_configuracoes a partir do contexto de chave
+        self.trabalhadores = trabalhadores
+        self.nome_motor = motor or ("paralelo" if trabalhadores != 1 else MOTOR_PADRAO)
+        self.motor = None
+        # Memo de blocos repetidos, consultado antes do motor (esvaziado quando a chave muda)
+        self.memo_blocos = MemoBlocos(memo) if memo else None
         # Carrega configurações iniciais do arquivo ou define padrões
         self.carregar_configuracoes()
 
@@ -53,39 +85,161 @@ class GerenciadorAES:
         """
         Carrega as configurações de chave e tabela de substituição do arquivo JSON. 
         Caso o arquivo não exista ou esteja corrompido, configura padrões e salva.
+        O contexto compilado (tabelas, chaves de rodada e T-tables) é reaproveitado do cache em memória
+        ou do arquivo auxiliar `<arquivo_dados>.ctx`, validado pelo hash do conteúdo do JSON.
         """
         # Verifica se o arquivo de configurações existe; cria um vazio se necessário
         if not os.path.exists(self.arquivo_dados):
             with open(self.arquivo_dados, "w") as f:
                 json.dump({}, f)
+        with open(self.arquivo_dados, "rb") as f:
+            conteudo = f.read()
+        # Reaproveita o contexto compilado se o conteúdo do JSON não mudou
+        contexto = obter_contexto(self.arquivo_dados, conteudo)
+        if contexto is None:
+            contexto = self._compilar_configuracoes(conteudo)
+        self._aplicar_contexto(contexto)
+
+    def _compilar_configuracoes(self, conteudo):
+        """
+        Interpreta e normaliza o conteúdo do arquivo JSON e compila o contexto da chave.
+        O arquivo só é reescrito quando a versão normalizada difere do conteúdo atual.
+        Args:
+            conteudo (bytes): Conteúdo bruto do arquivo JSON.
+        Returns:
+            ContextoChave: Contexto compilado.
+        """
         try:
-            # Tenta carregar o conteúdo do arquivo
-            with open(self.arquivo_dados, "r") as f:
-                dados = json.load(f)
-        except json.JSONDecodeError:
+            # Tenta interpretar o conteúdo do arquivo
+            dados = json.loads(conteudo)
+        except (json.JSONDecodeError, UnicodeDecodeError):
             # Define configurações padrão se o arquivo estiver corrompido
             dados = {}
+        if not isinstance(dados, dict):
+            dados = {}
 
         # Tenta carregar e normalizar a tabela de substituição
         tabela_carregada = dados.get("tabela", {})
-        self.tabela = self._normalizar_tabela(tabela_carregada)
-        if not self.tabela:
+        tabela = self._normalizar_tabela(tabela_carregada)
+        if not tabela:
             # Gera uma nova tabela caso a carregada seja inválida ou vazia
-            self.tabela = gerar_tabela_substituicao()
+            tabela = gerar_tabela_substituicao()
 
         # Define a chave padrão se nenhuma chave válida estiver presente
-        self.chave = dados.get("chave", [
+        chave = dados.get("chave", [
             0x2b, 0x7e, 0x15, 0x16, 0x28, 0xae, 0xd2, 0xa6,
             0xab, 0xf7, 0x15, 0x88, 0x09, 0xcf, 0x4f, 0x3c
         ])
 
-        # Salva as configurações normalizadas no arquivo JSON
-        with open(self.arquivo_dados, "w") as f:
-            json.dump({"tabela": self.tabela, "chave": self.chave}, f, indent=2)
+        # Salva as configurações normalizadas no arquivo JSON apenas se algo mudou
+        normalizado = json.dumps({"tabela": tabela, "chave": chave}, indent=2).encode()
+        if normalizado != conteudo:
+            with open(self.arquivo_dados, "wb") as f:
+                f.write(normalizado)
+            conteudo = normalizado
+
+        # Gera tabelas auxiliares, chaves expandidas e T-tables, e guarda o resultado em cache
+        contexto = ContextoChave.compilar(tabela, chave)
+        registrar_contexto(self.arquivo_dados, conteudo, contexto)
+        return contexto
+
+    def _aplicar_contexto(self, contexto):
+        """
+        Expõe no gerenciador os dados do contexto de chave compilado.
+        Args:
+            contexto (ContextoChave): Contexto compilado.
+        """
+        self.contexto = contexto
+        self.tabela = dict(enumerate(contexto.tabela_array.tolist()))
+        self.chave = contexto.chave_array.tolist()
+        self.tabela_inversa = dict(enumerate(contexto.tabela_inversa_array.tolist()))
+        self.chaves = contexto.chaves_array.reshape(-1, 16).tolist()
+        # Versões em array usadas pelos motores vetorizado e T-table
+        self.tabela_array = contexto.tabela_array
+        self.tabela_inversa_array = contexto.tabela_inversa_array
+        self.chaves_array = contexto.chaves_array
+        # T-tables construídas a partir da tabela personalizada (e da inversa, para a cifra inversa equivalente)
+        self.tabelas_t = contexto.tabelas_t
+        self.tabelas_t_inversas = contexto.tabelas_t_inversas
+        self.chaves_inversas = contexto.chaves_inversas
+        # Impressão digital da chave e da tabela, usada para indexar a keystream do modo CTR
+        self.id_chave = contexto.id_chave
+        # Recria o motor de cifra com o novo contexto de chave
+        if self.motor is not None:
+            self.motor.fechar()
+        self.motor = criar_motor(self.nome_motor, contexto, self.trabalhadores)
+        if not self.motor.modificado:
+            # O gerenciador grava e lê arquivos do AES modificado: um motor padrão os corromperia
+            self.motor.fechar()
+            self.motor = None
+            raise ValueError(f"Motor '{self.nome_motor}' não implementa o AES modificado (use-o apenas no benchmark.py).")
+        if self.memo_blocos is not None:
+            self.motor = com_memo(self.motor, self.memo_blocos, contexto.id_chave)
+
+    def _criptografar_estado(self, estado):
+        """Criptografa um estado (N, 4, 4) com o motor de cifra selecionado."""
+        return self.motor.criptografar(estado)
+
+    def _descriptografar_estado(self, estado):
+        """Descriptografa um estado (N, 4, 4) com o motor de cifra selecionado."""
+        return self.motor.descriptografar(estado)
+
+    def criptografar_ctr(self, dados, nonce, offset=0):
+        """
+        Criptografa ou descriptografa bytes no modo CTR usando a keystream em cache.
+        Args:
+            dados (bytes): Dados a serem processados.
+            nonce (bytes): Nonce de 8 bytes.
+            offset (int, opcional): Posição (em bytes) dos dados dentro da mensagem.
+        Returns:
+            bytes: Dados processados (mesmo tamanho da entrada).
+        """
+        return criptografar_ctr(
+            dados, self.chaves_array, self.tabela_array, nonce, offset,
+            cache=self.cache_keystream, id_chave=self.id_chave, tabelas_t=self.tabelas_t
+        )
 
-        # Gera tabelas auxiliares e chaves expandidas para criptografia
-        self.tabela_inversa = gerar_tabela_inversa(self.tabela)
-        self.chaves = expansao_chave(self.chave, self.tabela)
+    descriptografar_ctr = criptografar_ctr
+
+    def criptografar_cbc(self, dados, iv):
+        """
+        Criptografa bytes no modo CBC, com padding PKCS#7 (serial: cada bloco depende do anterior).
+        Args:
+            dados (bytes): Dados a serem criptografados.
+            iv (bytes): Vetor de inicialização de 16 bytes.
+        Returns:
+            bytes: Dados criptografados.
+        """
+        return criptografar_cbc(dados, self.chaves_array, self.tabela_array, iv, self.tabelas_t)
+
+    def descriptografar_cbc(self, dados, iv):
+        """
+        Descriptografa bytes no modo CBC, com todos os blocos de uma vez no motor de cifra selecionado.
+        Só um motor do AES modificado é usado, para que a ida e a volta usem a mesma cifra de
+        `criptografar_cbc` (sempre as T-tables do AES modificado).
+        Args:
+            dados (bytes): Dados criptografados.
+            iv (bytes): Vetor de inicialização usado na criptografia.
+        Returns:
+            bytes: Dados descriptografados, sem o padding.
+        """
+        return descriptografar_cbc(
+            dados, self.chaves_array, self.tabela_inversa_array, iv,
+            self.tabelas_t_inversas, self.chaves_inversas,
+            executor=self.motor if self.motor.modificado else None
+        )
+
+    def pre_gerar_keystream(self, nonce, tamanho, offset=0):
+        """
+        Gera antecipadamente a keystream do modo CTR para um intervalo de bytes.
+        Args:
+            nonce (bytes): Nonce de 8 bytes.
+            tamanho (int): Quantidade de bytes de keystream.
+            offset (int, opcional): Posição (em bytes) do início do intervalo.
+        """
+        self.cache_keystream.pre_gerar(
+            self.id_chave, self.chaves_array, self.tabela_array, nonce, offset, tamanho, self.tabelas_t
+        )
 
     def criptografar_arquivo(self, arquivo_entrada, option):
         """
@@ -107,14 +261,11 @@ class GerenciadorAES:
             return None
         # Inicia o processo de criptografia
         inicio = time.time()
-        blocos = texto_para_blocos(texto) # Divide o texto em blocos para AES
-        blocos_criptografados = criptografar(blocos, self.chaves, self.tabela)
-        resultado_hex = "" # Armazena o resultado criptografado em hexadecimal
+        estado = texto_para_estado(texto) # Divide o texto em um único array (N, 4, 4) para AES
+        estado_criptografado = self._criptografar_estado(estado)
         try:
-            # Concatena os blocos criptografados em formato hexadecimal
-            for bloco in blocos_criptografados:
-                for linha in bloco:
-                    resultado_hex += ''.join(f"{byte:02x}" for byte in linha)
+            # Converte todos os blocos criptografados para hexadecimal de uma só vez
+            resultado_hex = estado_criptografado.tobytes().hex()
             print(f"{resultado_hex}")
             if option != '-c':
                 print(f"Tempo de criptografia: {time.time() - inicio:.6f} segundos")
@@ -145,7 +296,11 @@ class GerenciadorAES:
                 return ""
         # Realiza a descriptografia do conteúdo
         inicio = time.time()
-        texto_descriptografado = descriptografar_texto(texto, self.chaves, self.tabela_inversa)
+        texto_descriptografado = descriptografar_texto(
+            texto, self.chaves_array, self.tabela_inversa_array,
+            tabelas_t_inversas=self.tabelas_t_inversas, chaves_inversas=self.chaves_inversas,
+            executor=self.motor
+        )
         if texto_descriptografado:
             print(f"Tempo de descriptografia: {time.time() - inicio:.6f} segundos")
             print(f"Mensagem decifrada: {texto_descriptografado}")
@@ -153,14 +308,230 @@ class GerenciadorAES:
         print("Erro ao descriptografar o arquivo.")
         return None
 
-    def processar_arquivo(self, arquivo_original):
+    def criptografar_arquivo_fluxo(self, arquivo_entrada, arquivo_saida, tamanho_chunk=TAMANHO_CHUNK):
+        """
+        Criptografa um arquivo de texto em fluxo, pedaço por pedaço, escrevendo o resultado
+        hexadecimal incrementalmente. A memória usada não depende do tamanho do arquivo.
+        Args:
+            arquivo_entrada (str): Caminho do arquivo de texto a ser criptografado.
+            arquivo_saida (str): Caminho do arquivo onde o conteúdo hexadecimal será escrito.
+            tamanho_chunk (int, opcional): Quantidade de caracteres lidos por vez.
+        Returns:
+            int: Total de bytes criptografados ou None em caso de erro.
+        """
+        if not os.path.exists(arquivo_entrada):
+            print(f"Erro: O arquivo '{arquivo_entrada}' não foi encontrado.")
+            return None
+        inicio = time.time()
+        try:
+            chunks = ler_texto_em_chunks(arquivo_entrada, tamanho_chunk)
+            with open(arquivo_saida, "w") as saida:
+                total = escrever_hex(criptografar_fluxo(
+                    chunks, self.chaves_array, self.tabela_array, self.tabelas_t, executor=self.motor
+                ), saida)
+        except Exception as e:
+            print(f"Erro ao criptografar o arquivo: {e}")
+            return None
+        print(f"Tempo de criptografia: {time.time() - inicio:.6f} segundos")
+        return total
+
+    def descriptografar_arquivo_fluxo(self, arquivo_entrada, arquivo_saida, tamanho_chunk=TAMANHO_CHUNK):
+        """
+        Descriptografa um arquivo hexadecimal em fluxo, pedaço por pedaço, escrevendo o texto
+        incrementalmente. A memória usada não depende do tamanho do arquivo.
+        Args:
+            arquivo_entrada (str): Caminho do arquivo com conteúdo criptografado em hexadecimal.
+            arquivo_saida (str): Caminho do arquivo onde o texto descriptografado será escrito.
+            tamanho_chunk (int, opcional): Quantidade de caracteres lidos por vez.
+        Returns:
+            bool: True se a descriptografia foi concluída, False em caso de erro.
+        """
+        if not os.path.exists(arquivo_entrada):
+            print(f"Erro: O arquivo '{arquivo_entrada}' não foi encontrado.")
+            return False
+        inicio = time.time()
+        try:
+            chunks = descriptografar_fluxo(
+                ler_hex_em_chunks(arquivo_entrada, tamanho_chunk), self.chaves_array, self.tabela_inversa_array,
+                self.tabelas_t_inversas, self.chaves_inversas, executor=self.motor
+            )
+            with open(arquivo_saida, "w", encoding="utf-8", newline="") as saida:
+                for texto in bytes_para_texto_fluxo(chunks):
+                    saida.write(texto)
+        except Exception as e:
+            print(f"Erro ao descriptografar o arquivo: {e}")
+            return False
+        print(f"Tempo de descriptografia: {time.time() - inicio:.6f} segundos")
+        return True
+
+    def criptografar_arquivo_binario(self, arquivo_entrada, arquivo_saida, tamanho_chunk=TAMANHO_CHUNK):
+        """
+        Criptografa um arquivo de texto em fluxo e grava o resultado no contêiner binário
+        (cabeçalho, blocos cifrados e índice de chunks), com metade do tamanho da saída hexadecimal.
+        Args:
+            arquivo_entrada (str): Caminho do arquivo de texto a ser criptografado.
+            arquivo_saida (str): Caminho do contêiner binário a ser criado.
+            tamanho_chunk (int, opcional): Quantidade de caracteres lidos por vez.
+        Returns:
+            int: Tamanho do texto claro em bytes ou None em caso de erro.
+        """
+        if not os.path.exists(arquivo_entrada):
+            print(f"Erro: O arquivo '{arquivo_entrada}' não foi encontrado.")
+            return None
+        inicio = time.time()
+        try:
+            total = escrever_conteiner(
+                ler_texto_em_chunks(arquivo_entrada, tamanho_chunk), arquivo_saida,
+                self.chaves_array, self.tabela_array, self.id_chave, self.tabelas_t
+            )
+        except Exception as e:
+            print(f"Erro ao criptografar o arquivo: {e}")
+            return None
+        print(f"Tempo de criptografia: {time.time() - inicio:.6f} segundos")
+        return total
+
+    def descriptografar_arquivo_binario(self, arquivo_entrada, arquivo_saida):
+        """
+        Descriptografa um contêiner binário inteiro, chunk por chunk, gravando o texto em arquivo_saida.
+        Args:
+            arquivo_entrada (str): Caminho do contêiner binário.
+            arquivo_saida (str): Caminho do arquivo onde o texto descriptografado será escrito.
+        Returns:
+            bool: True se a descriptografia foi concluída, False em caso de erro.
+        """
+        inicio = time.time()
+        try:
+            with LeitorConteiner(arquivo_entrada, self.id_chave) as leitor:
+                chunks = leitor.chunks_claros(
+                    self.chaves_array, self.tabela_inversa_array, self.tabelas_t_inversas, self.chaves_inversas
+                )
+                with open(arquivo_saida, "w", encoding="utf-8", newline="") as saida:
+                    for texto in bytes_para_texto_fluxo(chunks):
+                        saida.write(texto)
+        except Exception as e:
+            print(f"Erro ao descriptografar o arquivo: {e}")
+            return False
+        print(f"Tempo de descriptografia: {time.time() - inicio:.6f} segundos")
+        return True
+
+    def ler_intervalo_binario(self, arquivo_entrada, inicio, tamanho):
+        """
+        Descriptografa apenas um intervalo de bytes de um contêiner binário, via mmap,
+        tocando somente os blocos que cobrem o intervalo.
+        Args:
+            arquivo_entrada (str): Caminho do contêiner binário.
+            inicio (int): Posição do primeiro byte no texto claro.
+            tamanho (int): Quantidade de bytes desejada.
+        Returns:
+            bytes: Bytes do texto claro no intervalo ou None em caso de erro.
+        """
+        try:
+            with LeitorConteiner(arquivo_entrada, self.id_chave) as leitor:
+                return leitor.ler_intervalo(
+                    inicio, tamanho, self.chaves_array, self.tabela_inversa_array,
+                    self.tabelas_t_inversas, self.chaves_inversas
+                )
+        except Exception as e:
+            print(f"Erro ao ler o contêiner: {e}")
+            return None
+
+    def anexar_arquivo(self, arquivo_criptografado, arquivo_novo):
+        """
+        Anexa o conteúdo de um arquivo de texto ao texto claro de um arquivo já criptografado
+        (hexadecimal ou contêiner binário), reprocessando apenas o último bloco e os dados novos.
+        Args:
+            arquivo_criptografado (str): Arquivo hexadecimal ou contêiner binário (o hexadecimal é criado se não existir).
+            arquivo_novo (str): Arquivo de texto com o conteúdo a ser anexado.
+        Returns:
+            bool: True se o conteúdo foi anexado, False em caso de erro.
+        """
+        inicio = time.time()
+        try:
+            with open(arquivo_novo, "r", encoding="utf-8") as f:
+                dados = f.read().encode('utf-8')
+            conteiner = False
+            if os.path.exists(arquivo_criptografado):
+                with open(arquivo_criptografado, "rb") as f:
+                    conteiner = f.read(len(MAGICO)) == MAGICO
+            if conteiner:
+                anexar_conteiner(
+                    arquivo_criptografado, dados, self.chaves_array, self.tabela_array, self.tabela_inversa_array,
+                    self.id_chave, self.tabelas_t, self.tabelas_t_inversas, self.chaves_inversas
+                )
+            else:
+                anexar_hex(
+                    arquivo_criptografado, dados, self.chaves_array, self.tabela_array, self.tabela_inversa_array,
+                    self.tabelas_t, self.tabelas_t_inversas, self.chaves_inversas
+                )
+        except Exception as e:
+            print(f"Erro ao anexar ao arquivo: {e}")
+            return False
+        print(f"Bytes anexados: {len(dados)}")
+        print(f"Tempo para anexar: {time.time() - inicio:.6f} segundos")
+        return True
+
+    def processar_lote(self, entradas, diretorio_saida, operacao="-c", tarefas=TAREFAS_PADRAO):
+        """
+        Criptografa ou descriptografa vários arquivos (diretórios, padrões glob ou arquivos) com a chave já carregada,
+        gravando cada resultado de forma atômica em diretorio_saida e exibindo o status de cada arquivo.
+        Args:
+            entradas (list): Diretórios, padrões glob ou caminhos de arquivos.
+            diretorio_saida (str): Diretório onde os resultados serão gravados.
+            operacao (str, opcional): '-c' para criptografar ou '-d' para descriptografar.
+            tarefas (int, opcional): Número de arquivos processados simultaneamente.
+        Returns:
+            list: Status de cada arquivo, ou None se o lote for inválido (por exemplo, dois arquivos
+                  com o mesmo caminho de saída); nesse caso nenhum arquivo é gravado.
+        """
+        inicio = time.perf_counter()
+        try:
+            resultados = processar_lote(self, expandir_entradas(entradas), diretorio_saida, operacao, tarefas)
+        except ValueError as e:
+            print(f"Erro no lote: {e}")
+            return None
+        imprimir_resumo(resultados, time.perf_counter() - inicio)
+        return resultados
+
+    def verificar_arquivo_fluxo(self, arquivo_original, tamanho_chunk=TAMANHO_CHUNK):
+        """
+        Verifica a ida e volta (criptografia seguida de descriptografia) de um arquivo em pipeline,
+        pedaço por pedaço, comparando digests BLAKE2b do texto original e do recuperado.
+        A memória usada não depende do tamanho do arquivo.
+        Args:
+            arquivo_original (str): Caminho do arquivo original.
+            tamanho_chunk (int, opcional): Quantidade de caracteres lidos por vez.
+        Returns:
+            dict: Resultado de `fluxo.verificar_ida_e_volta` (ok, bytes, primeiro_erro e digests);
+                  "ok" é False se o arquivo não puder ser lido.
+        """
+        inicio = time.time()
+        try:
+            resultado = verificar_ida_e_volta(ler_texto_em_chunks(arquivo_original, tamanho_chunk), self.motor, tamanho_chunk)
+        except Exception as e:
+            print(f"Erro ao verificar o arquivo: {e}")
+            return {"ok": False, "bytes": 0, "primeiro_erro": None, "digest_original": None, "digest_recuperado": None}
+        print(f"Total de bytes verificados: {resultado['bytes']}")
+        print(f"BLAKE2b original:    {resultado['digest_original']}")
+        print(f"BLAKE2b recuperado:  {resultado['digest_recuperado']}")
+        if resultado["primeiro_erro"] is not None:
+            print(f"Primeira divergência no byte {resultado['primeiro_erro']}")
+        print(f"Verificação bem-sucedida: {resultado['ok']}")
+        print(f"Tempo total de processamento: {time.time() - inicio:.6f} segundos")
+        return resultado
+
+    def processar_arquivo(self, arquivo_original, fluxo=False, tamanho_chunk=TAMANHO_CHUNK):
         """
         Executa o processo completo de criptografia e descriptografia, verificando se o conteúdo descriptografado é igual ao original.
         Args:
             arquivo_original (str): Caminho do arquivo original.
+            fluxo (bool, opcional): Se True, verifica em pipeline, pedaço por pedaço, com memória limitada
+                                    (ver `verificar_arquivo_fluxo`).
+            tamanho_chunk (int, opcional): Tamanho dos pedaços na verificação em fluxo.
         Returns:
             bool: True se o processo foi bem-sucedido, False caso contrário.
         """
+        if fluxo:
+            return self.verificar_arquivo_fluxo(arquivo_original, tamanho_chunk)["ok"]
         # Inicia o processamento
         inicio = time.time()
         # Criptografa o conteúdo do arquivo
@@ -183,37 +554,130 @@ class GerenciadorAES:
         print(f"Tempo total de processamento: {time.time() - inicio:.6f} segundos")
         return resultado
 
-def main():
-    # Verifica se os argumentos necessários foram fornecidos
-    if len(sys.argv) < 3:
-        print("""Uso: python main.py <-c|-d|-p> <caminho do arquivo>
+USO = """Uso: python main.py <-c|-d|-p> <caminho do arquivo> [arquivo de saída]
               Onde: 
                 '-c': Criptografar um arquivo
                 '-d': Descriptografar um arquivo
                 '-p': Processamento completo. Mostrando o Tempo para criptografar, Total de Bytes convertidos, Tempo para descriptografar & Tempo total de Processamento 
-              """)
+                '-v': Verificação em fluxo: criptografa e descriptografa em pipeline, com memória limitada, comparando digests BLAKE2b
+                '-cb': Criptografar um arquivo para o contêiner binário: -cb <arquivo> <contêiner>
+                '-db': Descriptografar um contêiner binário: -db <contêiner> <arquivo de saída>
+                '-r': Descriptografar apenas um intervalo de um contêiner: -r <contêiner> <início> <tamanho>
+                '-a': Anexar texto a um arquivo criptografado (hexadecimal ou contêiner): -a <criptografado> <arquivo com o texto novo>
+                [arquivo de saída]: Com '-c' ou '-d', processa o arquivo em fluxo (memória constante) e grava o resultado nele
+                -j <N>: Usa N processos na criptografia/descriptografia (0 = todos os núcleos)
+                '-lc' / '-ld': Criptografar/descriptografar em lote: -lc <diretório de saída> <diretórios, globs ou arquivos...>
+                -m <motor>: Motor de cifra (referencia, vetorizado, ttable, bitslice ou paralelo)
+                -t <N>: Com '-lc' ou '-ld', processa N arquivos simultaneamente (padrão: 4)
+                --manifesto <arquivo>: Com '-lc' ou '-ld', lê a lista de arquivos (um por linha) do manifesto
+                --memo <N>: Guarda até N blocos já processados e reaproveita os repetidos sem passar pelas rodadas
+                --stats: Ao final, exibe o tempo, as chamadas e os bytes de cada etapa do AES
+              """
+
+def _extrair_opcao(argumentos, nome, padrao=None):
+    """
+    Remove uma opção com valor (ex.: '-j 4') da lista de argumentos e retorna o seu valor.
+    Args:
+        argumentos (list): Lista de argumentos (modificada no lugar).
+        nome (str): Nome da opção.
+        padrao (str, opcional): Valor retornado se a opção não estiver presente.
+    Returns:
+        str: Valor da opção ou o padrão.
+    """
+    if nome in argumentos:
+        posicao = argumentos.index(nome)
+        if posicao + 1 < len(argumentos):
+            valor = argumentos[posicao + 1]
+            del argumentos[posicao:posicao + 2]
+            return valor
+    return padrao
+
+def main():
+    argumentos = sys.argv[1:]
+    # Número de processos (opcional)
+    try:
+        trabalhadores = int(_extrair_opcao(argumentos, "-j", "1"))
+    except ValueError:
+        print(USO)
+        sys.exit(1)
+    # Motor de cifra (opcional)
+    motor = _extrair_opcao(argumentos, "-m")
+    if motor is not None and motor not in nomes_motores():
+        print(f"Motor inválido. {USO}")
+        sys.exit(1)
+    # Opções do processamento em lote
+    manifesto = _extrair_opcao(argumentos, "--manifesto")
+    try:
+        tarefas = int(_extrair_opcao(argumentos, "-t", str(TAREFAS_PADRAO)))
+    except ValueError:
+        print(USO)
+        sys.exit(1)
+    # Memo de blocos repetidos (opcional)
+    try:
+        memo = int(_extrair_opcao(argumentos, "--memo", "0"))
+    except ValueError:
+        print(USO)
+        sys.exit(1)
+    # Instrumentação por etapa (opcional), ativada antes de carregar a chave para contabilizar a expansão
+    estatisticas = "--stats" in argumentos
+    if estatisticas:
+        argumentos.remove("--stats")
+        ativar_estatisticas()
+    # Verifica se os argumentos necessários foram fornecidos
+    if len(argumentos) < 2:
+        print(USO)
         sys.exit(1) # Sai do programa se os argumentos forem insuficientes
     # Inicializa o gerenciador AES
-    processador = GerenciadorAES()
+    try:
+        processador = GerenciadorAES(trabalhadores=trabalhadores, motor=motor, memo=memo)
+    except ValueError as erro:
+        print(erro)
+        sys.exit(1)
     # Lê o modo de operação e o caminho do arquivo dos argumentos
-    modo = sys.argv[1]
-    arquivo = sys.argv[2]
+    modo = argumentos[0]
+    arquivo = argumentos[1]
+    # Arquivo de saída opcional: ativa o processamento em fluxo
+    saida = argumentos[2] if len(argumentos) > 2 else None
     # Executa a operação correspondente com base no argumento de modo
     match modo:
+        case "-c" if saida: # Criptografa em fluxo, gravando o hexadecimal no arquivo de saída
+            processador.criptografar_arquivo_fluxo(arquivo, saida)
+        case "-d" if saida: # Descriptografa em fluxo, gravando o texto no arquivo de saída
+            processador.descriptografar_arquivo_fluxo(arquivo, saida)
+        case "-cb" if saida: # Criptografa para o contêiner binário
+            processador.criptografar_arquivo_binario(arquivo, saida)
+        case "-db" if saida: # Descriptografa um contêiner binário inteiro
+            processador.descriptografar_arquivo_binario(arquivo, saida)
+        case "-a" if saida: # Anexa texto a um arquivo criptografado, reprocessando apenas o final
+            if not processador.anexar_arquivo(arquivo, saida):
+                sys.exit(1)
+        case "-r" if len(argumentos) > 3: # Descriptografa apenas um intervalo do contêiner
+            trecho = processador.ler_intervalo_binario(arquivo, int(argumentos[2]), int(argumentos[3]))
+            if trecho is not None:
+                print(trecho.decode('utf-8', errors='replace'))
+        case "-lc" | "-ld": # Processa vários arquivos em lote, com a chave carregada uma única vez
+            entradas = argumentos[2:] + (ler_manifesto(manifesto) if manifesto else [])
+            resultados = processador.processar_lote(entradas, arquivo, operacao="-c" if modo == "-lc" else "-d", tarefas=tarefas)
+            if resultados is None or not all(status["ok"] for status in resultados):
+                sys.exit(1)
         case "-c": # Realiza criptografia do arquivo especificado
             processador.criptografar_arquivo(arquivo, option='-c')
         case "-d": # Realiza descriptografia do arquivo especificado
             processador.descriptografar_arquivo(arquivo_entrada=arquivo)
         case "-p": # Executa o processamento completo (criptografar e descriptografar)
             processador.processar_arquivo(arquivo)
+        case "-v": # Verifica a ida e volta em fluxo, pedaço por pedaço
+            if not processador.processar_arquivo(arquivo, fluxo=True):
+                sys.exit(1)
         case _: # Exibe mensagem de erro para modos inválidos
-            print("""Modo inválido. Uso: python main.py <-c|-d|-p> <caminho do arquivo>
-                  Onde: 
-                    '-c': Criptografar um arquivo
-                    '-d': Descriptografar um arquivo
-                    '-p': Processamento completo. Mostrando o Tempo para criptografar, Total de Bytes convertidos, Tempo para descriptografar & Tempo total de Processamento 
-                  """)
+            print(f"Modo inválido. {USO}")
             sys.exit(1)
+    if estatisticas:
+        print(formatar_estatisticas())
+        if processador.memo_blocos is not None:
+            memo_blocos = processador.memo_blocos
+            print(f"Memo de blocos: {memo_blocos.acertos} acertos, {memo_blocos.faltas} faltas "
+                  f"({memo_blocos.taxa_acertos():.1%})")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
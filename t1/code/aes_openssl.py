@@ -1,6 +1,141 @@
 import os
 import time
+import ctypes
+import ctypes.util
 import subprocess
+import numpy as np
+
+# Nomes usuais da libcrypto, usados quando ctypes.util.find_library não a encontra
+_NOMES_LIBCRYPTO = ("libcrypto.so.3", "libcrypto.so.1.1", "libcrypto.dylib", "libcrypto-3-x64.dll", "libcrypto-1_1-x64.dll")
+# EVP_CipherUpdate recebe o tamanho como int; entradas maiores são processadas em partes
+_MAXIMO_POR_CHAMADA = 1 << 30
+_libcrypto = None
+
+def carregar_libcrypto():
+    """
+    Carrega a libcrypto do sistema via ctypes (uma única vez por processo) e declara as assinaturas usadas.
+    Returns:
+        ctypes.CDLL: Biblioteca carregada.
+    Raises:
+        OSError: Se a libcrypto não for encontrada.
+    """
+    global _libcrypto
+    if _libcrypto is not None:
+        return _libcrypto
+    for nome in (ctypes.util.find_library("crypto"), *_NOMES_LIBCRYPTO):
+        if not nome:
+            continue
+        try:
+            biblioteca = ctypes.CDLL(nome)
+            break
+        except OSError:
+            continue
+    else:
+        raise OSError("A libcrypto (OpenSSL) não foi encontrada no sistema.")
+    ponteiro, inteiro = ctypes.c_void_p, ctypes.c_int
+    biblioteca.EVP_CIPHER_CTX_new.restype = ponteiro
+    biblioteca.EVP_CIPHER_CTX_new.argtypes = []
+    biblioteca.EVP_CIPHER_CTX_free.restype = None
+    biblioteca.EVP_CIPHER_CTX_free.argtypes = [ponteiro]
+    biblioteca.EVP_get_cipherbyname.restype = ponteiro
+    biblioteca.EVP_get_cipherbyname.argtypes = [ctypes.c_char_p]
+    biblioteca.EVP_CipherInit_ex.restype = inteiro
+    biblioteca.EVP_CipherInit_ex.argtypes = [ponteiro, ponteiro, ponteiro, ctypes.c_char_p, ctypes.c_char_p, inteiro]
+    biblioteca.EVP_CIPHER_CTX_set_padding.restype = inteiro
+    biblioteca.EVP_CIPHER_CTX_set_padding.argtypes = [ponteiro, inteiro]
+    biblioteca.EVP_CipherUpdate.restype = inteiro
+    biblioteca.EVP_CipherUpdate.argtypes = [ponteiro, ponteiro, ctypes.POINTER(inteiro), ponteiro, inteiro]
+    biblioteca.EVP_CipherFinal_ex.restype = inteiro
+    biblioteca.EVP_CipherFinal_ex.argtypes = [ponteiro, ponteiro, ctypes.POINTER(inteiro)]
+    _libcrypto = biblioteca
+    return _libcrypto
+
+class CifraLibcrypto:
+    """
+    Cifra da libcrypto executada no próprio processo, sobre buffers em memória.
+    Sem criação de processos nem arquivos intermediários, serve de referência de desempenho
+    para o AES modificado medida da mesma forma que os demais motores.
+    Cada chamada usa o seu próprio EVP_CIPHER_CTX: como o ctypes libera o GIL durante a cifra,
+    um contexto compartilhado seria corrompido por chamadas simultâneas de threads diferentes.
+    """
+
+    def __init__(self, chave, iv=None, cifra="aes-256-cbc", padding=True):
+        """
+        Args:
+            chave (bytes | str): Chave da cifra, em bytes ou em hexadecimal.
+            iv (bytes | str, opcional): Vetor de inicialização, em bytes ou em hexadecimal (ignorado no modo ECB).
+            cifra (str, opcional): Nome da cifra na libcrypto (ex.: "aes-256-cbc", "aes-128-ecb").
+            padding (bool, opcional): Se True, aplica o padding PKCS#7 (como o `openssl enc`).
+        Raises:
+            OSError: Se a libcrypto não for encontrada.
+            ValueError: Se a cifra não existir na libcrypto.
+        """
+        self._lib = carregar_libcrypto()
+        self.chave = bytes.fromhex(chave) if isinstance(chave, str) else bytes(chave)
+        self.iv = None if iv is None else bytes.fromhex(iv) if isinstance(iv, str) else bytes(iv)
+        self.padding = padding
+        self._cifra = self._lib.EVP_get_cipherbyname(cifra.encode())
+        if not self._cifra:
+            raise ValueError(f"Cifra '{cifra}' não disponível na libcrypto.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def __del__(self):
+        self.fechar()
+
+    def fechar(self):
+        """Mantido pelo contrato dos motores: os contextos da libcrypto são liberados a cada chamada."""
+
+    def _processar(self, dados, criptografar):
+        """Executa EVP_CipherInit/Update/Final sobre um buffer, em um contexto próprio, e devolve a saída em um array uint8."""
+        lib = self._lib
+        ctx = lib.EVP_CIPHER_CTX_new()
+        if not ctx:
+            raise MemoryError("Falha ao alocar o contexto da libcrypto.")
+        try:
+            if not lib.EVP_CipherInit_ex(ctx, self._cifra, None, self.chave, self.iv, int(criptografar)):
+                raise ValueError("Falha ao inicializar a cifra (verifique o tamanho da chave e do IV).")
+            lib.EVP_CIPHER_CTX_set_padding(ctx, int(self.padding))
+            entrada = np.frombuffer(dados, dtype=np.uint8)
+            # Espaço extra para o bloco de padding
+            saida = np.empty(len(entrada) + 32, dtype=np.uint8)
+            escrito = ctypes.c_int(0)
+            total = 0
+            for inicio in range(0, len(entrada), _MAXIMO_POR_CHAMADA):
+                parte = entrada[inicio:inicio + _MAXIMO_POR_CHAMADA]
+                if not lib.EVP_CipherUpdate(ctx, saida.ctypes.data + total, ctypes.byref(escrito),
+                                            parte.ctypes.data, len(parte)):
+                    raise ValueError("Falha ao processar os dados na libcrypto.")
+                total += escrito.value
+            if not lib.EVP_CipherFinal_ex(ctx, saida.ctypes.data + total, ctypes.byref(escrito)):
+                raise ValueError("Falha ao finalizar a cifra (padding ou tamanho de entrada inválido).")
+        finally:
+            lib.EVP_CIPHER_CTX_free(ctx)
+        return saida[:total + escrito.value]
+
+    def criptografar(self, dados):
+        """
+        Criptografa um buffer em memória.
+        Args:
+            dados (bytes-like): Dados em claro (bytes, bytearray, memoryview ou array numpy contíguo).
+        Returns:
+            numpy.ndarray: Array uint8 com os dados criptografados.
+        """
+        return self._processar(dados, True)
+
+    def descriptografar(self, dados):
+        """
+        Descriptografa um buffer em memória.
+        Args:
+            dados (bytes-like): Dados criptografados.
+        Returns:
+            numpy.ndarray: Array uint8 com os dados em claro.
+        """
+        return self._processar(dados, False)
 
 def processar_arquivo(input_file, output_file, chave, iv, operacao):
     """
@@ -94,6 +229,15 @@ def main():
                 print("\nVerificação:")
                 print("Descriptografia bem-sucedida:", texto_original == texto_resultante)
                 print(f"Tempo total {tempo_total:.6f} segundos")
+                # Mesma cifra executada no próprio processo, sem criação de processos nem arquivos
+                with open(input_file, 'rb') as f:
+                    dados = f.read()
+                with CifraLibcrypto(chave, iv) as cifra:
+                    inicio = time.perf_counter()
+                    recuperado = cifra.descriptografar(cifra.criptografar(dados))
+                    tempo_memoria = time.perf_counter() - inicio
+                print(f"Tempo total em memória (libcrypto via ctypes) {tempo_memoria:.6f} segundos")
+                print("Descriptografia em memória bem-sucedida:", recuperado.tobytes() == dados)
         except Exception as e:
             # Captura e exibe erros ao ler os arquivos
             print(f"Erro ao comparar arquivos: {e}")
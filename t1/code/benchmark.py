@@ -0,0 +1,243 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import tracemalloc
+import numpy as np
+from aes_core import bytes_para_estado
+from contexto_chave import ContextoChave
+from motores import criar_motor, nomes_motores
+from modos import criptografar_cbc, descriptografar_cbc
+from aes_openssl import CifraLibcrypto
+
+VERSAO_RESULTADOS = 1
+# Tamanhos padrão do corpus: de 16 bytes a 256 MiB
+TAMANHOS_PADRAO = (16, 1 << 10, 64 << 10, 1 << 20, 16 << 20, 256 << 20)
+# Motores lentos são medidos apenas até um tamanho máximo
+LIMITES_MOTOR = {"referencia": 16 << 10, "bitslice": 4 << 20, "cbc": 1 << 20}
+
+def gerar_corpus(tamanho, semente=0):
+    """
+    Gera um corpus determinístico de bytes pseudoaleatórios.
+    Args:
+        tamanho (int): Tamanho do corpus em bytes.
+        semente (int, opcional): Semente do gerador.
+    Returns:
+        bytes: Corpus gerado.
+    """
+    return np.random.default_rng(semente + tamanho).bytes(tamanho)
+
+def medir(funcao, estado, repeticoes=5, aquecimento=1):
+    """
+    Mede o tempo de uma função com aquecimento e repetições, e o pico de memória em uma execução separada.
+    Args:
+        funcao (callable): Função a ser medida, recebendo o estado.
+        estado (numpy.ndarray): Entrada (N, 4, 4).
+        repeticoes (int, opcional): Número de execuções cronometradas.
+        aquecimento (int, opcional): Execuções descartadas antes da medição.
+    Returns:
+        dict: Tempos (em segundos) e pico de memória (em bytes).
+    """
+    for _ in range(aquecimento):
+        funcao(estado)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(estado)
+        tempos.append(time.perf_counter() - inicio)
+    # O rastreamento de memória tem custo próprio, por isso roda fora da cronometragem
+    tracemalloc.start()
+    try:
+        funcao(estado)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "minimo_s": min(tempos),
+        "mediana_s": statistics.median(tempos),
+        "media_s": statistics.fmean(tempos),
+        "pico_memoria_bytes": pico,
+    }
+
+def _registrar(resultados, medida, nome, operacao, tamanho, repeticoes):
+    """Completa uma medida com a identificação e a vazão, guarda-a e exibe um resumo."""
+    medida.update({
+        "motor": nome,
+        "operacao": operacao,
+        "tamanho": tamanho,
+        "repeticoes": repeticoes,
+        "mb_s": tamanho / medida["mediana_s"] / 1e6,
+    })
+    resultados.append(medida)
+    print(f"{nome:>13} {operacao:>15} {tamanho:>12} B {medida['mb_s']:>10.2f} MB/s "
+          f"{medida['pico_memoria_bytes'] / 1e6:>9.2f} MB pico", file=sys.stderr)
+
+def _executar_cbc(resultados, contexto, tamanhos, repeticoes, aquecimento, trabalhadores, semente):
+    """
+    Mede o modo CBC do AES modificado ao lado do AES-128-CBC da libcrypto (mesmo tamanho de chave,
+    mesmo número de rodadas, padding PKCS#7), ambos em memória.
+    A criptografia CBC é serial; a descriptografia usa o motor T-table (ou o paralelo, com -j).
+    """
+    iv = bytes(range(16))
+    motor = criar_motor("paralelo" if trabalhadores and trabalhadores != 1 else "ttable", contexto, trabalhadores)
+    try:
+        cifra = CifraLibcrypto(contexto.chave_array.tobytes(), iv, cifra="aes-128-cbc")
+    except OSError as e:
+        print(f"Motor 'libcrypto-cbc' indisponível: {e}", file=sys.stderr)
+        cifra = None
+    with motor:
+        for tamanho in tamanhos:
+            dados = gerar_corpus(tamanho, semente)
+            if tamanho <= LIMITES_MOTOR["cbc"]:
+                cifrado = criptografar_cbc(dados, contexto.chaves_array, contexto.tabela_array, iv, contexto.tabelas_t)
+                for operacao, funcao, entrada in (
+                    ("criptografar", lambda d: criptografar_cbc(
+                        d, contexto.chaves_array, contexto.tabela_array, iv, contexto.tabelas_t), dados),
+                    ("descriptografar", lambda d: descriptografar_cbc(
+                        d, contexto.chaves_array, contexto.tabela_inversa_array, iv,
+                        contexto.tabelas_t_inversas, contexto.chaves_inversas, executor=motor), cifrado),
+                ):
+                    _registrar(resultados, medir(funcao, entrada, repeticoes, aquecimento), "cbc", operacao, tamanho, repeticoes)
+            if cifra is not None:
+                cifrado = cifra.criptografar(dados).tobytes()
+                for operacao, funcao, entrada in (
+                    ("criptografar", cifra.criptografar, dados),
+                    ("descriptografar", cifra.descriptografar, cifrado),
+                ):
+                    _registrar(resultados, medir(funcao, entrada, repeticoes, aquecimento), "libcrypto-cbc", operacao,
+                               tamanho, repeticoes)
+    if cifra is not None:
+        cifra.fechar()
+
+def executar(tamanhos=TAMANHOS_PADRAO, motores=None, repeticoes=5, aquecimento=1, trabalhadores=None, semente=0,
+             cbc=False):
+    """
+    Executa o benchmark para cada combinação de motor, operação e tamanho do corpus.
+    Args:
+        tamanhos (iterable, opcional): Tamanhos do corpus em bytes.
+        motores (iterable, opcional): Nomes dos motores; padrão é todos.
+        repeticoes (int, opcional): Execuções cronometradas por medida.
+        aquecimento (int, opcional): Execuções de aquecimento por medida.
+        trabalhadores (int, opcional): Processos do motor paralelo.
+        semente (int, opcional): Semente do corpus, da tabela e da chave.
+        cbc (bool, opcional): Mede também o modo CBC do AES modificado e o AES-128-CBC da libcrypto.
+    Returns:
+        dict: Resultados prontos para serem gravados em JSON.
+    """
+    rng = np.random.default_rng(semente)
+    valores = rng.permutation(256).tolist()
+    tabela = {i: valores[i] for i in range(256)}
+    chave = rng.integers(0, 256, 16).tolist()
+    contexto = ContextoChave.compilar(tabela, chave)
+    resultados = []
+    for nome in (list(motores) if motores else nomes_motores()):
+        # Todos os motores vêm do mesmo registro e são medidos da mesma forma, em memória
+        try:
+            motor = criar_motor(nome, contexto, trabalhadores)
+        except OSError as e:
+            print(f"Motor '{nome}' indisponível: {e}", file=sys.stderr)
+            continue
+        with motor:
+            for tamanho in tamanhos:
+                if tamanho > LIMITES_MOTOR.get(nome, float('inf')):
+                    continue
+                estado = bytes_para_estado(gerar_corpus(tamanho, semente))
+                cifrado = motor.criptografar(estado)
+                for operacao, funcao, entrada in (
+                    ("criptografar", motor.criptografar, estado),
+                    ("descriptografar", motor.descriptografar, cifrado),
+                ):
+                    _registrar(resultados, medir(funcao, entrada, repeticoes, aquecimento), nome, operacao, tamanho, repeticoes)
+    if cbc:
+        _executar_cbc(resultados, contexto, tamanhos, repeticoes, aquecimento, trabalhadores, semente)
+    return {
+        "versao": VERSAO_RESULTADOS,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+
+def comparar(resultados, base, tolerancia=0.10):
+    """
+    Compara resultados com uma execução de referência salva.
+    Uma medida é considerada regressão quando a vazão cai mais que `tolerancia` em relação à base.
+    Args:
+        resultados (dict): Resultados atuais (formato de `executar`).
+        base (dict): Resultados de referência.
+        tolerancia (float, opcional): Queda relativa de vazão tolerada (padrão: 10%).
+    Returns:
+        list: Uma entrada por medida em comum, com a variação relativa e se é regressão.
+    """
+    referencia = {(r["motor"], r["operacao"], r["tamanho"]): r for r in base.get("resultados", [])}
+    comparacoes = []
+    for atual in resultados["resultados"]:
+        chave = (atual["motor"], atual["operacao"], atual["tamanho"])
+        anterior = referencia.get(chave)
+        if anterior is None:
+            continue
+        variacao = atual["mb_s"] / anterior["mb_s"] - 1
+        comparacoes.append({
+            "motor": atual["motor"],
+            "operacao": atual["operacao"],
+            "tamanho": atual["tamanho"],
+            "mb_s_base": anterior["mb_s"],
+            "mb_s": atual["mb_s"],
+            "variacao": variacao,
+            "regressao": variacao < -tolerancia,
+        })
+    return comparacoes
+
+def _tamanho(texto):
+    """Converte tamanhos como '512', '64K', '16M' ou '1G' em bytes."""
+    unidades = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    texto = texto.strip().upper().rstrip("B")
+    if texto and texto[-1] in unidades:
+        return int(float(texto[:-1]) * unidades[texto[-1]])
+    return int(texto)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do AES modificado por motor e tamanho de entrada.")
+    parser.add_argument("--tamanhos", default=",".join(str(t) for t in TAMANHOS_PADRAO),
+                        help="Tamanhos do corpus separados por vírgula (ex.: 16,1K,1M,256M).")
+    parser.add_argument("--motores", default=None,
+                        help=f"Motores separados por vírgula ({', '.join(nomes_motores())}).")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--aquecimento", type=int, default=1)
+    parser.add_argument("-j", "--trabalhadores", type=int, default=None)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON onde os resultados serão gravados.")
+    parser.add_argument("--base", default=None, help="Arquivo JSON de referência para detectar regressões.")
+    parser.add_argument("--tolerancia", type=float, default=0.10)
+    parser.add_argument("--cbc", action="store_true", help="Compara também o modo CBC com o AES-128-CBC da libcrypto.")
+    args = parser.parse_args()
+
+    resultados = executar(
+        tamanhos=[_tamanho(t) for t in args.tamanhos.split(",")],
+        motores=args.motores.split(",") if args.motores else None,
+        repeticoes=args.repeticoes,
+        aquecimento=args.aquecimento,
+        trabalhadores=args.trabalhadores,
+        cbc=args.cbc,
+    )
+    if args.saida:
+        with open(args.saida, "w") as f:
+            json.dump(resultados, f, indent=2)
+    else:
+        print(json.dumps(resultados, indent=2))
+
+    if args.base:
+        with open(args.base, "r") as f:
+            base = json.load(f)
+        comparacoes = comparar(resultados, base, args.tolerancia)
+        regressoes = [c for c in comparacoes if c["regressao"]]
+        for c in comparacoes:
+            marca = "REGRESSÃO" if c["regressao"] else "ok"
+            print(f"{c['motor']:>13} {c['operacao']:>15} {c['tamanho']:>12} B "
+                  f"{c['mb_s_base']:>10.2f} -> {c['mb_s']:>10.2f} MB/s ({c['variacao']:+.1%}) {marca}", file=sys.stderr)
+        if regressoes:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import mmap
+import struct
+import zlib
+from aes_core import bytes_para_estado, criptografar_ttable, descriptografar_ttable
+from fluxo import reagrupar
+
+# Formato do contêiner binário (todos os inteiros em little-endian):
+#   cabeçalho | blocos criptografados (16 bytes cada) | índice de chunks
+# O cabeçalho guarda o número de rodadas, o padding do último bloco, a impressão
+# digital da chave/tabela e a posição do índice; cada entrada do índice guarda o
+# deslocamento do chunk no arquivo, seu número de blocos e o CRC32 do texto cifrado.
+MAGICO = b'AESM'
+VERSAO = 1
+CABECALHO = struct.Struct('<4sBBBx16sQIIQ')
+ENTRADA_INDICE = struct.Struct('<QII')
+# Número padrão de blocos de 16 bytes por chunk do índice (4096 blocos = 64 KiB)
+BLOCOS_POR_CHUNK = 4096
+
+def escrever_conteiner(chunks, arquivo_saida, chaves, tabela, id_chave, tabelas_t=None,
+                       num_rodadas=10, blocos_por_chunk=BLOCOS_POR_CHUNK):
+    """
+    Criptografa uma sequência de pedaços de bytes e grava o resultado no contêiner binário.
+    O texto cifrado é idêntico ao da saída hexadecimal, apenas sem a conversão para texto.
+    Args:
+        chunks (iterable): Pedaços de bytes do texto claro.
+        arquivo_saida (str): Caminho do contêiner a ser criado.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+        id_chave (bytes): Impressão digital de 16 bytes da chave e da tabela.
+        tabelas_t (numpy.ndarray, opcional): T-tables pré-calculadas.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+        blocos_por_chunk (int, opcional): Blocos de 16 bytes por entrada do índice.
+    Returns:
+        int: Tamanho do texto claro, em bytes.
+    """
+    indice = []
+    tamanho_texto = 0
+    with open(arquivo_saida, "wb") as f:
+        # Reserva o espaço do cabeçalho; ele é reescrito ao final, quando o índice é conhecido
+        f.write(b'\x00' * CABECALHO.size)
+        for chunk in reagrupar(chunks, blocos_por_chunk * 16):
+            tamanho_texto += len(chunk)
+            estado = bytes_para_estado(chunk)
+            cifrado = criptografar_ttable(estado, chaves, tabela, tabelas_t, num_rodadas).tobytes()
+            indice.append((f.tell(), len(estado), zlib.crc32(cifrado)))
+            f.write(cifrado)
+        posicao_indice = f.tell()
+        for entrada in indice:
+            f.write(ENTRADA_INDICE.pack(*entrada))
+        padding_len = (16 - tamanho_texto % 16) % 16
+        f.seek(0)
+        f.write(CABECALHO.pack(
+            MAGICO, VERSAO, num_rodadas, padding_len, id_chave,
+            tamanho_texto, blocos_por_chunk, len(indice), posicao_indice
+        ))
+    return tamanho_texto
+
+class LeitorConteiner:
+    """
+    Leitor de acesso aleatório do contêiner binário, via mmap.
+    Como cada bloco é criptografado de forma independente, um intervalo de bytes do texto
+    claro é recuperado descriptografando apenas os blocos que o cobrem.
+    """
+
+    def __init__(self, caminho, id_chave=None):
+        """
+        Args:
+            caminho (str): Caminho do contêiner.
+            id_chave (bytes, opcional): Impressão digital esperada; se informada, é validada contra o cabeçalho.
+        Raises:
+            ValueError: Se o arquivo não for um contêiner válido ou a chave não corresponder.
+        """
+        self._arquivo = open(caminho, "rb")
+        try:
+            self._mmap = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._arquivo.close()
+            raise ValueError(f"'{caminho}' não é um contêiner AES válido.")
+        if len(self._mmap) < CABECALHO.size:
+            self.fechar()
+            raise ValueError(f"'{caminho}' não é um contêiner AES válido.")
+        (magico, versao, self.num_rodadas, self.padding_len, self.id_chave,
+         self.tamanho_texto, self.blocos_por_chunk, num_chunks, posicao_indice) = CABECALHO.unpack_from(self._mmap, 0)
+        if magico != MAGICO or versao != VERSAO:
+            self.fechar()
+            raise ValueError(f"'{caminho}' não é um contêiner AES válido.")
+        if id_chave is not None and id_chave != self.id_chave:
+            self.fechar()
+            raise ValueError("A chave carregada não corresponde à chave usada no contêiner.")
+        self.indice = [
+            ENTRADA_INDICE.unpack_from(self._mmap, posicao_indice + i * ENTRADA_INDICE.size)
+            for i in range(num_chunks)
+        ]
+        self.num_blocos = (self.tamanho_texto + 15) // 16
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def fechar(self):
+        """Libera o mmap e fecha o arquivo."""
+        self._mmap.close()
+        self._arquivo.close()
+
+    def _posicao_bloco(self, bloco):
+        """Retorna a posição, no arquivo, do bloco de índice `bloco`."""
+        chunk, deslocamento = divmod(bloco, self.blocos_por_chunk)
+        return self.indice[chunk][0] + deslocamento * 16
+
+    def verificar_chunks(self, inicio=0, tamanho=None):
+        """
+        Confere o CRC32 dos chunks que cobrem um intervalo do texto claro.
+        Args:
+            inicio (int, opcional): Posição do primeiro byte do intervalo.
+            tamanho (int, opcional): Tamanho do intervalo; se omitido, vai até o final.
+        Returns:
+            list: Índices dos chunks cujo CRC32 não confere (lista vazia se tudo estiver íntegro).
+        """
+        if tamanho is None:
+            tamanho = self.tamanho_texto - inicio
+        if tamanho <= 0:
+            return []
+        primeiro = (inicio // 16) // self.blocos_por_chunk
+        ultimo = ((inicio + tamanho - 1) // 16) // self.blocos_por_chunk
+        return [
+            i for i in range(primeiro, min(ultimo + 1, len(self.indice)))
+            if zlib.crc32(self._mmap[self.indice[i][0]:self.indice[i][0] + self.indice[i][1] * 16]) != self.indice[i][2]
+        ]
+
+    def blocos_cifrados(self, primeiro_bloco, num_blocos):
+        """
+        Retorna os bytes cifrados de um intervalo de blocos, lendo apenas esse trecho do mmap.
+        Args:
+            primeiro_bloco (int): Índice do primeiro bloco.
+            num_blocos (int): Quantidade de blocos.
+        Returns:
+            bytes: Blocos cifrados concatenados.
+        """
+        # Os chunks são contíguos no arquivo, então o intervalo é uma única fatia
+        inicio = self._posicao_bloco(primeiro_bloco)
+        return self._mmap[inicio:inicio + num_blocos * 16]
+
+    def ler_intervalo(self, inicio, tamanho, chaves, tabela_inversa, tabelas_t_inversas=None, chaves_inversas=None):
+        """
+        Descriptografa apenas os blocos que cobrem o intervalo [inicio, inicio + tamanho) do texto claro.
+        Args:
+            inicio (int): Posição do primeiro byte no texto claro.
+            tamanho (int): Quantidade de bytes desejada.
+            chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+            tabela_inversa (dict | numpy.ndarray): Tabela de substituição inversa.
+            tabelas_t_inversas (numpy.ndarray, opcional): T-tables inversas pré-calculadas.
+            chaves_inversas (numpy.ndarray, opcional): Chaves da cifra inversa equivalente.
+        Returns:
+            bytes: Bytes do texto claro no intervalo (truncado ao final do texto).
+        """
+        inicio = max(0, inicio)
+        fim = min(inicio + tamanho, self.tamanho_texto)
+        if fim <= inicio:
+            return b''
+        primeiro_bloco = inicio // 16
+        num_blocos = (fim + 15) // 16 - primeiro_bloco
+        estado = bytes_para_estado(self.blocos_cifrados(primeiro_bloco, num_blocos))
+        claro = descriptografar_ttable(
+            estado, chaves, tabela_inversa, tabelas_t_inversas, chaves_inversas, self.num_rodadas
+        ).tobytes()
+        deslocamento = inicio - primeiro_bloco * 16
+        return claro[deslocamento:deslocamento + (fim - inicio)]
+
+    def chunks_claros(self, chaves, tabela_inversa, tabelas_t_inversas=None, chaves_inversas=None):
+        """
+        Descriptografa o contêiner inteiro, chunk por chunk.
+        Yields:
+            bytes: Pedaços do texto claro, sem o padding do último bloco.
+        """
+        for inicio in range(0, self.tamanho_texto, self.blocos_por_chunk * 16):
+            yield self.ler_intervalo(
+                inicio, self.blocos_por_chunk * 16, chaves, tabela_inversa, tabelas_t_inversas, chaves_inversas
+            )
+
+def anexar_conteiner(caminho, dados, chaves, tabela, tabela_inversa, id_chave=None, tabelas_t=None,
+                     tabelas_t_inversas=None, chaves_inversas=None):
+    """
+    Anexa bytes ao texto claro de um contêiner binário, no lugar, sem reprocessar os blocos anteriores.
+    Apenas o último bloco (se tiver padding) é descriptografado e recriptografado junto com os novos
+    bytes; o CRC32 é recalculado somente para os chunks alterados, e o índice e o cabeçalho são reescritos.
+    Args:
+        caminho (str): Caminho do contêiner.
+        dados (bytes): Bytes a serem anexados ao texto claro.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+        tabela_inversa (dict | numpy.ndarray): Tabela de substituição inversa.
+        id_chave (bytes, opcional): Impressão digital esperada; se informada, é validada contra o cabeçalho.
+        tabelas_t (numpy.ndarray, opcional): T-tables pré-calculadas.
+        tabelas_t_inversas (numpy.ndarray, opcional): T-tables inversas pré-calculadas.
+        chaves_inversas (numpy.ndarray, opcional): Chaves da cifra inversa equivalente.
+    Returns:
+        int: Novo tamanho do texto claro, em bytes.
+    Raises:
+        ValueError: Se o arquivo não for um contêiner válido ou a chave não corresponder.
+    """
+    with open(caminho, "r+b") as f:
+        cabecalho = f.read(CABECALHO.size)
+        if len(cabecalho) < CABECALHO.size:
+            raise ValueError(f"'{caminho}' não é um contêiner AES válido.")
+        (magico, versao, num_rodadas, _, id_gravado,
+         tamanho_texto, blocos_por_chunk, num_chunks, posicao_indice) = CABECALHO.unpack(cabecalho)
+        if magico != MAGICO or versao != VERSAO:
+            raise ValueError(f"'{caminho}' não é um contêiner AES válido.")
+        if id_chave is not None and id_chave != id_gravado:
+            raise ValueError("A chave carregada não corresponde à chave usada no contêiner.")
+        if not dados:
+            return tamanho_texto
+        # Os chunks são contíguos: o bloco i fica logo após o cabeçalho, na posição i * 16
+        primeiro_bloco, resto = divmod(tamanho_texto, 16)
+        final = b''
+        if resto:
+            f.seek(CABECALHO.size + primeiro_bloco * 16)
+            final = descriptografar_ttable(
+                bytes_para_estado(f.read(16)), chaves, tabela_inversa, tabelas_t_inversas, chaves_inversas, num_rodadas
+            ).tobytes()[:resto]
+        # Mantém as entradas dos chunks não alterados (lidas antes que os novos blocos sobrescrevam o índice)
+        f.seek(posicao_indice)
+        primeiro_chunk = primeiro_bloco // blocos_por_chunk
+        indice = [ENTRADA_INDICE.unpack(f.read(ENTRADA_INDICE.size)) for _ in range(min(num_chunks, primeiro_chunk))]
+        cifrado = criptografar_ttable(bytes_para_estado(final + dados), chaves, tabela, tabelas_t, num_rodadas).tobytes()
+        f.seek(CABECALHO.size + primeiro_bloco * 16)
+        f.write(cifrado)
+        tamanho_texto += len(dados)
+        num_blocos = (tamanho_texto + 15) // 16
+        # Recalcula as entradas dos chunks alterados ou novos
+        for chunk in range(primeiro_chunk, (num_blocos + blocos_por_chunk - 1) // blocos_por_chunk):
+            blocos = min(blocos_por_chunk, num_blocos - chunk * blocos_por_chunk)
+            posicao = CABECALHO.size + chunk * blocos_por_chunk * 16
+            f.seek(posicao)
+            indice.append((posicao, blocos, zlib.crc32(f.read(blocos * 16))))
+        posicao_indice = CABECALHO.size + num_blocos * 16
+        f.seek(posicao_indice)
+        for entrada in indice:
+            f.write(ENTRADA_INDICE.pack(*entrada))
+        f.truncate()
+        f.seek(0)
+        f.write(CABECALHO.pack(
+            MAGICO, VERSAO, num_rodadas, (16 - tamanho_texto % 16) % 16, id_gravado,
+            tamanho_texto, blocos_por_chunk, len(indice), posicao_indice
+        ))
+    return tamanho_texto
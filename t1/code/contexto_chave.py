@@ -0,0 +1,182 @@
+import os
+import mmap
+import struct
+import hashlib
+from collections import OrderedDict
+import numpy as np
+import aes_core
+from aes_core import (
+    gerar_tabela_inversa,
+    tabela_para_array,
+    chaves_para_array,
+    gerar_tabelas_t,
+    gerar_tabelas_t_inversas,
+    gerar_chaves_inversas
+)
+
+# Arquivo auxiliar (sidecar) com o contexto compilado, ao lado do key.json
+EXTENSAO_SIDECAR = ".ctx"
+MAGICO = b'AESK'
+VERSAO = 1
+# Cabeçalho: mágico, versão, número de rodadas e o hash do conteúdo do key.json que originou o contexto
+CABECALHO = struct.Struct('<4sBB2x32s')
+# Número máximo de contextos mantidos em memória no mesmo processo
+MAX_CONTEXTOS = 16
+
+def hash_conteudo(conteudo):
+    """
+    Calcula o hash (BLAKE2b, 32 bytes) do conteúdo bruto do key.json.
+    Args:
+        conteudo (bytes): Conteúdo do arquivo.
+    Returns:
+        bytes: Hash de 32 bytes.
+    """
+    return hashlib.blake2b(conteudo, digest_size=32).digest()
+
+class ContextoChave:
+    """
+    Contexto de chave compilado: tudo o que o AES modificado deriva do key.json
+    (tabela e tabela inversa em arrays, chaves de rodada, T-tables e chaves da cifra inversa).
+    """
+
+    # Ordem, forma e tipo dos arrays gravados no sidecar
+    CAMPOS = (
+        ("tabela_array", (256,), np.uint8),
+        ("tabela_inversa_array", (256,), np.uint8),
+        ("chave_array", (16,), np.uint8),
+        ("chaves_array", None, np.uint8),
+        ("chaves_inversas", None, np.uint8),
+        ("tabelas_t", (4, 256), '<u4'),
+        ("tabelas_t_inversas", (4, 256), '<u4'),
+    )
+
+    def __init__(self, num_rodadas=10, **arrays):
+        self.num_rodadas = num_rodadas
+        for nome, _, _ in self.CAMPOS:
+            setattr(self, nome, arrays[nome])
+        # Impressão digital da chave e da tabela (indexa a keystream do modo CTR e o contêiner binário)
+        self.id_chave = hashlib.blake2b(self.chave_array.tobytes() + self.tabela_array.tobytes(), digest_size=16).digest()
+
+    @classmethod
+    def compilar(cls, tabela, chave, num_rodadas=10):
+        """
+        Compila o contexto a partir da tabela de substituição e da chave.
+        Args:
+            tabela (dict): Tabela de substituição normalizada.
+            chave (list): Chave de 16 bytes.
+            num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+        Returns:
+            ContextoChave: Contexto compilado.
+        """
+        tabela_array = tabela_para_array(tabela)
+        tabela_inversa_array = tabela_para_array(gerar_tabela_inversa(tabela))
+        # Pelo módulo, para que a expansão seja contabilizada quando a instrumentação estiver ativa
+        chaves_array = chaves_para_array(aes_core.expansao_chave(list(chave), tabela, num_rodadas))
+        return cls(
+            num_rodadas,
+            tabela_array=tabela_array,
+            tabela_inversa_array=tabela_inversa_array,
+            chave_array=np.array(chave, dtype=np.uint8),
+            chaves_array=chaves_array,
+            chaves_inversas=gerar_chaves_inversas(chaves_array, num_rodadas),
+            tabelas_t=gerar_tabelas_t(tabela_array),
+            tabelas_t_inversas=gerar_tabelas_t_inversas(tabela_inversa_array),
+        )
+
+    def salvar(self, caminho, hash_origem):
+        """
+        Grava o contexto em um arquivo binário compacto, de forma atômica.
+        Args:
+            caminho (str): Caminho do sidecar.
+            hash_origem (bytes): Hash do conteúdo do key.json que originou o contexto.
+        """
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(CABECALHO.pack(MAGICO, VERSAO, self.num_rodadas, hash_origem))
+            for nome, forma, tipo in self.CAMPOS:
+                f.write(np.ascontiguousarray(getattr(self, nome), dtype=tipo).tobytes())
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def abrir(cls, caminho, hash_origem):
+        """
+        Carrega um contexto do sidecar via mmap, sem copiar os arrays.
+        Args:
+            caminho (str): Caminho do sidecar.
+            hash_origem (bytes): Hash esperado do conteúdo do key.json.
+        Returns:
+            ContextoChave: O contexto, ou None se o sidecar não existir, estiver corrompido
+                           ou tiver sido gerado a partir de outro conteúdo.
+        """
+        try:
+            with open(caminho, "rb") as f:
+                dados = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(dados) < CABECALHO.size:
+            return None
+        magico, versao, num_rodadas, hash_gravado = CABECALHO.unpack_from(dados, 0)
+        if magico != MAGICO or versao != VERSAO or hash_gravado != hash_origem:
+            return None
+        arrays = {}
+        posicao = CABECALHO.size
+        for nome, forma, tipo in cls.CAMPOS:
+            forma = forma if forma is not None else (num_rodadas + 1, 4, 4)
+            quantidade = int(np.prod(forma))
+            tamanho = quantidade * np.dtype(tipo).itemsize
+            if posicao + tamanho > len(dados):
+                return None
+            arrays[nome] = np.frombuffer(dados, dtype=tipo, count=quantidade, offset=posicao).reshape(forma)
+            posicao += tamanho
+        return cls(num_rodadas, **arrays)
+
+# Cache LRU de contextos em memória, indexado pelo hash do conteúdo do key.json
+_contextos = OrderedDict()
+
+def caminho_sidecar(arquivo_dados):
+    """Retorna o caminho do sidecar do contexto compilado para um key.json."""
+    return arquivo_dados + EXTENSAO_SIDECAR
+
+def obter_contexto(arquivo_dados, conteudo):
+    """
+    Procura o contexto compilado correspondente ao conteúdo de um key.json:
+    primeiro no cache em memória, depois no sidecar em disco.
+    Args:
+        arquivo_dados (str): Caminho do key.json.
+        conteudo (bytes): Conteúdo bruto do key.json.
+    Returns:
+        ContextoChave: O contexto, ou None se ainda não tiver sido compilado.
+    """
+    hash_origem = hash_conteudo(conteudo)
+    contexto = _contextos.get(hash_origem)
+    if contexto is not None:
+        _contextos.move_to_end(hash_origem)
+        return contexto
+    contexto = ContextoChave.abrir(caminho_sidecar(arquivo_dados), hash_origem)
+    if contexto is not None:
+        _guardar(hash_origem, contexto)
+    return contexto
+
+def registrar_contexto(arquivo_dados, conteudo, contexto):
+    """
+    Guarda um contexto recém-compilado no cache em memória e no sidecar em disco.
+    Uma falha ao gravar o sidecar (ex.: diretório somente leitura) não impede o uso do contexto.
+    Args:
+        arquivo_dados (str): Caminho do key.json.
+        conteudo (bytes): Conteúdo bruto do key.json que originou o contexto.
+        contexto (ContextoChave): Contexto compilado.
+    """
+    hash_origem = hash_conteudo(conteudo)
+    _guardar(hash_origem, contexto)
+    try:
+        contexto.salvar(caminho_sidecar(arquivo_dados), hash_origem)
+    except OSError:
+        # Sem o sidecar, o contexto apenas é recompilado na próxima execução
+        pass
+
+def _guardar(hash_origem, contexto):
+    """Insere um contexto no cache em memória, descartando o menos usado quando o limite é atingido."""
+    _contextos[hash_origem] = contexto
+    _contextos.move_to_end(hash_origem)
+    while len(_contextos) > MAX_CONTEXTOS:
+        _contextos.popitem(last=False)
@@ -0,0 +1,61 @@
+import numpy as np
+
+# Polinômio irredutível do AES (x⁸ + x⁴ + x³ + x + 1) e gerador multiplicativo de GF(2⁸)
+POLINOMIO = 0x11B
+GERADOR = 0x03
+
+def _gerar_tabelas_log():
+    """
+    Gera as tabelas de logaritmo e antilogaritmo (exponencial) de GF(2⁸) na base 0x03.
+    A tabela de antilogaritmo tem 512 posições para que a soma de dois logaritmos
+    possa ser usada como índice sem redução módulo 255.
+    Returns:
+        tuple: (log, antilog), arrays numpy de inteiros.
+    """
+    log = np.zeros(256, dtype=np.int32)
+    antilog = np.zeros(512, dtype=np.int32)
+    x = 1
+    for i in range(255):
+        antilog[i] = x
+        log[x] = i
+        # Multiplica x pelo gerador 0x03: x * 3 = (x * 2) ^ x
+        x2 = x << 1
+        if x2 & 0x100:
+            x2 ^= POLINOMIO
+        x = x2 ^ x
+    antilog[255:510] = antilog[:255]
+    return log, antilog
+
+LOG, ANTILOG = _gerar_tabelas_log()
+
+def multiplicar(a, b):
+    """
+    Multiplica dois elementos de GF(2⁸) usando as tabelas de logaritmo e antilogaritmo.
+    Equivalente a `aes_core.galois_multiply`, mas com custo constante (três buscas).
+    Args:
+        a (int): Primeiro elemento (0-255).
+        b (int): Segundo elemento (0-255).
+    Returns:
+        int: Produto a * b em GF(2⁸).
+    """
+    if a == 0 or b == 0:
+        return 0
+    return int(ANTILOG[LOG[a] + LOG[b]])
+
+def tabela_multiplicacao(m):
+    """
+    Gera a tabela de multiplicação por uma constante m em GF(2⁸).
+    Args:
+        m (int): Constante multiplicadora (0-255).
+    Returns:
+        numpy.ndarray: Array (uint8) de 256 posições com m * x para cada x.
+    """
+    x = np.arange(256)
+    if m == 0:
+        return np.zeros(256, dtype=np.uint8)
+    produto = ANTILOG[LOG[x] + LOG[m]]
+    produto[0] = 0
+    return produto.astype(np.uint8)
+
+# Tabelas pré-calculadas para os coeficientes do MixColumns e do MixColumns inverso
+MULTIPLICACAO = {m: tabela_multiplicacao(m) for m in (0x01, 0x02, 0x03, 0x09, 0x0b, 0x0d, 0x0e)}
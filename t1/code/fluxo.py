@@ -0,0 +1,307 @@
+import os
+import codecs
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from aes_core import (
+    bytes_para_estado,
+    criptografar_ttable,
+    descriptografar_ttable
+)
+
+# Tamanho padrão de cada pedaço lido do arquivo (1 MiB)
+TAMANHO_CHUNK = 1 << 20
+
+def ler_texto_em_chunks(arquivo_entrada, tamanho_chunk=TAMANHO_CHUNK):
+    """
+    Lê um arquivo de texto em pedaços e os devolve codificados em UTF-8.
+    O arquivo é aberto em modo texto (com a mesma conversão de quebras de linha de
+    `GerenciadorAES.criptografar_arquivo`), para que o resultado seja idêntico à leitura completa.
+    Args:
+        arquivo_entrada (str): Caminho do arquivo de texto.
+        tamanho_chunk (int, opcional): Quantidade de caracteres lidos por vez.
+    Yields:
+        bytes: Pedaços do texto codificados em UTF-8.
+    """
+    with open(arquivo_entrada, "r", encoding="utf-8") as f:
+        while True:
+            texto = f.read(tamanho_chunk)
+            if not texto:
+                break
+            yield texto.encode('utf-8')
+
+def ler_hex_em_chunks(arquivo_entrada, tamanho_chunk=TAMANHO_CHUNK):
+    """
+    Lê um arquivo com conteúdo hexadecimal em pedaços e os devolve como bytes.
+    Espaços e quebras de linha são ignorados; um dígito hexadecimal sem par no fim
+    de um pedaço é guardado para o pedaço seguinte.
+    Args:
+        arquivo_entrada (str): Caminho do arquivo hexadecimal.
+        tamanho_chunk (int, opcional): Quantidade de caracteres lidos por vez.
+    Yields:
+        bytes: Pedaços do conteúdo decodificado.
+    """
+    resto = ""
+    with open(arquivo_entrada, "r") as f:
+        while True:
+            texto = f.read(tamanho_chunk)
+            if not texto:
+                break
+            texto = resto + "".join(texto.split())
+            corte = len(texto) - len(texto) % 2
+            resto = texto[corte:]
+            if corte:
+                yield bytes.fromhex(texto[:corte])
+    if resto:
+        raise ValueError("Conteúdo hexadecimal com número ímpar de dígitos.")
+
+def reagrupar(chunks, tamanho):
+    """
+    Reagrupa uma sequência de pedaços de bytes em pedaços de exatamente `tamanho` bytes.
+    Apenas o último pedaço pode ser menor; nenhum padding é adicionado.
+    Args:
+        chunks (iterable): Pedaços de bytes de tamanhos arbitrários.
+        tamanho (int): Tamanho de cada pedaço de saída.
+    Yields:
+        bytes: Pedaços com `tamanho` bytes (o último pode ser menor).
+    """
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= tamanho:
+            corte = len(buffer) - len(buffer) % tamanho
+            for i in range(0, corte, tamanho):
+                yield bytes(buffer[i:i + tamanho])
+            del buffer[:corte]
+    if buffer:
+        yield bytes(buffer)
+
+def _em_blocos(chunks):
+    """
+    Reagrupa uma sequência de pedaços de bytes em pedaços múltiplos de 16 bytes.
+    Apenas o final incompleto (menos de 16 bytes) é mantido entre pedaços; o último
+    é completado com zeros (padding), como em `texto_para_blocos`.
+    Yields:
+        bytes: Pedaços com tamanho múltiplo de 16 bytes.
+    """
+    resto = b""
+    for chunk in chunks:
+        if resto:
+            chunk = resto + chunk
+        corte = len(chunk) - len(chunk) % 16
+        resto = chunk[corte:]
+        if corte:
+            yield chunk[:corte]
+    if resto:
+        yield resto + b'\x00' * (16 - len(resto))
+
+def criptografar_fluxo(chunks, chaves, tabela, tabelas_t=None, num_rodadas=10, executor=None):
+    """
+    Criptografa uma sequência de pedaços de bytes, pedaço por pedaço, com memória constante.
+    Args:
+        chunks (iterable): Pedaços de bytes do texto claro.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+        tabelas_t (numpy.ndarray, opcional): T-tables pré-calculadas.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+        executor (paralelo.ExecutorParalelo, opcional): Executor para processar cada pedaço em vários núcleos.
+    Yields:
+        bytes: Pedaços do texto cifrado.
+    """
+    for chunk in _em_blocos(chunks):
+        estado = bytes_para_estado(chunk)
+        if executor is not None:
+            yield executor.criptografar(estado).tobytes()
+        else:
+            yield criptografar_ttable(estado, chaves, tabela, tabelas_t, num_rodadas).tobytes()
+
+def descriptografar_fluxo(chunks, chaves, tabela_inversa, tabelas_t_inversas=None, chaves_inversas=None, num_rodadas=10,
+                          executor=None):
+    """
+    Descriptografa uma sequência de pedaços de bytes, pedaço por pedaço, com memória constante.
+    Args:
+        chunks (iterable): Pedaços de bytes do texto cifrado.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela_inversa (dict | numpy.ndarray): Tabela de substituição inversa.
+        tabelas_t_inversas (numpy.ndarray, opcional): T-tables inversas pré-calculadas.
+        chaves_inversas (numpy.ndarray, opcional): Chaves da cifra inversa equivalente.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+        executor (paralelo.ExecutorParalelo, opcional): Executor para processar cada pedaço em vários núcleos.
+    Yields:
+        bytes: Pedaços do texto claro (ainda com o padding de zeros do último bloco).
+    """
+    for chunk in _em_blocos(chunks):
+        estado = bytes_para_estado(chunk)
+        if executor is not None:
+            yield executor.descriptografar(estado).tobytes()
+            continue
+        yield descriptografar_ttable(
+            estado, chaves, tabela_inversa, tabelas_t_inversas, chaves_inversas, num_rodadas
+        ).tobytes()
+
+def bytes_para_texto_fluxo(chunks):
+    """
+    Equivalente em fluxo de `bytes_para_texto`: decodifica pedaços de bytes em UTF-8
+    (ignorando sequências inválidas) e remove os bytes nulos do final do texto.
+    Os zeros finais de cada pedaço são retidos até que se saiba se há mais dados após eles.
+    Args:
+        chunks (iterable): Pedaços de bytes do texto claro.
+    Yields:
+        str: Pedaços do texto decodificado.
+    """
+    decodificador = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    zeros_pendentes = 0
+    for chunk in chunks:
+        sem_zeros = chunk.rstrip(b'\x00')
+        if sem_zeros:
+            yield decodificador.decode(b'\x00' * zeros_pendentes + sem_zeros)
+            zeros_pendentes = len(chunk) - len(sem_zeros)
+        else:
+            zeros_pendentes += len(chunk)
+    yield decodificador.decode(b'', final=True)
+
+def escrever_hex(chunks, saida):
+    """
+    Escreve pedaços de bytes em formato hexadecimal, incrementalmente.
+    Args:
+        chunks (iterable): Pedaços de bytes.
+        saida (io.TextIOBase): Arquivo (ou `sys.stdout`) de destino.
+    Returns:
+        int: Total de bytes escritos (antes da conversão para hexadecimal).
+    """
+    total = 0
+    for chunk in chunks:
+        saida.write(chunk.hex())
+        total += len(chunk)
+    return total
+
+def _conferir_chunk(motor, cifrado, chunk, posicao, digest_recuperado):
+    """
+    Descriptografa um pedaço já criptografado, atualiza o digest do texto recuperado e
+    retorna a posição absoluta do primeiro byte divergente (ou None).
+    """
+    recuperado = motor.descriptografar(cifrado).reshape(-1)
+    digest_recuperado.update(recuperado[:len(chunk)])
+    original = np.frombuffer(chunk, dtype=np.uint8)
+    divergentes = np.flatnonzero(recuperado[:len(chunk)] != original)
+    if len(divergentes):
+        return posicao + int(divergentes[0])
+    # O padding do último bloco também deve voltar como zeros
+    if recuperado[len(chunk):].any():
+        return posicao + len(chunk)
+    return None
+
+def verificar_ida_e_volta(chunks, motor, tamanho_chunk=TAMANHO_CHUNK):
+    """
+    Criptografa e descriptografa uma sequência de pedaços em pipeline, comparando o texto
+    recuperado com o original pedaço por pedaço e por digests BLAKE2b de ambos.
+    Enquanto um pedaço é descriptografado e conferido em um thread auxiliar, o seguinte é lido
+    e criptografado; no máximo dois pedaços ficam em memória, independentemente do tamanho total.
+    Args:
+        chunks (iterable): Pedaços de bytes do texto claro.
+        motor (motores.Motor): Motor com `criptografar(estado)` e `descriptografar(estado)`, usado ao
+                               mesmo tempo pelos dois threads (ver o contrato em `motores.Motor`).
+        tamanho_chunk (int, opcional): Tamanho (em bytes) de cada pedaço processado.
+    Returns:
+        dict: "ok", "bytes", "primeiro_erro" (posição do primeiro byte divergente ou None)
+              e os digests em hexadecimal do texto original e do recuperado.
+    """
+    digest_original = hashlib.blake2b()
+    digest_recuperado = hashlib.blake2b()
+    primeiro_erro = None
+    posicao = 0
+    pendente = None
+    # Pedaços múltiplos de 16 bytes, para que o padding apareça apenas no último
+    tamanho_chunk = max(16, tamanho_chunk - tamanho_chunk % 16)
+    with ThreadPoolExecutor(max_workers=1) as conferencia:
+        for chunk in reagrupar(chunks, tamanho_chunk):
+            digest_original.update(chunk)
+            cifrado = motor.criptografar(bytes_para_estado(chunk))
+            # Aguarda a conferência do pedaço anterior antes de enviar o próximo
+            if pendente is not None:
+                erro = pendente.result()
+                if primeiro_erro is None:
+                    primeiro_erro = erro
+            pendente = conferencia.submit(_conferir_chunk, motor, cifrado, chunk, posicao, digest_recuperado)
+            posicao += len(chunk)
+        if pendente is not None:
+            erro = pendente.result()
+            if primeiro_erro is None:
+                primeiro_erro = erro
+    original = digest_original.hexdigest()
+    recuperado = digest_recuperado.hexdigest()
+    return {
+        "ok": primeiro_erro is None and original == recuperado,
+        "bytes": posicao,
+        "primeiro_erro": primeiro_erro,
+        "digest_original": original,
+        "digest_recuperado": recuperado,
+    }
+
+def _ultimo_bloco_hex(arquivo):
+    """
+    Localiza, a partir do final de um arquivo hexadecimal aberto em modo binário, os 32 últimos
+    dígitos (o último bloco), ignorando espaços e quebras de linha.
+    Returns:
+        tuple: (posição no arquivo do primeiro desses dígitos, bytes do último bloco),
+               ou (posição do fim do conteúdo, b'') se o arquivo não tiver dígitos.
+    Raises:
+        ValueError: Se o conteúdo não terminar em um bloco completo de 16 bytes.
+    """
+    fim = arquivo.seek(0, os.SEEK_END)
+    digitos = []
+    posicao = fim
+    janela = 256
+    while posicao > 0 and len(digitos) < 32:
+        inicio = max(0, posicao - janela)
+        arquivo.seek(inicio)
+        trecho = arquivo.read(posicao - inicio)
+        for i in range(len(trecho) - 1, -1, -1):
+            if chr(trecho[i]).isspace():
+                continue
+            digitos.append((inicio + i, trecho[i]))
+            if len(digitos) == 32:
+                break
+        posicao = inicio
+    if not digitos:
+        return fim, b''
+    if len(digitos) < 32:
+        raise ValueError("O conteúdo hexadecimal não termina em um bloco completo de 16 bytes.")
+    return digitos[-1][0], bytes.fromhex(bytes(d for _, d in reversed(digitos)).decode('ascii'))
+
+def anexar_hex(arquivo_hex, dados, chaves, tabela, tabela_inversa, tabelas_t=None, tabelas_t_inversas=None,
+               chaves_inversas=None, num_rodadas=10):
+    """
+    Anexa bytes ao texto claro de um arquivo criptografado em hexadecimal, sem reprocessar o arquivo.
+    Apenas o último bloco (que pode conter o padding de zeros) é descriptografado; os bytes
+    do texto que ele contém são unidos aos novos, e o novo final é criptografado e escrito
+    no lugar desse bloco. O resultado é idêntico a criptografar o texto completo.
+    Como na descriptografia, zeros no final do texto original são tratados como padding.
+    Args:
+        arquivo_hex (str): Caminho do arquivo hexadecimal (é criado se não existir).
+        dados (bytes): Bytes a serem anexados ao texto claro.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+        tabela_inversa (dict | numpy.ndarray): Tabela de substituição inversa.
+        tabelas_t (numpy.ndarray, opcional): T-tables pré-calculadas.
+        tabelas_t_inversas (numpy.ndarray, opcional): T-tables inversas pré-calculadas.
+        chaves_inversas (numpy.ndarray, opcional): Chaves da cifra inversa equivalente.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+    Returns:
+        int: Quantidade de bytes criptografados (o final reaproveitado mais os novos).
+    """
+    with open(arquivo_hex, "a+b") as f:
+        posicao, ultimo_bloco = _ultimo_bloco_hex(f)
+        final = b''
+        if ultimo_bloco:
+            final = descriptografar_ttable(
+                bytes_para_estado(ultimo_bloco), chaves, tabela_inversa, tabelas_t_inversas, chaves_inversas, num_rodadas
+            ).tobytes().rstrip(b'\x00')
+        novo = final + dados
+        if not novo:
+            return 0
+        cifrado = criptografar_ttable(bytes_para_estado(novo), chaves, tabela, tabelas_t, num_rodadas).tobytes()
+        # Descarta o último bloco antigo (e o que vier depois dele) e escreve o novo final
+        f.truncate(posicao)
+        f.write(cifrado.hex().encode('ascii'))
+    return len(novo)
@@ -0,0 +1,218 @@
+import os
+import glob
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from fluxo import (
+    TAMANHO_CHUNK,
+    ler_texto_em_chunks,
+    ler_hex_em_chunks,
+    criptografar_fluxo,
+    descriptografar_fluxo,
+    bytes_para_texto_fluxo,
+    escrever_hex
+)
+
+# Número padrão de arquivos processados simultaneamente
+TAREFAS_PADRAO = 4
+# Extensão dos arquivos criptografados gerados em lote
+EXTENSAO_CRIPTOGRAFADO = ".hex"
+EXTENSAO_DESCRIPTOGRAFADO = ".txt"
+
+def ler_manifesto(arquivo_manifesto):
+    """
+    Lê um manifesto com um caminho por linha (linhas vazias e iniciadas por '#' são ignoradas).
+    Caminhos relativos são resolvidos a partir do diretório do manifesto.
+    Args:
+        arquivo_manifesto (str): Caminho do manifesto.
+    Returns:
+        list: Caminhos listados no manifesto.
+    """
+    base = os.path.dirname(os.path.abspath(arquivo_manifesto))
+    with open(arquivo_manifesto, "r", encoding="utf-8") as f:
+        linhas = [linha.strip() for linha in f]
+    return [os.path.join(base, linha) for linha in linhas if linha and not linha.startswith("#")]
+
+def _raiz_glob(padrao):
+    """Parte inicial de um padrão glob sem caracteres especiais (ex.: 'lote' em 'lote/*/x.txt')."""
+    raiz = padrao
+    while glob.has_magic(raiz):
+        raiz = os.path.dirname(raiz)
+    return raiz or os.curdir
+
+def expandir_entradas(entradas):
+    """
+    Expande diretórios (recursivamente), padrões glob e arquivos em uma lista de pares (arquivo, caminho relativo).
+    O caminho relativo preserva a estrutura dos diretórios na saída: relativo ao diretório informado,
+    à parte do padrão glob sem caracteres especiais ou, para arquivos avulsos, ao diretório comum a todos eles.
+    Args:
+        entradas (iterable): Diretórios, padrões glob (ex.: 'textos/**/*.txt') ou arquivos.
+    Returns:
+        list: Pares (caminho do arquivo, caminho relativo de saída), sem repetições.
+    Raises:
+        ValueError: Se dois arquivos diferentes resultarem no mesmo caminho relativo de saída.
+    """
+    arquivos = []
+    vistos = set()
+    avulsos = []
+    def adicionar(caminho, relativo):
+        absoluto = os.path.abspath(caminho)
+        if absoluto not in vistos:
+            vistos.add(absoluto)
+            arquivos.append((caminho, relativo))
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            for raiz, _, nomes in os.walk(entrada):
+                for nome in sorted(nomes):
+                    caminho = os.path.join(raiz, nome)
+                    adicionar(caminho, os.path.relpath(caminho, entrada))
+        elif glob.has_magic(entrada):
+            raiz = _raiz_glob(entrada)
+            for caminho in sorted(glob.glob(entrada, recursive=True)):
+                if os.path.isfile(caminho):
+                    adicionar(caminho, os.path.relpath(caminho, raiz))
+        else:
+            avulsos.append(entrada)
+    if avulsos:
+        comum = os.path.commonpath([os.path.dirname(os.path.abspath(caminho)) for caminho in avulsos])
+        for caminho in avulsos:
+            adicionar(caminho, os.path.relpath(os.path.abspath(caminho), comum))
+    _verificar_saidas(arquivos)
+    return arquivos
+
+def _verificar_saidas(arquivos):
+    """
+    Garante que cada arquivo do lote tenha um caminho de saída próprio.
+    Raises:
+        ValueError: Se dois arquivos diferentes resultarem no mesmo caminho de saída.
+    """
+    destinos = {}
+    for arquivo, relativo in arquivos:
+        chave = os.path.normcase(os.path.normpath(relativo))
+        if chave in destinos:
+            raise ValueError(f"'{destinos[chave]}' e '{arquivo}' seriam gravados no mesmo arquivo de saída ({relativo}).")
+        destinos[chave] = arquivo
+
+def caminho_saida(relativo, diretorio_saida, operacao):
+    """
+    Calcula o caminho de saída de um arquivo do lote.
+    Na criptografia acrescenta '.hex'; na descriptografia remove '.hex' (ou acrescenta '.txt').
+    """
+    if operacao == "-c":
+        relativo += EXTENSAO_CRIPTOGRAFADO
+    elif relativo.endswith(EXTENSAO_CRIPTOGRAFADO):
+        relativo = relativo[:-len(EXTENSAO_CRIPTOGRAFADO)]
+    else:
+        relativo += EXTENSAO_DESCRIPTOGRAFADO
+    return os.path.join(diretorio_saida, relativo)
+
+def _escrever_atomico(caminho, escrever, **opcoes_abertura):
+    """
+    Escreve um arquivo de forma atômica: o conteúdo vai para um arquivo temporário no mesmo
+    diretório, que só substitui o destino ao final. Em caso de erro, o destino não é alterado.
+    Args:
+        caminho (str): Caminho final.
+        escrever (callable): Função que recebe o arquivo aberto e escreve o conteúdo.
+        **opcoes_abertura: Argumentos repassados a `open` (encoding, newline).
+    Returns:
+        O valor retornado por `escrever`.
+    """
+    diretorio = os.path.dirname(caminho) or "."
+    os.makedirs(diretorio, exist_ok=True)
+    temporario = os.path.join(
+        diretorio, f".{os.path.basename(caminho)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        with open(temporario, "w", **opcoes_abertura) as f:
+            resultado = escrever(f)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return resultado
+
+def _processar_arquivo(gerenciador, arquivo, saida, operacao, tamanho_chunk):
+    """Criptografa ou descriptografa um único arquivo do lote em fluxo, com escrita atômica."""
+    if operacao == "-c":
+        chunks = criptografar_fluxo(
+            ler_texto_em_chunks(arquivo, tamanho_chunk), gerenciador.chaves_array, gerenciador.tabela_array,
+            gerenciador.tabelas_t, executor=gerenciador.motor
+        )
+        _escrever_atomico(saida, lambda f: escrever_hex(chunks, f))
+    else:
+        chunks = descriptografar_fluxo(
+            ler_hex_em_chunks(arquivo, tamanho_chunk), gerenciador.chaves_array, gerenciador.tabela_inversa_array,
+            gerenciador.tabelas_t_inversas, gerenciador.chaves_inversas, executor=gerenciador.motor
+        )
+        def escrever(f):
+            for texto in bytes_para_texto_fluxo(chunks):
+                f.write(texto)
+        _escrever_atomico(saida, escrever, encoding="utf-8", newline="")
+
+def _tarefa(gerenciador, arquivo, saida, operacao, tamanho_chunk):
+    """Processa um arquivo e devolve o seu status (erros não interrompem o lote)."""
+    inicio = time.perf_counter()
+    status = {"arquivo": arquivo, "saida": saida, "ok": True, "bytes": 0, "segundos": 0.0, "erro": None}
+    try:
+        status["bytes"] = os.path.getsize(arquivo)
+        _processar_arquivo(gerenciador, arquivo, saida, operacao, tamanho_chunk)
+    except Exception as e:
+        status["ok"] = False
+        status["erro"] = str(e)
+    status["segundos"] = time.perf_counter() - inicio
+    return status
+
+def processar_lote(gerenciador, entradas, diretorio_saida, operacao="-c", tarefas=TAREFAS_PADRAO,
+                   tamanho_chunk=TAMANHO_CHUNK):
+    """
+    Criptografa ou descriptografa vários arquivos com um único contexto de chave.
+    Os arquivos passam por um pool limitado de threads, de modo que a leitura e a escrita de
+    um arquivo se sobrepõem ao processamento de outros; no máximo `2 * tarefas` arquivos ficam
+    pendentes ao mesmo tempo, independentemente do tamanho do lote.
+    Args:
+        gerenciador (GerenciadorAES): Gerenciador com a chave já carregada (carregada uma única vez).
+        entradas (list): Pares (arquivo, caminho relativo) retornados por `expandir_entradas`.
+        diretorio_saida (str): Diretório onde os resultados são gravados.
+        operacao (str, opcional): '-c' para criptografar ou '-d' para descriptografar.
+        tarefas (int, opcional): Número de arquivos processados simultaneamente.
+        tamanho_chunk (int, opcional): Quantidade de caracteres lidos por vez de cada arquivo.
+    Returns:
+        list: Status de cada arquivo, na ordem de conclusão.
+    Raises:
+        ValueError: Se a operação for inválida ou se dois arquivos resultarem no mesmo caminho de saída.
+    """
+    if operacao not in ("-c", "-d"):
+        raise ValueError("Operação inválida. Use '-c' para criptografar ou '-d' para descriptografar.")
+    entradas = list(entradas)
+    _verificar_saidas([(arquivo, caminho_saida(relativo, "", operacao)) for arquivo, relativo in entradas])
+    resultados = []
+    pendentes = set()
+    with ThreadPoolExecutor(max_workers=tarefas) as pool:
+        for arquivo, relativo in entradas:
+            if len(pendentes) >= 2 * tarefas:
+                concluidas, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                resultados.extend(tarefa.result() for tarefa in concluidas)
+            pendentes.add(pool.submit(
+                _tarefa, gerenciador, arquivo, caminho_saida(relativo, diretorio_saida, operacao),
+                operacao, tamanho_chunk
+            ))
+        resultados.extend(tarefa.result() for tarefa in wait(pendentes).done)
+    return resultados
+
+def imprimir_resumo(resultados, segundos):
+    """
+    Exibe o status de cada arquivo e a vazão agregada do lote.
+    Args:
+        resultados (list): Status retornados por `processar_lote`.
+        segundos (float): Tempo total do lote.
+    """
+    for status in sorted(resultados, key=lambda s: s["arquivo"]):
+        if status["ok"]:
+            print(f"[ok]   {status['arquivo']} -> {status['saida']} ({status['bytes']} bytes, {status['segundos']:.6f} s)")
+        else:
+            print(f"[erro] {status['arquivo']}: {status['erro']}")
+    sucesso = [s for s in resultados if s["ok"]]
+    total = sum(s["bytes"] for s in sucesso)
+    print(f"Arquivos: {len(resultados)} ({len(sucesso)} ok, {len(resultados) - len(sucesso)} com erro)")
+    print(f"Total: {total} bytes em {segundos:.6f} segundos ({total / segundos / 1e6 if segundos else 0:.2f} MB/s)")
@@ -0,0 +1,143 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Número máximo de blocos guardados por operação (padrão: 64 Ki blocos = 1 MiB de texto claro)
+MAX_BLOCOS_MEMO = 1 << 16
+# Blocos examinados para estimar a repetição de uma mensagem antes de deduplicá-la
+TAMANHO_AMOSTRA = 4096
+# Fração de blocos distintos na amostra acima da qual a deduplicação é dispensada
+LIMIAR_DISTINTOS = 0.95
+# Cada bloco de 16 bytes vira um único elemento comparável byte a byte (ordenável por np.unique)
+_TIPO_BLOCO = np.dtype((np.void, 16))
+
+class MemoBlocos:
+    """
+    Memo limitado (LRU) de blocos já processados, indexado pelos 16 bytes brutos do bloco.
+    Com a chave fixa, o AES modificado é uma transformação determinística bloco a bloco: blocos
+    repetidos (relatórios gerados a partir de modelos, registros com padding) só precisam passar
+    pelas rodadas uma vez. O memo é esvaziado automaticamente quando a chave ou a tabela mudam.
+    Pode ser usado por vários threads ao mesmo tempo: as consultas e atualizações são protegidas
+    por uma trava, mas as rodadas dos blocos inéditos rodam fora dela.
+    """
+
+    def __init__(self, max_blocos=MAX_BLOCOS_MEMO):
+        """
+        Args:
+            max_blocos (int, opcional): Número máximo de blocos mantidos por operação.
+        """
+        self.max_blocos = max_blocos
+        self.memos = {"criptografar": OrderedDict(), "descriptografar": OrderedDict()}
+        self.id_chave = None
+        self.acertos = 0
+        self.faltas = 0
+        self._trava = threading.Lock()
+
+    def validar(self, id_chave):
+        """
+        Esvazia o memo se a chave ou a tabela mudaram desde o último uso.
+        Args:
+            id_chave (hashable): Impressão digital da chave e da tabela (ver `ContextoChave.id_chave`).
+        """
+        if id_chave != self.id_chave:
+            self.limpar()
+            self.id_chave = id_chave
+
+    def limpar(self):
+        """Descarta todos os blocos guardados e zera os contadores."""
+        for memo in self.memos.values():
+            memo.clear()
+        self.acertos = 0
+        self.faltas = 0
+
+    def taxa_acertos(self):
+        """Retorna a fração de blocos atendidos sem passar pelas rodadas."""
+        total = self.acertos + self.faltas
+        return self.acertos / total if total else 0.0
+
+    def _guardar(self, operacao, entradas, saidas):
+        """
+        Guarda pares (entrada, saída) de 16 bytes no memo da operação e, invertidos, no da operação
+        oposta: o bloco cifrado de um texto claro já é a resposta da descriptografia desse bloco.
+        """
+        oposta = "descriptografar" if operacao == "criptografar" else "criptografar"
+        memo, memo_oposto = self.memos[operacao], self.memos[oposta]
+        for inicio in range(0, len(entradas), 16):
+            entrada = entradas[inicio:inicio + 16]
+            saida = saidas[inicio:inicio + 16]
+            memo[entrada] = saida
+            memo_oposto[saida] = entrada
+        # Descarta os blocos menos usados recentemente quando o limite é atingido
+        for m in (memo, memo_oposto):
+            while len(m) > self.max_blocos:
+                m.popitem(last=False)
+
+    def processar(self, operacao, estado, funcao, id_chave):
+        """
+        Aplica `funcao` a um estado, deduplicando os blocos da mensagem com `np.unique` e consultando
+        o memo antes das rodadas; apenas os blocos inéditos chegam à cifra.
+        Args:
+            operacao (str): 'criptografar' ou 'descriptografar'.
+            estado (numpy.ndarray): Blocos (N, 4, 4) uint8.
+            funcao (callable): Função estado -> estado (ex.: `Motor.criptografar`).
+            id_chave (hashable): Impressão digital da chave e da tabela usadas por `funcao`.
+        Returns:
+            numpy.ndarray: Estado (N, 4, 4) processado, idêntico ao de `funcao(estado)`.
+        Raises:
+            ValueError: Se a operação for inválida.
+        """
+        if operacao not in self.memos:
+            raise ValueError("Operação inválida. Use 'criptografar' ou 'descriptografar'.")
+        blocos = np.ascontiguousarray(estado, dtype=np.uint8).reshape(-1, 16)
+        total = len(blocos)
+        if total == 0:
+            return blocos.reshape(-1, 4, 4).copy()
+        chaves = blocos.view(_TIPO_BLOCO).ravel()
+        # Mensagens de alta entropia quase não repetem blocos: ordenar e consultar o memo custaria
+        # mais que as próprias rodadas, então uma amostra decide se vale a pena deduplicar
+        if total > TAMANHO_AMOSTRA:
+            distintos = len(np.unique(chaves[:TAMANHO_AMOSTRA]))
+            if distintos > LIMIAR_DISTINTOS * TAMANHO_AMOSTRA:
+                with self._trava:
+                    self.validar(id_chave)
+                    self.faltas += total
+                return funcao(blocos.reshape(-1, 4, 4))
+        # Deduplicação dentro da mensagem: cada bloco distinto aparece uma única vez em `unicos`
+        unicos, inversos = np.unique(chaves, return_inverse=True)
+        dados_unicos = unicos.tobytes()
+        memo = self.memos[operacao]
+        resultados = np.empty((len(unicos), 16), dtype=np.uint8)
+        indices_acertos, saidas_acertos, indices_faltas = [], [], []
+        with self._trava:
+            self.validar(id_chave)
+            for indice, inicio in enumerate(range(0, len(dados_unicos), 16)):
+                entrada = dados_unicos[inicio:inicio + 16]
+                saida = memo.get(entrada)
+                if saida is None:
+                    indices_faltas.append(indice)
+                else:
+                    memo.move_to_end(entrada)
+                    indices_acertos.append(indice)
+                    saidas_acertos.append(saida)
+        if indices_acertos:
+            resultados[indices_acertos] = np.frombuffer(b"".join(saidas_acertos), dtype=np.uint8).reshape(-1, 16)
+        if indices_faltas:
+            # Apenas os blocos inéditos passam pelas rodadas, todos de uma vez
+            entradas = unicos.view(np.uint8).reshape(-1, 16)[indices_faltas]
+            saidas = np.ascontiguousarray(funcao(entradas.reshape(-1, 4, 4)), dtype=np.uint8).reshape(-1, 16)
+            resultados[indices_faltas] = saidas
+        with self._trava:
+            # Se a chave mudou enquanto as rodadas rodavam, os blocos não pertencem mais ao memo
+            if indices_faltas and self.id_chave == id_chave:
+                self._guardar(operacao, entradas.tobytes(), saidas.tobytes())
+            self.faltas += len(indices_faltas)
+            self.acertos += total - len(indices_faltas)
+        return resultados[inversos.ravel()].reshape(-1, 4, 4)
+
+    def criptografar(self, estado, funcao, id_chave):
+        """Criptografa um estado (N, 4, 4) através do memo (ver `processar`)."""
+        return self.processar("criptografar", estado, funcao, id_chave)
+
+    def descriptografar(self, estado, funcao, id_chave):
+        """Descriptografa um estado (N, 4, 4) através do memo (ver `processar`)."""
+        return self.processar("descriptografar", estado, funcao, id_chave)
@@ -0,0 +1,297 @@
+from array import array
+from collections import OrderedDict
+import numpy as np
+from aes_core import (
+    criptografar_ttable,
+    descriptografar_ttable,
+    gerar_tabelas_t,
+    tabela_para_array,
+    chaves_para_array,
+    bytes_para_estado
+)
+
+# Tamanho do nonce no bloco de contador: 8 bytes de nonce + 8 bytes de contador (big-endian)
+TAMANHO_NONCE = 8
+# Número de blocos de keystream por página do cache (4096 blocos = 64 KiB)
+BLOCOS_POR_PAGINA = 4096
+# Tamanho do vetor de inicialização do modo CBC (um bloco)
+TAMANHO_IV = 16
+
+def blocos_contador(nonce, bloco_inicial, num_blocos):
+    """
+    Gera os blocos de contador do modo CTR: nonce || contador (64 bits, big-endian).
+    Args:
+        nonce (bytes): Nonce de 8 bytes.
+        bloco_inicial (int): Valor do contador no primeiro bloco.
+        num_blocos (int): Quantidade de blocos a gerar.
+    Returns:
+        numpy.ndarray: Estado (num_blocos, 4, 4) uint8 com os blocos de contador.
+    """
+    if len(nonce) != TAMANHO_NONCE:
+        raise ValueError(f"O nonce deve ter {TAMANHO_NONCE} bytes.")
+    blocos = np.empty((num_blocos, 16), dtype=np.uint8)
+    blocos[:, :TAMANHO_NONCE] = np.frombuffer(nonce, dtype=np.uint8)
+    contadores = np.arange(bloco_inicial, bloco_inicial + num_blocos, dtype=np.uint64)
+    blocos[:, TAMANHO_NONCE:] = contadores.astype('>u8').view(np.uint8).reshape(-1, 8)
+    return blocos.reshape(-1, 4, 4)
+
+def gerar_keystream(chaves, tabela, nonce, bloco_inicial, num_blocos, tabelas_t=None):
+    """
+    Gera a keystream do modo CTR criptografando os blocos de contador com o AES modificado.
+    Args:
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+        nonce (bytes): Nonce de 8 bytes.
+        bloco_inicial (int): Índice do primeiro bloco de keystream.
+        num_blocos (int): Quantidade de blocos de keystream.
+        tabelas_t (numpy.ndarray, opcional): T-tables pré-calculadas.
+    Returns:
+        numpy.ndarray: Keystream linear (num_blocos * 16 bytes, uint8).
+    """
+    contador = blocos_contador(nonce, bloco_inicial, num_blocos)
+    return criptografar_ttable(contador, chaves, tabela, tabelas_t).reshape(-1)
+
+class CacheKeystream:
+    """
+    Cache limitado (LRU) de keystream do modo CTR, indexado por (chave, nonce, página).
+    A keystream é gerada em páginas de `BLOCOS_POR_PAGINA` blocos; uma página gerada
+    antecipadamente tira a cifra do caminho crítico: criptografar ou descriptografar
+    passa a ser apenas um XOR contra a keystream armazenada.
+    """
+
+    def __init__(self, max_paginas=256):
+        """
+        Args:
+            max_paginas (int, opcional): Número máximo de páginas mantidas (padrão: 256 páginas = 16 MiB).
+        """
+        self.max_paginas = max_paginas
+        self.paginas = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+
+    def _pagina(self, id_chave, chaves, tabela, tabelas_t, nonce, indice):
+        """Retorna uma página da keystream, gerando-a e armazenando-a se necessário."""
+        chave_cache = (id_chave, bytes(nonce), indice)
+        pagina = self.paginas.get(chave_cache)
+        if pagina is not None:
+            self.acertos += 1
+            self.paginas.move_to_end(chave_cache)
+            return pagina
+        self.faltas += 1
+        pagina = gerar_keystream(chaves, tabela, nonce, indice * BLOCOS_POR_PAGINA, BLOCOS_POR_PAGINA, tabelas_t)
+        pagina.flags.writeable = False
+        self.paginas[chave_cache] = pagina
+        # Descarta as páginas menos usadas recentemente quando o limite é atingido
+        while len(self.paginas) > self.max_paginas:
+            self.paginas.popitem(last=False)
+        return pagina
+
+    def obter(self, id_chave, chaves, tabela, nonce, offset, tamanho, tabelas_t=None):
+        """
+        Retorna `tamanho` bytes de keystream a partir do byte `offset`.
+        Args:
+            id_chave (hashable): Identificador da chave e da tabela (ex.: impressão digital).
+            chaves (list | numpy.ndarray): Chaves expandidas.
+            tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+            nonce (bytes): Nonce de 8 bytes.
+            offset (int): Posição (em bytes) do primeiro byte de keystream.
+            tamanho (int): Quantidade de bytes de keystream.
+            tabelas_t (numpy.ndarray, opcional): T-tables pré-calculadas.
+        Returns:
+            numpy.ndarray: Keystream (uint8) com `tamanho` bytes.
+        """
+        if tamanho == 0:
+            return np.empty(0, dtype=np.uint8)
+        bytes_por_pagina = BLOCOS_POR_PAGINA * 16
+        primeira = offset // bytes_por_pagina
+        ultima = (offset + tamanho - 1) // bytes_por_pagina
+        paginas = [
+            self._pagina(id_chave, chaves, tabela, tabelas_t, nonce, indice)
+            for indice in range(primeira, ultima + 1)
+        ]
+        keystream = paginas[0] if len(paginas) == 1 else np.concatenate(paginas)
+        inicio = offset - primeira * bytes_por_pagina
+        return keystream[inicio:inicio + tamanho]
+
+    def pre_gerar(self, id_chave, chaves, tabela, nonce, offset, tamanho, tabelas_t=None):
+        """Gera antecipadamente a keystream de um intervalo, deixando-a pronta no cache."""
+        self.obter(id_chave, chaves, tabela, nonce, offset, tamanho, tabelas_t)
+
+    def limpar(self):
+        """Descarta todas as páginas armazenadas."""
+        self.paginas.clear()
+
+def criptografar_ctr(dados, chaves, tabela, nonce, offset=0, cache=None, id_chave=None, tabelas_t=None):
+    """
+    Criptografa (ou descriptografa, a operação é a mesma) dados no modo CTR.
+    O texto cifrado tem o mesmo tamanho do texto claro, sem padding.
+    Args:
+        dados (bytes): Dados a serem processados.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+        nonce (bytes): Nonce de 8 bytes. Nunca deve ser reutilizado com a mesma chave para mensagens diferentes.
+        offset (int, opcional): Posição (em bytes) dos dados dentro da mensagem.
+        cache (CacheKeystream, opcional): Cache de keystream; se omitido, a keystream é gerada sob demanda.
+        id_chave (hashable, opcional): Identificador da chave, obrigatório quando `cache` é usado.
+        tabelas_t (numpy.ndarray, opcional): T-tables pré-calculadas.
+    Returns:
+        bytes: Dados processados.
+    """
+    entrada = np.frombuffer(dados, dtype=np.uint8)
+    if cache is not None:
+        if id_chave is None:
+            raise ValueError("id_chave é obrigatório quando o cache de keystream é usado.")
+        keystream = cache.obter(id_chave, chaves, tabela, nonce, offset, len(entrada), tabelas_t)
+    else:
+        tabela = tabela_para_array(tabela)
+        if tabelas_t is None:
+            tabelas_t = gerar_tabelas_t(tabela)
+        bloco_inicial = offset // 16
+        num_blocos = (offset + len(entrada) + 15) // 16 - bloco_inicial
+        inicio = offset - bloco_inicial * 16
+        keystream = gerar_keystream(chaves, tabela, nonce, bloco_inicial, num_blocos, tabelas_t)
+        keystream = keystream[inicio:inicio + len(entrada)]
+    return (entrada ^ keystream).tobytes()
+
+descriptografar_ctr = criptografar_ctr
+
+def adicionar_padding_pkcs7(dados):
+    """
+    Completa os dados até um múltiplo de 16 bytes com o padding PKCS#7 (o mesmo usado pela OpenSSL):
+    n bytes de valor n, com 1 <= n <= 16 (um bloco inteiro de padding se os dados já forem múltiplos de 16).
+    Args:
+        dados (bytes): Dados a serem completados.
+    Returns:
+        bytes: Dados com padding.
+    """
+    n = 16 - len(dados) % 16
+    return bytes(dados) + bytes([n]) * n
+
+def remover_padding_pkcs7(dados):
+    """
+    Remove o padding PKCS#7.
+    Args:
+        dados (bytes): Dados com padding (múltiplo de 16 bytes).
+    Returns:
+        bytes: Dados sem o padding.
+    Raises:
+        ValueError: Se o padding for inválido (chave, IV ou dados incorretos).
+    """
+    n = dados[-1] if dados else 0
+    if not 1 <= n <= 16 or dados[-n:] != bytes([n]) * n:
+        raise ValueError("Padding PKCS#7 inválido.")
+    return dados[:-n]
+
+def _colunas(estado):
+    """Converte um estado (N, 4, 4) em palavras de coluna (N, 4) uint32 (linha 0 no byte menos significativo)."""
+    return np.ascontiguousarray(np.asarray(estado, dtype=np.uint8).transpose(0, 2, 1)).view('<u4').reshape(-1, 4)
+
+def _criptografar_bloco(a0, a1, a2, a3, t0, t1, t2, t3, sbox, chaves_colunas, num_rodadas):
+    """
+    Criptografa um único bloco, dado em palavras de coluna, com as T-tables em inteiros do Python.
+    Equivalente a `criptografar_ttable` para um bloco, mas sem o custo fixo do numpy por chamada,
+    que domina quando os blocos precisam ser processados um a um (encadeamento do CBC).
+    """
+    k0, k1, k2, k3 = chaves_colunas[0]
+    a0 ^= k0; a1 ^= k1; a2 ^= k2; a3 ^= k3
+    for j in range(1, num_rodadas):
+        k0, k1, k2, k3 = chaves_colunas[j]
+        # A coluna c de saída usa o byte da linha r da coluna (c + r) % 4 (ShiftRows)
+        a0, a1, a2, a3 = (
+            t0[a0 & 0xFF] ^ t1[(a1 >> 8) & 0xFF] ^ t2[(a2 >> 16) & 0xFF] ^ t3[a3 >> 24] ^ k0,
+            t0[a1 & 0xFF] ^ t1[(a2 >> 8) & 0xFF] ^ t2[(a3 >> 16) & 0xFF] ^ t3[a0 >> 24] ^ k1,
+            t0[a2 & 0xFF] ^ t1[(a3 >> 8) & 0xFF] ^ t2[(a0 >> 16) & 0xFF] ^ t3[a1 >> 24] ^ k2,
+            t0[a3 & 0xFF] ^ t1[(a0 >> 8) & 0xFF] ^ t2[(a1 >> 16) & 0xFF] ^ t3[a2 >> 24] ^ k3,
+        )
+    # Última rodada: apenas SubBytes e ShiftRows, sem MixColumns
+    k0, k1, k2, k3 = chaves_colunas[num_rodadas]
+    return (
+        (sbox[a0 & 0xFF] | sbox[(a1 >> 8) & 0xFF] << 8 | sbox[(a2 >> 16) & 0xFF] << 16 | sbox[a3 >> 24] << 24) ^ k0,
+        (sbox[a1 & 0xFF] | sbox[(a2 >> 8) & 0xFF] << 8 | sbox[(a3 >> 16) & 0xFF] << 16 | sbox[a0 >> 24] << 24) ^ k1,
+        (sbox[a2 & 0xFF] | sbox[(a3 >> 8) & 0xFF] << 8 | sbox[(a0 >> 16) & 0xFF] << 16 | sbox[a1 >> 24] << 24) ^ k2,
+        (sbox[a3 & 0xFF] | sbox[(a0 >> 8) & 0xFF] << 8 | sbox[(a1 >> 16) & 0xFF] << 16 | sbox[a2 >> 24] << 24) ^ k3,
+    )
+
+def criptografar_cbc(dados, chaves, tabela, iv, tabelas_t=None, num_rodadas=10, padding=True):
+    """
+    Criptografa dados no modo CBC: cada bloco em claro recebe um XOR com o bloco cifrado anterior
+    (o IV, no primeiro) antes da cifra. Como cada bloco depende do anterior, a criptografia é
+    necessariamente serial; as rodadas usam as T-tables em inteiros do Python, bloco a bloco.
+    Args:
+        dados (bytes): Dados a serem criptografados.
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+        iv (bytes): Vetor de inicialização de 16 bytes (imprevisível e novo a cada mensagem).
+        tabelas_t (numpy.ndarray, opcional): T-tables pré-calculadas.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+        padding (bool, opcional): Aplica o padding PKCS#7; sem ele, os dados devem ser múltiplos de 16 bytes.
+    Returns:
+        bytes: Dados criptografados.
+    Raises:
+        ValueError: Se o IV não tiver 16 bytes, ou se os dados não forem múltiplos de 16 sem padding.
+    """
+    if len(iv) != TAMANHO_IV:
+        raise ValueError(f"O IV deve ter {TAMANHO_IV} bytes.")
+    if padding:
+        dados = adicionar_padding_pkcs7(dados)
+    elif len(dados) % 16:
+        raise ValueError("Sem padding, os dados devem ter um múltiplo de 16 bytes.")
+    tabela = tabela_para_array(tabela)
+    if tabelas_t is None:
+        tabelas_t = gerar_tabelas_t(tabela)
+    t0, t1, t2, t3 = tabelas_t.tolist()
+    sbox = tabela.tolist()
+    chaves_colunas = [tuple(k) for k in _colunas(chaves_para_array(chaves)).tolist()]
+    anterior = _colunas(bytes_para_estado(iv))[0].tolist()
+    claros = _colunas(bytes_para_estado(dados))
+    # Palavras cifradas acumuladas em um array compacto (sem uma tupla por bloco)
+    cifrados = array('I')
+    # Os blocos são convertidos em inteiros do Python por partes, limitando a memória
+    for inicio in range(0, len(claros), BLOCOS_POR_PAGINA):
+        for b0, b1, b2, b3 in claros[inicio:inicio + BLOCOS_POR_PAGINA].tolist():
+            anterior = _criptografar_bloco(
+                b0 ^ anterior[0], b1 ^ anterior[1], b2 ^ anterior[2], b3 ^ anterior[3],
+                t0, t1, t2, t3, sbox, chaves_colunas, num_rodadas
+            )
+            cifrados.extend(anterior)
+    colunas = np.frombuffer(cifrados, dtype=np.uint32).astype('<u4', copy=False).reshape(-1, 4)
+    return colunas.view(np.uint8).reshape(-1, 4, 4).transpose(0, 2, 1).tobytes()
+
+def descriptografar_cbc(dados, chaves, tabela_inversa, iv, tabelas_t_inversas=None, chaves_inversas=None, num_rodadas=10,
+                        padding=True, executor=None):
+    """
+    Descriptografa dados no modo CBC. Ao contrário da criptografia, a descriptografia é paralela:
+    todos os blocos passam de uma vez pelas rodadas inversas vetorizadas (ou pelo executor, que pode
+    dividi-los entre vários núcleos) e o encadeamento se resume a um único XOR com os blocos cifrados
+    deslocados de uma posição (o IV, no primeiro).
+    Args:
+        dados (bytes): Dados criptografados (múltiplo de 16 bytes).
+        chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+        tabela_inversa (dict | numpy.ndarray): Tabela de substituição inversa.
+        iv (bytes): Vetor de inicialização de 16 bytes usado na criptografia.
+        tabelas_t_inversas (numpy.ndarray, opcional): T-tables de `gerar_tabelas_t_inversas`.
+        chaves_inversas (numpy.ndarray, opcional): Chaves de `gerar_chaves_inversas`.
+        num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+        padding (bool, opcional): Remove o padding PKCS#7.
+        executor (ExecutorParalelo | motores.Motor, opcional): Executor das rodadas inversas (ex.: vários núcleos).
+    Returns:
+        bytes: Dados descriptografados.
+    Raises:
+        ValueError: Se o IV não tiver 16 bytes, se os dados não forem múltiplos de 16 ou se o padding for inválido.
+    """
+    if len(iv) != TAMANHO_IV:
+        raise ValueError(f"O IV deve ter {TAMANHO_IV} bytes.")
+    if len(dados) % 16:
+        raise ValueError("Os dados criptografados devem ter um múltiplo de 16 bytes.")
+    cifrados = np.frombuffer(dados, dtype=np.uint8)
+    if len(cifrados) == 0:
+        return b"" if not padding else remover_padding_pkcs7(b"")
+    estado = cifrados.reshape(-1, 4, 4)
+    if executor is not None:
+        estado = executor.descriptografar(estado)
+    else:
+        estado = descriptografar_ttable(estado, chaves, tabela_inversa, tabelas_t_inversas, chaves_inversas, num_rodadas)
+    # Encadeamento: P[i] = D(C[i]) ^ C[i - 1], com C[-1] = IV, em um único XOR deslocado
+    anteriores = np.concatenate((np.frombuffer(iv, dtype=np.uint8), cifrados[:-16]))
+    resultado = (np.asarray(estado, dtype=np.uint8).reshape(-1) ^ anteriores).tobytes()
+    return remover_padding_pkcs7(resultado) if padding else resultado
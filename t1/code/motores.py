@@ -0,0 +1,175 @@
+import numpy as np
+from aes_core import (
+    criptografar,
+    descriptografar,
+    criptografar_estado,
+    descriptografar_estado,
+    criptografar_ttable,
+    descriptografar_ttable
+)
+from aes_bitslice import criptografar_bitslice, descriptografar_bitslice
+from paralelo import ExecutorParalelo
+from aes_openssl import CifraLibcrypto
+
+# Motor usado quando nenhum é escolhido
+MOTOR_PADRAO = "ttable"
+
+class Motor:
+    """
+    Motor de cifra selecionável por nome. Todos os motores têm o mesmo contrato:
+    `criptografar(estado)` e `descriptografar(estado)` recebem e devolvem arrays (N, 4, 4) uint8,
+    de modo que podem ser usados no lugar do executor paralelo em `fluxo` e `descriptografar_texto`.
+    Os motores podem ser chamados por vários threads ao mesmo tempo (ex.: `fluxo.verificar_ida_e_volta`
+    criptografa um pedaço enquanto descriptografa o anterior): nenhum guarda estado mutável sem trava.
+    """
+
+    def __init__(self, nome, criptografar, descriptografar, fechar=None, modificado=True):
+        """
+        Args:
+            nome (str): Nome do motor no registro.
+            criptografar (callable): Função estado -> estado criptografado.
+            descriptografar (callable): Função estado -> estado descriptografado.
+            fechar (callable, opcional): Libera os recursos do motor (processos, contextos nativos).
+            modificado (bool, opcional): False se o motor não implementa o AES modificado
+                                         (ex.: a referência da libcrypto, com a S-Box padrão).
+        """
+        self.nome = nome
+        self.criptografar = criptografar
+        self.descriptografar = descriptografar
+        self._fechar = fechar
+        self.modificado = modificado
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def fechar(self):
+        """Libera os recursos do motor."""
+        if self._fechar is not None:
+            self._fechar()
+            self._fechar = None
+
+def _motor_referencia(contexto, trabalhadores=None):
+    """Implementação escalar original, bloco a bloco (`criptografar`/`descriptografar`)."""
+    tabela = dict(enumerate(contexto.tabela_array.tolist()))
+    tabela_inversa = dict(enumerate(contexto.tabela_inversa_array.tolist()))
+    chaves = contexto.chaves_array.reshape(-1, 16).tolist()
+    num_rodadas = contexto.num_rodadas
+    return Motor(
+        "referencia",
+        lambda estado: np.array(criptografar(list(estado), chaves, tabela, num_rodadas), dtype=np.uint8).reshape(-1, 4, 4),
+        lambda estado: np.array(descriptografar(list(estado), chaves, tabela_inversa, num_rodadas), dtype=np.uint8).reshape(-1, 4, 4),
+    )
+
+def _motor_vetorizado(contexto, trabalhadores=None):
+    """Motor vetorizado: cada etapa da rodada aplicada a todos os blocos de uma vez."""
+    return Motor(
+        "vetorizado",
+        lambda estado: criptografar_estado(estado, contexto.chaves_array, contexto.tabela_array, contexto.num_rodadas),
+        lambda estado: descriptografar_estado(estado, contexto.chaves_array, contexto.tabela_inversa_array, contexto.num_rodadas),
+    )
+
+def _motor_ttable(contexto, trabalhadores=None):
+    """Motor T-table com as tabelas pré-calculadas do contexto."""
+    return Motor(
+        "ttable",
+        lambda estado: criptografar_ttable(
+            estado, contexto.chaves_array, contexto.tabela_array, contexto.tabelas_t, contexto.num_rodadas
+        ),
+        lambda estado: descriptografar_ttable(
+            estado, contexto.chaves_array, contexto.tabela_inversa_array,
+            contexto.tabelas_t_inversas, contexto.chaves_inversas, contexto.num_rodadas
+        ),
+    )
+
+def _motor_bitslice(contexto, trabalhadores=None):
+    """Motor bitsliced (planos de bits uint64)."""
+    return Motor(
+        "bitslice",
+        lambda estado: criptografar_bitslice(estado, contexto.chaves_array, contexto.tabela_array, contexto.num_rodadas),
+        lambda estado: descriptografar_bitslice(estado, contexto.chaves_array, contexto.tabela_inversa_array, contexto.num_rodadas),
+    )
+
+def _motor_paralelo(contexto, trabalhadores=None):
+    """Motor T-table distribuído entre vários processos (ver `paralelo.ExecutorParalelo`)."""
+    executor = ExecutorParalelo(
+        contexto.chaves_array, contexto.tabela_array, contexto.tabela_inversa_array,
+        trabalhadores or None, contexto.num_rodadas
+    )
+    return Motor("paralelo", executor.criptografar, executor.descriptografar, executor.fechar)
+
+def _motor_libcrypto(contexto, trabalhadores=None):
+    """
+    AES-128 padrão da libcrypto (ECB, sem padding), com a mesma chave de 16 bytes.
+    Não produz o AES modificado: serve como referência de desempenho, medida em memória.
+    """
+    cifra = CifraLibcrypto(contexto.chave_array.tobytes(), cifra="aes-128-ecb", padding=False)
+    return Motor(
+        "libcrypto",
+        lambda estado: cifra.criptografar(np.ascontiguousarray(estado, dtype=np.uint8)).reshape(-1, 4, 4),
+        lambda estado: cifra.descriptografar(np.ascontiguousarray(estado, dtype=np.uint8)).reshape(-1, 4, 4),
+        cifra.fechar,
+        modificado=False,
+    )
+
+def com_memo(motor, memo, id_chave):
+    """
+    Envolve um motor com um memo de blocos: blocos repetidos são atendidos pelo memo e só os
+    inéditos passam pelas rodadas do motor original.
+    Args:
+        motor (Motor): Motor de cifra do AES modificado.
+        memo (memo.MemoBlocos): Memo de blocos (esvaziado automaticamente quando `id_chave` muda).
+        id_chave (hashable): Impressão digital da chave e da tabela do motor.
+    Returns:
+        Motor: Motor com o mesmo contrato, que fecha o motor original ao ser fechado.
+    """
+    return Motor(
+        f"{motor.nome}+memo",
+        lambda estado: memo.criptografar(estado, motor.criptografar, id_chave),
+        lambda estado: memo.descriptografar(estado, motor.descriptografar, id_chave),
+        motor.fechar,
+        modificado=motor.modificado,
+    )
+
+# Registro de motores: nome -> fábrica(contexto, trabalhadores) que devolve um Motor
+_MOTORES = {
+    "referencia": _motor_referencia,
+    "vetorizado": _motor_vetorizado,
+    "ttable": _motor_ttable,
+    "bitslice": _motor_bitslice,
+    "paralelo": _motor_paralelo,
+    "libcrypto": _motor_libcrypto,
+}
+
+def registrar_motor(nome, fabrica):
+    """
+    Registra (ou substitui) um motor.
+    Args:
+        nome (str): Nome pelo qual o motor será selecionado.
+        fabrica (callable): Função (contexto, trabalhadores) -> Motor.
+    """
+    _MOTORES[nome] = fabrica
+
+def nomes_motores():
+    """Retorna os nomes dos motores registrados."""
+    return list(_MOTORES)
+
+def criar_motor(nome, contexto, trabalhadores=None):
+    """
+    Cria um motor a partir do contexto de chave compilado.
+    Args:
+        nome (str): Nome do motor (ver `nomes_motores`).
+        contexto (contexto_chave.ContextoChave): Contexto de chave compilado.
+        trabalhadores (int, opcional): Número de processos (usado pelo motor paralelo).
+    Returns:
+        Motor: O motor pronto para uso.
+    Raises:
+        ValueError: Se o motor não estiver registrado.
+        OSError: Se o motor depender de uma biblioteca indisponível (ex.: libcrypto).
+    """
+    fabrica = _MOTORES.get(nome)
+    if fabrica is None:
+        raise ValueError(f"Motor '{nome}' desconhecido. Disponíveis: {', '.join(_MOTORES)}.")
+    return fabrica(contexto, trabalhadores)
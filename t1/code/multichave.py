@@ -0,0 +1,167 @@
+import json
+import numpy as np
+from aes_core import criptografar_ttable_multichave, descriptografar_ttable_multichave
+from contexto_chave import ContextoChave, obter_contexto, registrar_contexto
+
+class ContextosEmpilhados:
+    """
+    Contextos de várias chaves (um por cliente/key.json) com as chaves de rodada, as S-Boxes e as
+    T-tables empilhadas em arrays únicos, indexados pela posição de cada contexto.
+    Contextos repetidos (mesma impressão digital `id_chave`) ocupam uma única posição.
+    """
+
+    def __init__(self, contextos):
+        """
+        Args:
+            contextos (iterable): Contextos de chave compilados (`ContextoChave`).
+        Raises:
+            ValueError: Se a lista estiver vazia ou se os contextos tiverem números de rodadas diferentes.
+        """
+        self.posicoes = {}
+        unicos = []
+        for contexto in contextos:
+            if contexto.id_chave not in self.posicoes:
+                self.posicoes[contexto.id_chave] = len(unicos)
+                unicos.append(contexto)
+        if not unicos:
+            raise ValueError("Nenhum contexto de chave informado.")
+        self.num_rodadas = unicos[0].num_rodadas
+        if any(contexto.num_rodadas != self.num_rodadas for contexto in unicos):
+            raise ValueError("Todos os contextos devem ter o mesmo número de rodadas.")
+        self.chaves = np.stack([contexto.chaves_array for contexto in unicos])
+        self.chaves_inversas = np.stack([contexto.chaves_inversas for contexto in unicos])
+        self.tabelas = np.stack([contexto.tabela_array for contexto in unicos])
+        self.tabelas_inversas = np.stack([contexto.tabela_inversa_array for contexto in unicos])
+        self.tabelas_t = np.stack([contexto.tabelas_t for contexto in unicos]).astype(np.uint32)
+        self.tabelas_t_inversas = np.stack([contexto.tabelas_t_inversas for contexto in unicos]).astype(np.uint32)
+
+    def __len__(self):
+        return len(self.posicoes)
+
+    def posicao(self, contexto):
+        """
+        Retorna a posição de um contexto nos arrays empilhados.
+        Raises:
+            KeyError: Se o contexto não fizer parte do empilhamento.
+        """
+        return self.posicoes[contexto.id_chave]
+
+def _ler_configuracoes(arquivo_dados, conteudo):
+    """
+    Interpreta o conteúdo de um key.json e valida a tabela de substituição e a chave.
+    Returns:
+        tuple: (tabela como dict int -> int, chave como lista de 16 inteiros).
+    Raises:
+        ValueError: Se o JSON for inválido ou a tabela e a chave estiverem ausentes ou incompletas.
+    """
+    try:
+        dados = json.loads(conteudo)
+        tabela = {int(chave): int(valor) for chave, valor in dados["tabela"].items()}
+        chave = [int(byte) for byte in dados["chave"]]
+    except (json.JSONDecodeError, UnicodeDecodeError, AttributeError, KeyError, TypeError, ValueError):
+        raise ValueError(f"{arquivo_dados}: o key.json deve conter uma tabela e uma chave válidas.")
+    if sorted(tabela) != list(range(256)) or sorted(tabela.values()) != list(range(256)):
+        raise ValueError(f"{arquivo_dados}: a tabela deve ser uma permutação de 0-255.")
+    if len(chave) != 16 or not all(0 <= byte <= 255 for byte in chave):
+        raise ValueError(f"{arquivo_dados}: a chave deve ter 16 bytes.")
+    return tabela, chave
+
+def carregar_contexto(arquivo_dados):
+    """
+    Obtém o contexto compilado de um key.json: do cache em memória ou do sidecar `.ctx` quando o
+    conteúdo não mudou; caso contrário, compila o contexto e o registra nos dois.
+    Ao contrário do `GerenciadorAES`, o arquivo do cliente nunca é criado, normalizado ou reescrito.
+    Args:
+        arquivo_dados (str): Caminho do key.json do cliente.
+    Returns:
+        ContextoChave: Contexto compilado.
+    Raises:
+        OSError: Se o arquivo não puder ser lido.
+        ValueError: Se o arquivo não tiver uma tabela e uma chave válidas.
+    """
+    with open(arquivo_dados, "rb") as f:
+        conteudo = f.read()
+    contexto = obter_contexto(arquivo_dados, conteudo)
+    if contexto is None:
+        tabela, chave = _ler_configuracoes(arquivo_dados, conteudo)
+        contexto = ContextoChave.compilar(tabela, chave)
+        registrar_contexto(arquivo_dados, conteudo, contexto)
+    return contexto
+
+def _juntar_mensagens(pares, empilhados):
+    """
+    Coloca todas as mensagens em um único estado (N, 4, 4), com padding de zeros por mensagem,
+    e monta o índice da chave de cada bloco.
+    Returns:
+        tuple: (estado, índices por bloco, limites (início, fim) de cada mensagem em bytes).
+    """
+    tamanhos = [len(mensagem) + (16 - len(mensagem) % 16) % 16 for _, mensagem in pares]
+    fins = np.cumsum(tamanhos)
+    dados = np.zeros(int(fins[-1]) if tamanhos else 0, dtype=np.uint8)
+    limites = []
+    inicio = 0
+    for (_, mensagem), fim in zip(pares, fins.tolist()):
+        dados[inicio:inicio + len(mensagem)] = np.frombuffer(mensagem, dtype=np.uint8)
+        limites.append((inicio, fim))
+        inicio = fim
+    posicoes = np.array([empilhados.posicao(contexto) for contexto, _ in pares], dtype=np.intp)
+    indices = np.repeat(posicoes, np.array(tamanhos, dtype=np.intp) // 16)
+    return dados.reshape(-1, 4, 4), indices, limites
+
+def criptografar_multichave(pares, empilhados=None):
+    """
+    Criptografa várias mensagens, cada uma com a sua chave, em uma única passada vetorizada.
+    Mensagens pequenas de centenas de clientes são processadas juntas, sem um gerenciador por cliente.
+    Args:
+        pares (list): Pares (ContextoChave, mensagem em bytes).
+        empilhados (ContextosEmpilhados, opcional): Contextos já empilhados (reaproveitados entre chamadas);
+                                                     se omitido, são empilhados a partir dos pares.
+    Returns:
+        list: Mensagens criptografadas (bytes, com padding de zeros até múltiplos de 16), na ordem dos pares.
+    """
+    if not pares:
+        return []
+    if empilhados is None:
+        empilhados = ContextosEmpilhados(contexto for contexto, _ in pares)
+    estado, indices, limites = _juntar_mensagens(pares, empilhados)
+    cifrado = criptografar_ttable_multichave(
+        estado, indices, empilhados.chaves, empilhados.tabelas, empilhados.tabelas_t, empilhados.num_rodadas
+    ).reshape(-1)
+    return [cifrado[inicio:fim].tobytes() for inicio, fim in limites]
+
+def descriptografar_multichave(pares, empilhados=None, tamanhos=None):
+    """
+    Descriptografa várias mensagens, cada uma com a sua chave, em uma única passada vetorizada.
+    Args:
+        pares (list): Pares (ContextoChave, mensagem criptografada em bytes, múltiplo de 16).
+        empilhados (ContextosEmpilhados, opcional): Contextos já empilhados (reaproveitados entre chamadas).
+        tamanhos (list, opcional): Tamanho original (em bytes) de cada mensagem, na ordem dos pares.
+                                   Se omitido, os zeros finais são removidos, o que só é seguro para
+                                   texto: bytes nulos legítimos no fim da mensagem também seriam descartados.
+    Returns:
+        list: Mensagens descriptografadas (bytes, sem o padding), na ordem dos pares.
+    Raises:
+        ValueError: Se alguma mensagem não tiver um múltiplo de 16 bytes, ou se os tamanhos não
+                    corresponderem às mensagens.
+    """
+    if not pares:
+        return []
+    if any(len(mensagem) % 16 for _, mensagem in pares):
+        raise ValueError("As mensagens criptografadas devem ter um múltiplo de 16 bytes.")
+    if tamanhos is not None:
+        tamanhos = list(tamanhos)
+        if len(tamanhos) != len(pares) or any(
+            not len(mensagem) - 16 < tamanho <= len(mensagem)
+            for (_, mensagem), tamanho in zip(pares, tamanhos)
+        ):
+            raise ValueError("Os tamanhos originais não correspondem às mensagens criptografadas.")
+    if empilhados is None:
+        empilhados = ContextosEmpilhados(contexto for contexto, _ in pares)
+    estado, indices, limites = _juntar_mensagens(pares, empilhados)
+    claro = descriptografar_ttable_multichave(
+        estado, indices, empilhados.chaves_inversas, empilhados.tabelas_inversas,
+        empilhados.tabelas_t_inversas, empilhados.num_rodadas
+    ).reshape(-1)
+    if tamanhos is not None:
+        return [claro[inicio:inicio + tamanho].tobytes() for (inicio, _), tamanho in zip(limites, tamanhos)]
+    return [claro[inicio:fim].tobytes().rstrip(b'\x00') for inicio, fim in limites]
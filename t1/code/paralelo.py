@@ -0,0 +1,152 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from aes_core import (
+    chaves_para_array,
+    tabela_para_array,
+    gerar_tabelas_t,
+    gerar_tabelas_t_inversas,
+    gerar_chaves_inversas,
+    criptografar_ttable,
+    descriptografar_ttable
+)
+
+# Abaixo deste número de blocos por trabalhador, o custo de distribuir o trabalho
+# supera o ganho e o processamento é feito no próprio processo
+MINIMO_BLOCOS_POR_TRABALHADOR = 4096
+
+# Contexto da chave em cada processo trabalhador, recebido uma única vez na inicialização
+_contexto = None
+
+def _inicializar_trabalhador(contexto):
+    """Guarda, no processo trabalhador, as chaves expandidas e as tabelas (enviadas uma única vez)."""
+    global _contexto
+    _contexto = contexto
+
+def _processar_fatia(nome_memoria, num_blocos, inicio, fim, inverso):
+    """
+    Processa, no lugar, a fatia [inicio, fim) dos blocos guardados na memória compartilhada.
+    Apenas o nome do segmento e os limites da fatia atravessam o processo; os dados não são serializados.
+    """
+    chaves, tabela, tabelas_t, tabela_inversa, tabelas_t_inversas, chaves_inversas, num_rodadas = _contexto
+    memoria = shared_memory.SharedMemory(name=nome_memoria)
+    try:
+        estado = np.ndarray((num_blocos, 4, 4), dtype=np.uint8, buffer=memoria.buf)
+        if inverso:
+            estado[inicio:fim] = descriptografar_ttable(
+                estado[inicio:fim], chaves, tabela_inversa, tabelas_t_inversas, chaves_inversas, num_rodadas
+            )
+        else:
+            estado[inicio:fim] = criptografar_ttable(estado[inicio:fim], chaves, tabela, tabelas_t, num_rodadas)
+        del estado
+    finally:
+        memoria.close()
+
+class ExecutorParalelo:
+    """
+    Executa o AES modificado em vários núcleos, dividindo os blocos entre um pool de processos.
+    Os blocos ficam em um segmento de `multiprocessing.shared_memory` e cada trabalhador processa
+    uma fatia contígua no lugar. Como cada bloco é independente, a saída é idêntica à do caminho serial.
+    """
+
+    def __init__(self, chaves, tabela, tabela_inversa, trabalhadores=None, num_rodadas=10,
+                 minimo_blocos=MINIMO_BLOCOS_POR_TRABALHADOR):
+        """
+        Args:
+            chaves (list | numpy.ndarray): Chaves expandidas retornadas por `expansao_chave`.
+            tabela (dict | numpy.ndarray): Tabela de substituição (S-Box).
+            tabela_inversa (dict | numpy.ndarray): Tabela de substituição inversa.
+            trabalhadores (int, opcional): Número de processos; padrão é o número de núcleos.
+            num_rodadas (int, opcional): Número de rodadas do AES (padrão é 10).
+            minimo_blocos (int, opcional): Mínimo de blocos por trabalhador para usar o pool.
+        """
+        self.trabalhadores = trabalhadores or os.cpu_count() or 1
+        self.minimo_blocos = minimo_blocos
+        self.num_rodadas = num_rodadas
+        tabela = tabela_para_array(tabela)
+        tabela_inversa = tabela_para_array(tabela_inversa)
+        chaves = chaves_para_array(chaves)
+        self._contexto = (
+            chaves, tabela, gerar_tabelas_t(tabela),
+            tabela_inversa, gerar_tabelas_t_inversas(tabela_inversa), gerar_chaves_inversas(chaves, num_rodadas),
+            num_rodadas
+        )
+        self._pool = None
+        # Protege a criação e o encerramento do pool: o executor pode ser usado por vários threads
+        self._trava = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def _obter_pool(self):
+        """Cria o pool de processos na primeira utilização."""
+        with self._trava:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.trabalhadores,
+                    initializer=_inicializar_trabalhador,
+                    initargs=(self._contexto,)
+                )
+            return self._pool
+
+    def fechar(self):
+        """Encerra o pool de processos."""
+        with self._trava:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def _executar(self, estado, inverso):
+        """Divide o estado entre os trabalhadores e devolve o resultado em um novo array (N, 4, 4)."""
+        estado = np.asarray(estado, dtype=np.uint8).reshape(-1, 4, 4)
+        num_blocos = len(estado)
+        trabalhadores = min(self.trabalhadores, num_blocos // self.minimo_blocos)
+        if trabalhadores <= 1:
+            # Entrada pequena: o processamento serial é mais rápido que distribuir o trabalho
+            chaves, tabela, tabelas_t, tabela_inversa, tabelas_t_inversas, chaves_inversas, num_rodadas = self._contexto
+            if inverso:
+                return descriptografar_ttable(estado, chaves, tabela_inversa, tabelas_t_inversas, chaves_inversas, num_rodadas)
+            return criptografar_ttable(estado, chaves, tabela, tabelas_t, num_rodadas)
+        memoria = shared_memory.SharedMemory(create=True, size=num_blocos * 16)
+        try:
+            compartilhado = np.ndarray(estado.shape, dtype=np.uint8, buffer=memoria.buf)
+            compartilhado[:] = estado
+            limites = np.linspace(0, num_blocos, trabalhadores + 1, dtype=np.int64)
+            pool = self._obter_pool()
+            tarefas = [
+                pool.submit(_processar_fatia, memoria.name, num_blocos, int(inicio), int(fim), inverso)
+                for inicio, fim in zip(limites[:-1], limites[1:])
+            ]
+            for tarefa in tarefas:
+                tarefa.result()
+            resultado = compartilhado.copy()
+            del compartilhado
+        finally:
+            memoria.close()
+            memoria.unlink()
+        return resultado
+
+    def criptografar(self, estado):
+        """
+        Criptografa um estado (N, 4, 4) em paralelo.
+        Args:
+            estado (numpy.ndarray): Array (N, 4, 4) uint8 com os blocos em claro.
+        Returns:
+            numpy.ndarray: Novo array (N, 4, 4) uint8 com os blocos criptografados.
+        """
+        return self._executar(estado, inverso=False)
+
+    def descriptografar(self, estado):
+        """
+        Descriptografa um estado (N, 4, 4) em paralelo.
+        Args:
+            estado (numpy.ndarray): Array (N, 4, 4) uint8 com os blocos criptografados.
+        Returns:
+            numpy.ndarray: Novo array (N, 4, 4) uint8 com os blocos descriptografados.
+        """
+        return self._executar(estado, inverso=True)
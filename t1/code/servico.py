@@ -0,0 +1,299 @@
+import sys
+import json
+import signal
+import time
+import asyncio
+import argparse
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from aes_core import bytes_para_estado, bytes_para_texto
+from aes_manager import GerenciadorAES
+
+# Janela padrão de agrupamento (segundos): pedidos que chegam nesse intervalo são processados juntos
+JANELA_PADRAO = 0.002
+# Número máximo de blocos em um único lote
+MAXIMO_BLOCOS_LOTE = 1 << 16
+# Número máximo de blocos aceitos e ainda não respondidos; acima disso, a leitura de novos pedidos é suspensa
+MAXIMO_BLOCOS_PENDENTES = 1 << 20
+# Tamanho máximo de uma linha do protocolo (um pedido)
+LIMITE_LINHA = 64 << 20
+# Quantidade de latências guardadas para o cálculo dos percentis
+AMOSTRAS_LATENCIA = 10000
+
+def _estimar_blocos(pedido):
+    """Estima o número de blocos de um pedido, usado na contrapressão antes de decodificá-lo."""
+    try:
+        if "texto" in pedido:
+            # Até 4 bytes por caractere em UTF-8
+            tamanho = len(pedido["texto"]) * 4
+        else:
+            tamanho = len(pedido.get("dados", "")) // 2
+    except TypeError:
+        return 0
+    return (tamanho + 15) // 16
+
+class AgrupadorBlocos:
+    """
+    Junta os blocos de vários pedidos pequenos em um único lote por operação, processado em uma
+    só chamada do motor de cifra, e devolve a cada pedido apenas os seus blocos.
+    Um lote é disparado quando a janela de agrupamento termina ou quando atinge `maximo_blocos`.
+    """
+
+    def __init__(self, motor, janela=JANELA_PADRAO, maximo_blocos=MAXIMO_BLOCOS_LOTE,
+                 maximo_pendentes=MAXIMO_BLOCOS_PENDENTES):
+        """
+        Args:
+            motor (motores.Motor): Motor de cifra usado nos lotes.
+            janela (float, opcional): Tempo máximo (segundos) que um pedido espera por outros.
+            maximo_blocos (int, opcional): Número máximo de blocos por lote.
+            maximo_pendentes (int, opcional): Número máximo de blocos aceitos e ainda não respondidos.
+        """
+        self.motor = motor
+        self.janela = janela
+        self.maximo_blocos = maximo_blocos
+        self.maximo_pendentes = maximo_pendentes
+        # Por operação: lista de (estado, futuro) aguardando o próximo lote
+        self._fila = {"criptografar": [], "descriptografar": []}
+        self._blocos_na_fila = {"criptografar": 0, "descriptografar": 0}
+        self._temporizador = {"criptografar": None, "descriptografar": None}
+        self._pendentes = 0
+        self._liberado = asyncio.Condition()
+        # Um único thread processa os lotes, mantendo o laço de eventos livre para aceitar pedidos
+        self._cifra = ThreadPoolExecutor(max_workers=1)
+        self.contadores = {"pedidos": 0, "blocos": 0, "lotes": 0, "erros": 0, "segundos_cifra": 0.0}
+        self.latencias = collections.deque(maxlen=AMOSTRAS_LATENCIA)
+
+    async def admitir(self, num_blocos):
+        """Aguarda até que haja espaço para mais `num_blocos` blocos pendentes (contrapressão)."""
+        async with self._liberado:
+            # Um pedido maior que o limite é aceito sozinho, para não bloquear para sempre
+            await self._liberado.wait_for(
+                lambda: self._pendentes == 0 or self._pendentes + num_blocos <= self.maximo_pendentes
+            )
+            self._pendentes += num_blocos
+
+    async def liberar(self, num_blocos):
+        """Devolve o espaço de `num_blocos` blocos já respondidos."""
+        async with self._liberado:
+            self._pendentes -= num_blocos
+            self._liberado.notify_all()
+
+    async def processar(self, operacao, estado):
+        """
+        Enfileira um estado (N, 4, 4) e aguarda o resultado do lote em que ele for processado.
+        Args:
+            operacao (str): "criptografar" ou "descriptografar".
+            estado (numpy.ndarray): Blocos do pedido.
+        Returns:
+            numpy.ndarray: Blocos processados, na mesma ordem.
+        """
+        futuro = asyncio.get_running_loop().create_future()
+        self._fila[operacao].append((estado, futuro))
+        self._blocos_na_fila[operacao] += len(estado)
+        if self._blocos_na_fila[operacao] >= self.maximo_blocos:
+            self._disparar(operacao)
+        elif self._temporizador[operacao] is None:
+            self._temporizador[operacao] = asyncio.get_running_loop().call_later(self.janela, self._disparar, operacao)
+        return await futuro
+
+    def _disparar(self, operacao):
+        """Retira os pedidos da fila da operação e agenda o processamento do lote."""
+        if self._temporizador[operacao] is not None:
+            self._temporizador[operacao].cancel()
+            self._temporizador[operacao] = None
+        pedidos = self._fila[operacao]
+        if not pedidos:
+            return
+        self._fila[operacao] = []
+        self._blocos_na_fila[operacao] = 0
+        asyncio.get_running_loop().create_task(self._processar_lote(operacao, pedidos))
+
+    async def _processar_lote(self, operacao, pedidos):
+        """Processa os blocos de todos os pedidos em uma única chamada e distribui os resultados."""
+        tamanhos = [len(estado) for estado, _ in pedidos]
+        lote = np.concatenate([estado for estado, _ in pedidos]) if len(pedidos) > 1 else pedidos[0][0]
+        funcao = self.motor.criptografar if operacao == "criptografar" else self.motor.descriptografar
+        inicio = time.perf_counter()
+        try:
+            resultado = await asyncio.get_running_loop().run_in_executor(self._cifra, funcao, lote)
+        except Exception as e:
+            for _, futuro in pedidos:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+        self.contadores["segundos_cifra"] += time.perf_counter() - inicio
+        self.contadores["lotes"] += 1
+        self.contadores["blocos"] += len(lote)
+        # Devolve a cada pedido a sua fatia do lote
+        limites = np.cumsum([0] + tamanhos)
+        for (_, futuro), comeco, fim in zip(pedidos, limites[:-1], limites[1:]):
+            if not futuro.done():
+                futuro.set_result(resultado[comeco:fim])
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do serviço e os percentis de latência dos pedidos recentes.
+        Returns:
+            dict: Pedidos, blocos, lotes, erros, blocos por lote, vazão da cifra e latências p50/p99 (ms).
+        """
+        contadores = dict(self.contadores)
+        latencias = np.array(self.latencias) if self.latencias else np.zeros(1)
+        contadores["blocos_pendentes"] = self._pendentes
+        contadores["blocos_por_lote"] = contadores["blocos"] / contadores["lotes"] if contadores["lotes"] else 0.0
+        contadores["mb_s_cifra"] = (
+            contadores["blocos"] * 16 / contadores["segundos_cifra"] / 1e6 if contadores["segundos_cifra"] else 0.0
+        )
+        contadores["latencia_p50_ms"] = float(np.percentile(latencias, 50) * 1000)
+        contadores["latencia_p99_ms"] = float(np.percentile(latencias, 99) * 1000)
+        return contadores
+
+    def fechar(self):
+        """Encerra o thread de processamento dos lotes."""
+        self._cifra.shutdown()
+
+class ServicoAES:
+    """
+    Serviço local do AES modificado (asyncio, TCP ou socket Unix) que mantém as chaves expandidas
+    e as tabelas carregadas e agrupa os blocos de pedidos concorrentes.
+
+    Protocolo: uma linha JSON por pedido e por resposta (as respostas podem chegar fora de ordem):
+        {"id": 1, "op": "criptografar", "texto": "..."}     (ou "dados": "<hex>")
+        {"id": 2, "op": "descriptografar", "dados": "<hex>"}
+        {"id": 3, "op": "estatisticas"}
+    Respostas: {"id": ..., "ok": true, "dados": "<hex>"} (a descriptografia inclui também "texto"),
+    ou {"id": ..., "ok": false, "erro": "..."}.
+    """
+
+    def __init__(self, gerenciador, janela=JANELA_PADRAO, maximo_blocos=MAXIMO_BLOCOS_LOTE,
+                 maximo_pendentes=MAXIMO_BLOCOS_PENDENTES):
+        """
+        Args:
+            gerenciador (GerenciadorAES): Gerenciador com a chave carregada.
+            janela (float, opcional): Janela de agrupamento, em segundos.
+            maximo_blocos (int, opcional): Número máximo de blocos por lote.
+            maximo_pendentes (int, opcional): Número máximo de blocos aceitos e ainda não respondidos.
+        """
+        self.gerenciador = gerenciador
+        self.agrupador = AgrupadorBlocos(gerenciador.motor, janela, maximo_blocos, maximo_pendentes)
+
+    def _decodificar(self, pedido):
+        """Converte um pedido em (operação, estado)."""
+        operacao = pedido.get("op")
+        if operacao not in ("criptografar", "descriptografar"):
+            raise ValueError(f"Operação inválida: {operacao!r}.")
+        if operacao == "criptografar" and "texto" in pedido:
+            dados = pedido["texto"].encode("utf-8")
+        else:
+            dados = bytes.fromhex(pedido.get("dados", ""))
+        if operacao == "descriptografar" and len(dados) % 16:
+            raise ValueError("O texto criptografado deve ter um número inteiro de blocos de 16 bytes.")
+        return operacao, bytes_para_estado(dados)
+
+    async def _atender(self, pedido, escritor, trava):
+        """Processa um pedido já admitido e escreve a resposta."""
+        inicio = time.perf_counter()
+        resposta = {"id": pedido.get("id"), "ok": True}
+        num_blocos = pedido.pop("_blocos", 0)
+        try:
+            if pedido.get("op") == "estatisticas":
+                resposta["estatisticas"] = self.agrupador.estatisticas()
+            else:
+                operacao, estado = self._decodificar(pedido)
+                resultado = (await self.agrupador.processar(operacao, estado)).tobytes()
+                resposta["dados"] = resultado.hex()
+                if operacao == "descriptografar":
+                    resposta["texto"] = bytes_para_texto(resultado)
+                self.agrupador.contadores["pedidos"] += 1
+                self.agrupador.latencias.append(time.perf_counter() - inicio)
+        except Exception as e:
+            self.agrupador.contadores["erros"] += 1
+            resposta = {"id": pedido.get("id"), "ok": False, "erro": str(e)}
+        finally:
+            await self.agrupador.liberar(num_blocos)
+        async with trava:
+            escritor.write(json.dumps(resposta).encode() + b"\n")
+            await escritor.drain()
+
+    async def _conexao(self, leitor, escritor):
+        """Lê os pedidos de uma conexão; a leitura é suspensa enquanto o serviço está saturado."""
+        trava = asyncio.Lock()
+        tarefas = set()
+        try:
+            while True:
+                try:
+                    linha = await leitor.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    escritor.write(json.dumps({"ok": False, "erro": "Pedido maior que o limite."}).encode() + b"\n")
+                    break
+                if not linha:
+                    break
+                try:
+                    pedido = json.loads(linha)
+                except json.JSONDecodeError:
+                    pedido = None
+                if not isinstance(pedido, dict):
+                    pedido = {"op": None}
+                pedido["_blocos"] = _estimar_blocos(pedido)
+                await self.agrupador.admitir(pedido["_blocos"])
+                tarefa = asyncio.create_task(self._atender(pedido, escritor, trava))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+            if tarefas:
+                await asyncio.gather(*tarefas)
+        finally:
+            escritor.close()
+
+    async def servir(self, host="127.0.0.1", porta=8765, caminho_unix=None):
+        """
+        Inicia o serviço e atende conexões até ser interrompido.
+        Args:
+            host (str, opcional): Endereço TCP.
+            porta (int, opcional): Porta TCP.
+            caminho_unix (str, opcional): Se informado, escuta em um socket Unix em vez de TCP.
+        """
+        if caminho_unix:
+            servidor = await asyncio.start_unix_server(self._conexao, path=caminho_unix, limit=LIMITE_LINHA)
+            print(f"Serviço AES escutando em {caminho_unix}")
+        else:
+            servidor = await asyncio.start_server(self._conexao, host, porta, limit=LIMITE_LINHA)
+            print(f"Serviço AES escutando em {host}:{porta}")
+        # SIGINT/SIGTERM encerram o serviço de forma ordenada, exibindo os contadores
+        parada = asyncio.Event()
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            try:
+                asyncio.get_running_loop().add_signal_handler(sinal, parada.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        try:
+            async with servidor:
+                await parada.wait()
+        finally:
+            self.agrupador.fechar()
+            print(json.dumps(self.agrupador.estatisticas(), indent=2))
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local do AES modificado com agrupamento de blocos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="Caminho de um socket Unix (no lugar de TCP).")
+    parser.add_argument("--janela", type=float, default=JANELA_PADRAO * 1000, help="Janela de agrupamento, em ms.")
+    parser.add_argument("--max-lote", type=int, default=MAXIMO_BLOCOS_LOTE, help="Blocos por lote.")
+    parser.add_argument("--max-pendentes", type=int, default=MAXIMO_BLOCOS_PENDENTES,
+                        help="Blocos aceitos e ainda não respondidos antes de suspender a leitura.")
+    parser.add_argument("-m", "--motor", default=None, help="Motor de cifra (ver motores.py).")
+    parser.add_argument("-j", "--trabalhadores", type=int, default=1)
+    args = parser.parse_args()
+
+    try:
+        gerenciador = GerenciadorAES(trabalhadores=args.trabalhadores, motor=args.motor)
+    except ValueError as erro:
+        parser.error(str(erro))
+    servico = ServicoAES(gerenciador, args.janela / 1000, args.max_lote, args.max_pendentes)
+    try:
+        asyncio.run(servico.servir(args.host, args.porta, args.unix))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from aes_core import tabela_para_array
+
+# Tabelas pontuadas por vez em cada processo (limita a memória: ~40 MB por lote de 64)
+TAMANHO_LOTE = 64
+# Lotes entregues a cada tarefa do pool (amortiza o custo de despachar tarefas)
+LOTES_POR_TAREFA = 16
+# Critérios de pontuação, do mais importante ao menos importante (menor é melhor em todos)
+CRITERIOS = ("uniformidade_diferencial", "linearidade", "pontos_fixos", "desvio_avalanche")
+
+# Sinal (-1)^paridade de cada byte: (-1)^<mascara, S(x)> = _SINAL[mascara & S(x)]
+_SINAL = np.array([1 - 2 * (bin(x).count("1") & 1) for x in range(256)], dtype=np.float32)
+# Matriz de Hadamard 16x16: a transformada de 256 pontos é H16 ⊗ H16
+_HADAMARD_16 = np.array([[_SINAL[i & j] for j in range(16)] for i in range(16)], dtype=np.float32)
+_ENTRADAS = np.arange(256, dtype=np.uint8)
+_MASCARAS = np.arange(1, 256, dtype=np.uint8)
+
+def gerar_candidatas(quantidade, rng):
+    """
+    Gera tabelas de substituição aleatórias (permutações de 0-255), todas de uma vez.
+    Args:
+        quantidade (int): Número de tabelas.
+        rng (numpy.random.Generator): Gerador de números aleatórios.
+    Returns:
+        numpy.ndarray: Tabelas (quantidade, 256) uint8.
+    """
+    return rng.permuted(np.tile(_ENTRADAS, (quantidade, 1)), axis=1)
+
+def uniformidade_diferencial(tabelas):
+    """
+    Calcula a uniformidade diferencial: o maior valor da DDT (tabela de distribuição de diferenças)
+    fora da diferença de entrada nula. Quanto menor, mais resistente à criptoanálise diferencial
+    (a S-Box do AES tem 4; permutações aleatórias ficam em torno de 10).
+    Args:
+        tabelas (numpy.ndarray): Tabelas (B, 256) uint8.
+    Returns:
+        numpy.ndarray: Uniformidade de cada tabela (B,).
+    """
+    quantidade = len(tabelas)
+    # Diferença de saída S(x) ^ S(x ^ a) para cada tabela, diferença de entrada a != 0 e x
+    diferencas = tabelas[:, None, :] ^ tabelas[:, _MASCARAS[:, None] ^ _ENTRADAS[None, :]]
+    # Contagem de cada diferença de saída por (tabela, a): uma única chamada a bincount para o lote inteiro
+    linhas = np.arange(quantidade * 255, dtype=np.int32).reshape(quantidade, 255, 1) * 256
+    contagens = np.bincount((linhas + diferencas).ravel(), minlength=quantidade * 255 * 256)
+    return contagens.reshape(quantidade, 255 * 256).max(axis=1)
+
+def walsh_hadamard(valores):
+    """
+    Transformada rápida de Walsh–Hadamard sobre o último eixo (tamanho 256).
+    Como H256 = H16 ⊗ H16, cada vetor é visto como uma matriz 16x16 (x = 16 * alto + baixo) e a
+    transformada vira H16 @ X @ H16: dois produtos de matrizes pequenas, que o numpy executa em lote
+    muito mais rápido que os 8 estágios de borboletas com passos curtos. Em float32 o resultado é exato.
+    Args:
+        valores (numpy.ndarray): Array (..., 256) com valores ±1.
+    Returns:
+        numpy.ndarray: Espectro de Walsh (..., 256), em float32.
+    """
+    forma = valores.shape
+    matrizes = np.asarray(valores, dtype=np.float32).reshape(-1, 16, 16)
+    return np.matmul(np.matmul(_HADAMARD_16, matrizes), _HADAMARD_16).reshape(forma)
+
+def linearidade(tabelas):
+    """
+    Calcula a linearidade: o maior |W| do espectro de Walsh (LAT) entre todas as combinações
+    lineares não nulas das saídas. A não linearidade é 128 - linearidade / 2
+    (112 na S-Box do AES; permutações aleatórias ficam em torno de 94).
+    Args:
+        tabelas (numpy.ndarray): Tabelas (B, 256) uint8.
+    Returns:
+        numpy.ndarray: Linearidade de cada tabela (B,).
+    """
+    # Funções componentes (-1)^<b, S(x)> para cada máscara de saída b != 0
+    espectro = walsh_hadamard(_SINAL[_MASCARAS[None, :, None] & tabelas[:, None, :]])
+    return np.maximum(espectro.max(axis=(1, 2)), -espectro.min(axis=(1, 2))).astype(np.int64)
+
+def pontos_fixos(tabelas):
+    """
+    Conta os pontos fixos (S(x) = x) e os pontos fixos opostos (S(x) = x ^ 0xFF) de cada tabela.
+    Args:
+        tabelas (numpy.ndarray): Tabelas (B, 256) uint8.
+    Returns:
+        numpy.ndarray: Quantidade de pontos fixos de cada tabela (B,).
+    """
+    return (tabelas == _ENTRADAS).sum(axis=1) + (tabelas == (_ENTRADAS ^ 0xFF)).sum(axis=1)
+
+def desvio_avalanche(tabelas):
+    """
+    Mede o critério de avalanche estrito (SAC): para cada bit de entrada invertido, cada bit de saída
+    deveria mudar com probabilidade 1/2. Retorna o maior desvio |p - 1/2| entre os 64 pares de bits.
+    Args:
+        tabelas (numpy.ndarray): Tabelas (B, 256) uint8.
+    Returns:
+        numpy.ndarray: Desvio de cada tabela (B,).
+    """
+    bits_entrada = (1 << np.arange(8)).astype(np.uint8)
+    # Mudança na saída ao inverter cada bit de entrada: (B, 8, 256)
+    mudancas = tabelas[:, None, :] ^ tabelas[:, _ENTRADAS[None, :] ^ bits_entrada[:, None]]
+    # Frequência de mudança de cada bit de saída: (B, 8, 8)
+    frequencias = np.unpackbits(mudancas[..., None], axis=-1).mean(axis=2)
+    return np.abs(frequencias - 0.5).max(axis=(1, 2))
+
+def pontuar_lote(tabelas):
+    """
+    Pontua um lote de tabelas em todos os critérios, de forma vetorizada.
+    Args:
+        tabelas (numpy.ndarray): Tabelas (B, 256) uint8.
+    Returns:
+        dict: Critério -> array (B,) com o valor de cada tabela.
+    """
+    return {
+        "uniformidade_diferencial": uniformidade_diferencial(tabelas),
+        "linearidade": linearidade(tabelas),
+        "pontos_fixos": pontos_fixos(tabelas),
+        "desvio_avalanche": desvio_avalanche(tabelas),
+    }
+
+def pontuar_tabela(tabela):
+    """
+    Pontua uma única tabela de substituição (ex.: a do key.json).
+    Args:
+        tabela (dict | numpy.ndarray): Tabela de substituição.
+    Returns:
+        dict: Critério -> valor, incluindo a não linearidade.
+    """
+    pontuacao = {nome: valores[0].item() for nome, valores in pontuar_lote(tabela_para_array(tabela)[None, :]).items()}
+    pontuacao["nao_linearidade"] = 128 - pontuacao["linearidade"] // 2
+    return pontuacao
+
+def _melhores(tabelas, pontuacoes, top_k):
+    """Seleciona as `top_k` melhores tabelas, ordenadas pelos critérios em ordem de prioridade."""
+    # lexsort usa a última chave como a principal
+    ordem = np.lexsort([pontuacoes[nome] for nome in reversed(CRITERIOS)])[:top_k]
+    return tabelas[ordem], {nome: valores[ordem] for nome, valores in pontuacoes.items()}
+
+def _juntar(atual, novo, top_k):
+    """Combina dois conjuntos (tabelas, pontuações) mantendo apenas as `top_k` melhores."""
+    if atual is None:
+        return _melhores(*novo, top_k)
+    tabelas = np.concatenate((atual[0], novo[0]))
+    pontuacoes = {nome: np.concatenate((atual[1][nome], novo[1][nome])) for nome in CRITERIOS}
+    return _melhores(tabelas, pontuacoes, top_k)
+
+def _triar_tarefa(semente, quantidade, top_k, tamanho_lote):
+    """Gera e pontua `quantidade` candidatas em lotes, devolvendo as `top_k` melhores desta tarefa."""
+    rng = np.random.default_rng(semente)
+    melhores = None
+    for inicio in range(0, quantidade, tamanho_lote):
+        tabelas = gerar_candidatas(min(tamanho_lote, quantidade - inicio), rng)
+        melhores = _juntar(melhores, (tabelas, pontuar_lote(tabelas)), top_k)
+    return melhores
+
+def triar(quantidade, top_k=10, trabalhadores=None, semente=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Gera `quantidade` tabelas candidatas e mantém as `top_k` melhores, distribuindo os lotes
+    entre um pool de processos. Cada tarefa devolve apenas as suas `top_k` melhores, de modo que
+    a memória e a comunicação não crescem com a quantidade de candidatas.
+    Args:
+        quantidade (int): Número de tabelas candidatas.
+        top_k (int, opcional): Número de tabelas mantidas.
+        trabalhadores (int, opcional): Número de processos (1 = serial; padrão é o número de núcleos).
+        semente (int, opcional): Semente para uma triagem reproduzível.
+        tamanho_lote (int, opcional): Tabelas pontuadas por vez em cada processo.
+    Returns:
+        tuple: (tabelas (top_k, 256) uint8, dict critério -> array (top_k,)), da melhor para a pior.
+    Raises:
+        ValueError: Se `quantidade`, `top_k` ou `tamanho_lote` forem menores que 1.
+    """
+    if quantidade < 1 or top_k < 1 or tamanho_lote < 1:
+        raise ValueError("A quantidade de candidatas, o número de tabelas mantidas e o lote devem ser maiores que zero.")
+    por_tarefa = tamanho_lote * LOTES_POR_TAREFA
+    quantidades = [min(por_tarefa, quantidade - inicio) for inicio in range(0, quantidade, por_tarefa)]
+    # Sementes independentes por tarefa: o resultado não depende do número de processos
+    sementes = np.random.SeedSequence(semente).spawn(len(quantidades))
+    argumentos = (sementes, quantidades, [top_k] * len(quantidades), [tamanho_lote] * len(quantidades))
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    melhores = None
+    if trabalhadores == 1 or len(quantidades) == 1:
+        for resultado in map(_triar_tarefa, *argumentos):
+            melhores = _juntar(melhores, resultado, top_k)
+    else:
+        with ProcessPoolExecutor(max_workers=trabalhadores) as pool:
+            for resultado in pool.map(_triar_tarefa, *argumentos):
+                melhores = _juntar(melhores, resultado, top_k)
+    return melhores
+
+def salvar_resultados(arquivo, tabelas, pontuacoes):
+    """
+    Grava as melhores tabelas em JSON, no mesmo formato de tabela do key.json.
+    Args:
+        arquivo (str): Caminho do arquivo JSON.
+        tabelas (numpy.ndarray): Tabelas (K, 256).
+        pontuacoes (dict): Critério -> array (K,).
+    """
+    resultados = []
+    for i, tabela in enumerate(tabelas):
+        pontuacao = {nome: valores[i].item() for nome, valores in pontuacoes.items()}
+        pontuacao["nao_linearidade"] = 128 - pontuacao["linearidade"] // 2
+        resultados.append({"pontuacao": pontuacao, "tabela": dict(enumerate(tabela.tolist()))})
+    with open(arquivo, "w") as f:
+        json.dump(resultados, f, indent=2)
+
+def aplicar_tabela(arquivo_dados, tabela):
+    """
+    Substitui a tabela de substituição de um key.json, preservando a chave.
+    O `GerenciadorAES` recompila o contexto na próxima carga, pois o conteúdo do arquivo muda.
+    Args:
+        arquivo_dados (str): Caminho do key.json.
+        tabela (numpy.ndarray): Nova tabela (256,).
+    """
+    try:
+        with open(arquivo_dados, "r") as f:
+            dados = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        dados = {}
+    if not isinstance(dados, dict):
+        dados = {}
+    dados["tabela"] = dict(enumerate(tabela.tolist()))
+    with open(arquivo_dados, "w") as f:
+        json.dump(dados, f, indent=2)
+
+def _formatar(pontuacao):
+    """Formata a pontuação de uma tabela em uma linha."""
+    return (f"uniformidade {pontuacao['uniformidade_diferencial']:>2}  "
+            f"não linearidade {128 - pontuacao['linearidade'] // 2:>3}  "
+            f"pontos fixos {pontuacao['pontos_fixos']:>2}  "
+            f"desvio SAC {pontuacao['desvio_avalanche']:.4f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Triagem de tabelas de substituição (S-Box) candidatas para o AES modificado.")
+    parser.add_argument("-n", "--quantidade", type=int, default=10000, help="Número de tabelas candidatas.")
+    parser.add_argument("-k", "--top", type=int, default=10, help="Número de tabelas mantidas.")
+    parser.add_argument("-j", "--trabalhadores", type=int, default=None)
+    parser.add_argument("--semente", type=int, default=None)
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="Tabelas pontuadas por vez em cada processo.")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON onde as melhores tabelas serão gravadas.")
+    parser.add_argument("--avaliar", default=None, help="key.json cuja tabela atual é pontuada para comparação.")
+    parser.add_argument("--aplicar", default=None, help="key.json que recebe a melhor tabela encontrada.")
+    args = parser.parse_args()
+    for opcao, valor in (("-n/--quantidade", args.quantidade), ("-k/--top", args.top), ("--lote", args.lote)):
+        if valor < 1:
+            parser.error(f"{opcao} deve ser maior ou igual a 1.")
+
+    if args.avaliar:
+        with open(args.avaliar, "r") as f:
+            tabela = {int(k): v for k, v in json.load(f).get("tabela", {}).items()}
+        print(f"Tabela atual:  {_formatar(pontuar_tabela(tabela))}", file=sys.stderr)
+
+    inicio = time.perf_counter()
+    tabelas, pontuacoes = triar(args.quantidade, args.top, args.trabalhadores, args.semente, args.lote)
+    segundos = time.perf_counter() - inicio
+    print(f"{args.quantidade} tabelas em {segundos:.2f} s ({args.quantidade / segundos:.0f} tabelas/s)", file=sys.stderr)
+    for i in range(len(tabelas)):
+        print(f"#{i + 1:<3} {_formatar({nome: valores[i].item() for nome, valores in pontuacoes.items()})}", file=sys.stderr)
+
+    if args.saida:
+        salvar_resultados(args.saida, tabelas, pontuacoes)
+    if args.aplicar:
+        aplicar_tabela(args.aplicar, tabelas[0])
+
+if __name__ == "__main__":
+    main()
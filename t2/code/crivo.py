@@ -0,0 +1,238 @@
+import os
+import sys
+import math
+import mmap
+import time
+import struct
+import argparse
+import numpy as np
+
+# Diretório padrão dos crivos gravados em disco
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../utils/crivos")
+# Ímpares representados por bloco de contagem (512 bytes de bits); a contagem acumulada de cada
+# bloco fica gravada, de modo que pi(x) custa uma busca e a contagem de no máximo 512 bytes
+BLOCK_ODDS = 4096
+# Ímpares peneirados por segmento: limita a memória da construção (4 MiB por segmento)
+SEGMENT_ODDS = BLOCK_ODDS * 1024
+# Menor limite gravado em disco; limites menores são arredondados para potências de dois
+MIN_LIMIT = 1 << 16
+MAGIC = b'CRIV'
+VERSION = 1
+# Cabeçalho: mágico, versão, limite, bytes de bits e número de blocos
+HEADER = struct.Struct('<4sB3xQQQ')
+
+class PrimeSieve:
+    """Crivo compactado em bits, apenas com os ímpares: o bit i (ordem little-endian) representa 2i + 1.
+    Guarda também a quantidade acumulada de primos no início de cada bloco de 4096 ímpares."""
+
+    def __init__(self, limit, bits, counts, buffer=None):
+        self.limit = limit
+        self.bits = bits
+        self.counts = counts
+        # Mantém o mmap aberto enquanto os arrays apontarem para ele
+        self._buffer = buffer
+
+    @classmethod
+    def build(cls, limit):
+        """Constrói o crivo dos números menores que 'limit' em memória."""
+        parts, counts = [], [np.zeros(1, dtype=np.uint64)]
+        for packed, block_counts in _segments(limit):
+            parts.append(packed)
+            counts.append(block_counts)
+        counts = np.cumsum(np.concatenate(counts), dtype=np.uint64)
+        return cls(limit, np.concatenate(parts), counts)
+
+    @classmethod
+    def open(cls, path):
+        """Carrega um crivo gravado em disco via mmap, sem copiar os bits. Retorna None se o arquivo for inválido."""
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(buffer) < HEADER.size:
+            return None
+        magic, version, limit, size, blocks = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION or len(buffer) != HEADER.size + size + 8 * (blocks + 1):
+            return None
+        bits = np.frombuffer(buffer, dtype=np.uint8, count=size, offset=HEADER.size)
+        counts = np.frombuffer(buffer, dtype='<u8', count=blocks + 1, offset=HEADER.size + size)
+        return cls(limit, bits, counts, buffer)
+
+    def is_prime(self, n):
+        """Teste de primalidade em tempo constante (um acesso ao bit de n)."""
+        if n >= self.limit:
+            raise ValueError(f'{n} está fora do crivo (limite {self.limit}).')
+        if n < 3:
+            return n == 2
+        if n % 2 == 0:
+            return False
+        index = n // 2
+        return bool(self.bits[index >> 3] >> (index & 7) & 1)
+
+    def _count_odd(self, end):
+        """Quantidade de bits ligados nos índices [0, end)."""
+        block = end // BLOCK_ODDS
+        start_byte = block * (BLOCK_ODDS // 8)
+        partial = np.unpackbits(self.bits[start_byte:(end + 7) // 8], bitorder='little')[:end - block * BLOCK_ODDS]
+        return int(self.counts[block]) + int(partial.sum())
+
+    def count_primes(self, x):
+        """pi(x): quantidade de primos menores ou iguais a x."""
+        if x >= self.limit:
+            raise ValueError(f'{x} está fora do crivo (limite {self.limit}).')
+        if x < 2:
+            return 0
+        # O primo 2 mais os ímpares primos 3 <= p <= x (o índice 0, o número 1, nunca está ligado)
+        return 1 + self._count_odd((x - 1) // 2 + 1)
+
+    def primes_in_range(self, start, stop, chunk=1 << 20):
+        """Gera os primos p com start <= p < stop, decodificando os bits em partes de 'chunk' ímpares."""
+        if stop > self.limit:
+            raise ValueError(f'{stop - 1} está fora do crivo (limite {self.limit}).')
+        if start <= 2 < stop:
+            yield 2
+        first = max(start, 3) // 2
+        last = max(stop // 2, first)
+        for begin in range(first, last, chunk):
+            end = min(begin + chunk, last)
+            # Decodifica os bytes que cobrem [begin, end) e descarta os bits fora do intervalo
+            low = begin & ~7
+            window = np.unpackbits(self.bits[low >> 3:(end + 7) >> 3], bitorder='little')[begin - low:end - low]
+            yield from (2 * (np.flatnonzero(window) + begin) + 1).tolist()
+
+    def save(self, path):
+        """Grava o crivo em disco, de forma atômica."""
+        _write(path, self.limit, self.bits, self.counts)
+
+def _base_primes(limit):
+    """Primos ímpares menores que 'limit' (crivo simples, usado para peneirar os segmentos)."""
+    sieve = np.ones(limit, dtype=bool)
+    sieve[:2] = False
+    for current in range(2, math.isqrt(max(limit - 1, 0)) + 1):
+        if sieve[current]:
+            sieve[current * current::current] = False
+    return np.flatnonzero(sieve)[1:].tolist()
+
+def _padded_odds(limit):
+    """Quantidade de ímpares representados no crivo de 'limit', completada até um múltiplo de BLOCK_ODDS."""
+    return -(-((limit + 1) // 2) // BLOCK_ODDS) * BLOCK_ODDS
+
+def _segments(limit, segment_odds=SEGMENT_ODDS):
+    """Peneira os ímpares menores que 'limit' por segmentos de tamanho fixo.
+    Gera, para cada segmento, os bits compactados e a quantidade de primos em cada bloco."""
+    total = _padded_odds(limit)
+    base = _base_primes(math.isqrt(max(limit - 1, 0)) + 1)
+    for first in range(0, total, segment_odds):
+        count = min(segment_odds, total - first)
+        low = 2 * first + 1
+        high = 2 * (first + count) + 1
+        segment = np.ones(count, dtype=bool)
+        if first == 0:
+            segment[0] = False  # 1 não é primo
+        for p in base:
+            start = p * p
+            if start >= high:
+                break
+            if start < low:
+                # Primeiro múltiplo ímpar de p dentro do segmento
+                start = -(-low // p) * p
+                if start % 2 == 0:
+                    start += p
+            # Múltiplos ímpares consecutivos distam 2p, ou seja, p posições
+            segment[(start - low) // 2::p] = False
+        # Números maiores ou iguais ao limite (preenchimento do último bloco)
+        segment[max(0, limit // 2 - first):] = False
+        yield np.packbits(segment, bitorder='little'), segment.reshape(-1, BLOCK_ODDS).sum(axis=1).astype(np.uint64)
+
+def _write(path, limit, bits, counts):
+    """Grava o cabeçalho, os bits e as contagens acumuladas em um arquivo temporário e o move para 'path'."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, limit, len(bits), len(counts) - 1))
+        f.write(bits.tobytes())
+        f.write(np.asarray(counts, dtype='<u8').tobytes())
+    os.replace(temporary, path)
+
+def build_file(path, limit):
+    """Constrói o crivo direto em disco, segmento a segmento: o cabeçalho (cujos tamanhos são conhecidos
+    de antemão), os bits de cada segmento e, por fim, as contagens acumuladas são gravados em um único
+    arquivo temporário, movido para 'path' ao final. A memória usada é a de um segmento mais as contagens
+    (1/1024 dos bits), mesmo para limites na casa dos bilhões. Retorna o crivo carregado via mmap."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    total = _padded_odds(limit)
+    counts = [np.zeros(1, dtype=np.uint64)]
+    try:
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, limit, total // 8, total // BLOCK_ODDS))
+            for packed, block_counts in _segments(limit):
+                f.write(packed.tobytes())
+                counts.append(block_counts)
+            f.write(np.cumsum(np.concatenate(counts), dtype=np.uint64).astype('<u8').tobytes())
+        os.replace(temporary, path)
+    except BaseException:
+        # Não deixa um arquivo parcial (possivelmente com gigabytes) para trás
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return PrimeSieve.open(path)
+
+# Crivos já carregados neste processo, do menor para o maior limite
+_sieves = []
+
+def _rounded(limit):
+    """Arredonda o limite para a próxima potência de dois (no mínimo MIN_LIMIT), limitando os arquivos em cache."""
+    return max(MIN_LIMIT, 1 << (max(limit, 2) - 1).bit_length())
+
+def get_sieve(limit, cache_dir=CACHE_DIR):
+    """Retorna um crivo que cobre todos os números menores que 'limit'.
+    Procura primeiro entre os crivos já carregados, depois no disco (via mmap); só então o constrói
+    e grava. Se o diretório não puder ser gravado, o crivo é apenas mantido em memória."""
+    for sieve in _sieves:
+        if sieve.limit >= limit:
+            return sieve
+    rounded = _rounded(limit)
+    path = os.path.join(cache_dir, f"crivo_{rounded}.bin")
+    sieve = PrimeSieve.open(path)
+    if sieve is None:
+        try:
+            sieve = build_file(path, rounded)
+        except OSError:
+            sieve = None
+        if sieve is None:
+            sieve = PrimeSieve.build(rounded)
+    _sieves.append(sieve)
+    _sieves.sort(key=lambda s: s.limit)
+    return sieve
+
+def is_prime(n):
+    """Teste de primalidade em tempo constante, usando (e, se preciso, construindo) o crivo em cache."""
+    return get_sieve(n + 1).is_prime(n)
+
+def primes_in_range(start, stop):
+    """Gera os primos p com start <= p < stop."""
+    return get_sieve(stop).primes_in_range(start, stop)
+
+def count_primes(x):
+    """pi(x): quantidade de primos menores ou iguais a x."""
+    return get_sieve(x + 1).count_primes(x)
+
+def main():
+    parser = argparse.ArgumentParser(description="Crivo de Eratóstenes segmentado, compactado em bits e em cache no disco.")
+    parser.add_argument("limite", type=int, help="Constrói (ou carrega) o crivo dos números menores que o limite.")
+    parser.add_argument("--contar", type=int, default=None, help="Exibe pi(x), a quantidade de primos <= x.")
+    parser.add_argument("--primo", type=int, default=None, help="Verifica se um número é primo.")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    sieve = get_sieve(args.limite)
+    print(f"Crivo até {sieve.limit} pronto em {time.perf_counter() - start:.3f} s "
+          f"({sieve.bits.nbytes / 1e6:.2f} MB de bits)", file=sys.stderr)
+    if args.contar is not None:
+        print(f"pi({args.contar}) = {sieve.count_primes(args.contar)}")
+    if args.primo is not None:
+        print(f"{args.primo} é primo: {sieve.is_prime(args.primo)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from quebraRSA import find_private_key, crt_key, decrypt_crt, FACTOR_TIMEOUT
+
+# Caracteres lidos por bloco da entrada (cerca de 100 mil números cifrados de 4 a 10 dígitos)
+CHUNK_SIZE = 1 << 20
+
+def read_chunks(source, chunk_size=CHUNK_SIZE):
+    """Lê um texto cifrado (números separados por espaços) em blocos de cerca de 'chunk_size' caracteres.
+    Cada bloco termina em um espaço, para que nenhum número seja dividido entre dois blocos."""
+    pending = ''
+    while data := source.read(chunk_size):
+        data = pending + data
+        # Guarda o último número (possivelmente incompleto) para o próximo bloco
+        cut = max(data.rfind(' '), data.rfind('\n'), data.rfind('\t'), data.rfind('\r'))
+        if cut < 0:
+            pending = data
+            continue
+        pending = data[cut + 1:]
+        yield data[:cut + 1]
+    if pending.strip():
+        yield pending
+
+def decrypt_chunk(text, key):
+    """Decifra um bloco de texto cifrado com a chave 'key' = (d, n, parâmetros do TCR ou None).
+    Cada valor distinto é decifrado uma única vez por bloco (o texto cifra caractere a caractere)."""
+    d, n, crt = key
+    values = text.split()
+    plain = {}
+    for value in set(values):
+        c = int(value)
+        if c >= n:
+            raise Exception(f"Valor cifrado {c} é maior ou igual a n={n}. Decriptação inválida.")
+        m = decrypt_crt(c, crt) if crt is not None else pow(c, d, n)
+        try:
+            plain[value] = chr(m)
+        except (ValueError, OverflowError):
+            raise Exception(f"Valor decifrado {m} não é um caractere válido. Chave incorreta?")
+    return ''.join([plain[value] for value in values])
+
+def decrypt_stream(source, output, d, n, p=None, q=None, workers=None, chunk_size=CHUNK_SIZE):
+    """Decifra um texto cifrado em fluxo, de 'source' para 'output', com o TCR quando p e q são conhecidos.
+    Os blocos são distribuídos entre processos (workers=1: no próprio processo) e escritos na ordem
+    original; no máximo dois blocos por processo ficam em andamento, o que limita a memória.
+    Retorna a quantidade de caracteres decifrados."""
+    key = (d, n, crt_key(d, p, q) if p is not None and q is not None else None)
+    written = 0
+    if workers == 1:
+        for text in read_chunks(source, chunk_size):
+            plain = decrypt_chunk(text, key)
+            output.write(plain)
+            written += len(plain)
+        return written
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = 2 * workers
+        running = deque()
+        for text in read_chunks(source, chunk_size):
+            running.append(executor.submit(decrypt_chunk, text, key))
+            if len(running) >= window:
+                plain = running.popleft().result()
+                output.write(plain)
+                written += len(plain)
+        while running:
+            plain = running.popleft().result()
+            output.write(plain)
+            written += len(plain)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Decifragem RSA em fluxo, com o TCR e vários processos.")
+    parser.add_argument("arquivos", nargs="*", default=["-"], help="Arquivos cifrados ('-' ou nenhum: entrada padrão).")
+    parser.add_argument("-e", type=int, required=True, help="Expoente público e.")
+    parser.add_argument("-n", type=int, required=True, help="Módulo n.")
+    parser.add_argument("-o", "--saida", default=None, help="Arquivo de saída (padrão: saída padrão).")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Processos de decifragem (1 = serial).")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="Caracteres lidos por bloco.")
+    parser.add_argument("--timeout", type=float, default=FACTOR_TIMEOUT, help="Tempo máximo, em segundos, para encontrar cada fator de n.")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    try:
+        d, p, q = find_private_key(args.e, args.n, args.timeout)
+    except Exception as ex:
+        print(f"Erro ao encontrar a chave privada: {ex}", file=sys.stderr)
+        sys.exit(1)
+    output = open(args.saida, "w", encoding="utf-8") if args.saida else sys.stdout
+    total = 0
+    try:
+        for path in args.arquivos:
+            source = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+            try:
+                total += decrypt_stream(source, output, d, args.n, p, q, args.workers, args.chunk)
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+    except Exception as ex:
+        print(f"Erro na decifragem: {ex}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"{total} caracteres decifrados ({time.perf_counter() - start:.3f} s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+import os
+import sys
+import math
+import time
+import queue
+import random
+import argparse
+import multiprocessing
+from crivo import get_sieve, primes_in_range
+
+# Até este tamanho (em bits), a divisão por tentativa até a raiz de n é instantânea e basta
+TRIAL_DIVISION_BITS = 24
+# Limite da divisão por tentativa rápida, feita no próprio processo antes das demais estratégias
+QUICK_TRIAL_LIMIT = 1 << 16
+# Iterações de Fermat: encontra fatores próximos da raiz de n
+FERMAT_ITERATIONS = 1 << 16
+# Número máximo de iterações de Pollard–Brent rho
+BRENT_ITERATIONS = 1 << 26
+# Limite B1 do Pollard p-1
+P_MINUS_1_BOUND = 1 << 20
+# Limite B1 e número de curvas do ECM (apenas o estágio 1)
+ECM_BOUND = 2000
+ECM_CURVES = 200
+# A partir deste tamanho (em bits), o ECM entra na disputa
+ECM_BITS = 48
+# Bases do teste de Miller–Rabin: determinístico para n < 3.3 * 10^24
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+MILLER_RABIN_LIMIT = 3317044064679887385961981
+# Bases aleatórias adicionais acima do limite: um composto passa com probabilidade menor que 4^-32
+MILLER_RABIN_ROUNDS = 32
+# Intervalo (em segundos) entre as verificações dos processos da disputa
+POLL_INTERVAL = 0.1
+
+class FactorizationError(Exception):
+    """As estratégias disponíveis não encontraram um fator (dentro do tempo, quando limitado)."""
+
+def _strong_probable_prime(n, a, d, s):
+    """Verifica se n (com n - 1 = d * 2^s, d ímpar) é um provável primo forte na base a."""
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+def is_probable_prime(n):
+    """Teste de primalidade de Miller–Rabin: determinístico para n < 3.3 * 10^24 e, acima disso,
+    com bases aleatórias adicionais, que rejeitam os pseudoprimos fortes das bases fixas com alta probabilidade.
+    Números cobertos pelo crivo em cache são respondidos com uma consulta ao bit."""
+    if n < 2:
+        return False
+    if n < QUICK_TRIAL_LIMIT:
+        return get_sieve(QUICK_TRIAL_LIMIT).is_prime(n)
+    for p in MILLER_RABIN_BASES:
+        if n % p == 0:
+            return n == p
+    # Escreve n - 1 = d * 2^s com d ímpar
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    if not all(_strong_probable_prime(n, a, d, s) for a in MILLER_RABIN_BASES):
+        return False
+    if n < MILLER_RABIN_LIMIT:
+        return True
+    return all(_strong_probable_prime(n, random.randrange(2, n - 1), d, s) for _ in range(MILLER_RABIN_ROUNDS))
+
+def trial_division(n, limit=None):
+    """Divisão por tentativa pelos primos menores que 'limit' (padrão: até a raiz de n).
+    Retorna o menor fator encontrado ou None."""
+    limit = min(limit or math.isqrt(n) + 1, math.isqrt(n) + 1)
+    for prime in primes_in_range(2, limit + 1):
+        if n % prime == 0 and prime < n:
+            return prime
+    return None
+
+def fermat(n, max_iterations=FERMAT_ITERATIONS):
+    """Método de Fermat: procura n = a² - b² = (a - b)(a + b), eficiente quando p e q são próximos."""
+    if n % 2 == 0:
+        return 2 if n > 2 else None
+    a = math.isqrt(n)
+    if a * a == n:
+        return a
+    a += 1
+    for _ in range(max_iterations):
+        b2 = a * a - n
+        b = math.isqrt(b2)
+        if b * b == b2:
+            return a - b if a - b > 1 else None
+        a += 1
+    return None
+
+def pollard_brent(n, max_iterations=BRENT_ITERATIONS, seed=None, attempts=8):
+    """Variante de Brent do rho de Pollard, com o MDC calculado sobre produtos de 128 diferenças.
+    Em uma falha (ciclo sem fator), recomeça com outra constante, até 'attempts' vezes."""
+    if n % 2 == 0:
+        return 2 if n > 2 else None
+    rng = random.Random(seed)
+    m = 128
+    for _ in range(attempts):
+        y, c = rng.randrange(1, n), rng.randrange(1, n)
+        g = r = q = 1
+        x = ys = y
+        while g == 1 and r <= max_iterations:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r <<= 1
+        if g == n:
+            # O produto acumulado passou pelo fator: refaz o último trecho passo a passo
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if 1 < g < n:
+            return g
+        if r > max_iterations:
+            return None
+    return None
+
+def pollard_p_minus_1(n, bound=P_MINUS_1_BOUND):
+    """Pollard p-1: encontra p quando p - 1 só tem fatores primos menores que 'bound'."""
+    if n % 2 == 0:
+        return 2 if n > 2 else None
+    a = 2
+    log_bound = math.log(bound)
+    for i, prime in enumerate(primes_in_range(2, bound)):
+        # Maior potência do primo que não ultrapassa o limite
+        a = pow(a, prime ** int(log_bound / math.log(prime)), n)
+        if i % 64 == 0:
+            g = math.gcd(a - 1, n)
+            if 1 < g < n:
+                return g
+            if g == n:
+                return None
+    g = math.gcd(a - 1, n)
+    return g if 1 < g < n else None
+
+def _ecm_double(x, z, a24, n):
+    """Duplicação de um ponto em coordenadas de Montgomery (X:Z)."""
+    s = (x + z) * (x + z) % n
+    d = (x - z) * (x - z) % n
+    t = s - d
+    return s * d % n, t * (d + a24 * t) % n
+
+def _ecm_add(x2, z2, x1, z1, xd, zd, n):
+    """Soma diferencial P2 + P1 em coordenadas de Montgomery, conhecida a diferença P2 - P1 = (xd:zd)."""
+    u = (x2 - z2) * (x1 + z1)
+    v = (x2 + z2) * (x1 - z1)
+    return zd * (u + v) * (u + v) % n, xd * (u - v) * (u - v) % n
+
+def _ecm_multiply(k, x, z, a24, n):
+    """Multiplicação escalar k * (x:z) pela escada de Montgomery."""
+    x1, z1 = x, z
+    x2, z2 = _ecm_double(x, z, a24, n)
+    for bit in bin(k)[3:]:
+        if bit == '1':
+            x1, z1 = _ecm_add(x2, z2, x1, z1, x, z, n)
+            x2, z2 = _ecm_double(x2, z2, a24, n)
+        else:
+            x2, z2 = _ecm_add(x1, z1, x2, z2, x, z, n)
+            x1, z1 = _ecm_double(x1, z1, a24, n)
+    return x1, z1
+
+def ecm(n, bound=ECM_BOUND, curves=ECM_CURVES, seed=None):
+    """Método das curvas elípticas de Lenstra (estágio 1, curvas de Montgomery com a parametrização de Suyama).
+    Cada curva funciona como um Pollard p-1 com outra ordem de grupo, o que o torna eficaz para fatores médios."""
+    if n % 2 == 0:
+        return 2 if n > 2 else None
+    rng = random.Random(seed)
+    log_bound = math.log(bound)
+    multipliers = [prime ** int(log_bound / math.log(prime)) for prime in primes_in_range(2, bound)]
+    for _ in range(curves):
+        sigma = rng.randrange(6, n - 1)
+        u = (sigma * sigma - 5) % n
+        v = 4 * sigma % n
+        x, z = pow(u, 3, n), pow(v, 3, n)
+        # a24 = (A + 2) / 4 = (v - u)³ (3u + v) / (16 u³ v)
+        denominator = 16 * x * v % n
+        g = math.gcd(denominator, n)
+        if 1 < g < n:
+            return g
+        if g == n:
+            continue
+        a24 = pow(v - u, 3, n) * (3 * u + v) * pow(denominator, -1, n) % n
+        for k in multipliers:
+            x, z = _ecm_multiply(k, x, z, a24, n)
+        g = math.gcd(z, n)
+        if 1 < g < n:
+            return g
+    return None
+
+# Estratégias disponíveis: nome -> função(n) que retorna um fator não trivial ou None
+STRATEGIES = {
+    "trial_division": trial_division,
+    "fermat": fermat,
+    "pollard_brent": pollard_brent,
+    "pollard_p_minus_1": pollard_p_minus_1,
+    "ecm": ecm,
+}
+
+def register_strategy(name, function):
+    """Registra (ou substitui) uma estratégia de fatoração: função(n) -> fator ou None."""
+    STRATEGIES[name] = function
+
+def plan_strategies(n):
+    """Escolhe as estratégias que disputam a fatoração de n, de acordo com o seu tamanho em bits."""
+    if n.bit_length() <= TRIAL_DIVISION_BITS:
+        return ["trial_division"]
+    strategies = ["fermat", "pollard_brent", "pollard_p_minus_1"]
+    if n.bit_length() >= ECM_BITS:
+        strategies.append("ecm")
+    return strategies
+
+def _race_worker(name, strategy, n, results):
+    """Executa uma estratégia em um processo da disputa e envia o resultado pela fila.
+    A função é recebida do processo pai: estratégias registradas também funcionam com spawn/forkserver."""
+    try:
+        factor = strategy(n)
+    except Exception:
+        factor = None
+    results.put((name, factor))
+
+def race(n, strategies, workers=None, timeout=None):
+    """Executa as estratégias em processos separados (no máximo 'workers' ao mesmo tempo).
+    O primeiro fator encontrado encerra a disputa e os processos restantes são terminados; um processo
+    que morre sem enviar o resultado conta como uma estratégia sem sucesso.
+    Retorna (estratégia, fator), ou (None, None) se nenhuma encontrar um fator dentro do tempo."""
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    pending = list(strategies)
+    running = {}
+    workers = workers or os.cpu_count() or 1
+    deadline = None if timeout is None else time.monotonic() + timeout
+    try:
+        while pending or running:
+            # Inicia estratégias até ocupar os trabalhadores disponíveis
+            while pending and len(running) < workers:
+                name = pending.pop(0)
+                running[name] = context.Process(target=_race_worker, args=(name, STRATEGIES[name], n, results), daemon=True)
+                running[name].start()
+            wait = POLL_INTERVAL
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None, None
+                wait = min(wait, remaining)
+            try:
+                reports = [results.get(timeout=wait)]
+            except queue.Empty:
+                reports = []
+                # Um processo encerrado normalmente já deixou o resultado na fila; os demais morreram sem enviá-lo
+                finished = [name for name, process in running.items() if process.exitcode is not None]
+                if finished:
+                    try:
+                        while True:
+                            reports.append(results.get_nowait())
+                    except queue.Empty:
+                        pass
+                    reported = {name for name, _ in reports}
+                    for name in finished:
+                        if name not in reported:
+                            running.pop(name).join()
+            for name, factor in reports:
+                running.pop(name).join()
+                if factor is not None and 1 < factor < n and n % factor == 0:
+                    return name, factor
+        return None, None
+    finally:
+        # Cancela as estratégias que ainda estão em execução
+        for process in running.values():
+            process.terminate()
+        for process in running.values():
+            process.join()
+
+def find_factor(n, workers=None, timeout=None):
+    """Encontra um fator não trivial de um n composto.
+    Fatores pequenos e n pequenos são resolvidos no próprio processo; os demais casos disputam
+    as estratégias de 'plan_strategies' (em paralelo, ou em sequência com workers=1). Com workers=1
+    e um 'timeout', as estratégias rodam uma de cada vez em um processo, que é terminado no prazo.
+    Retorna (estratégia, fator), ou (None, None) se nenhum fator for encontrado."""
+    _check_number(n)
+    if n % 2 == 0:
+        return "trial_division", 2
+    factor = trial_division(n, QUICK_TRIAL_LIMIT)
+    if factor is not None:
+        return "trial_division", factor
+    strategies = plan_strategies(n)
+    if math.isqrt(n) < QUICK_TRIAL_LIMIT:
+        # A divisão por tentativa já percorreu todos os primos até a raiz de n
+        return None, None
+    if workers == 1 and timeout is None:
+        for name in strategies:
+            factor = STRATEGIES[name](n)
+            if factor is not None:
+                return name, factor
+        return None, None
+    return race(n, strategies, workers, timeout)
+
+def _check_number(n):
+    """Valida o número a ser fatorado: um inteiro maior ou igual a 2 (0 e 1 não têm fatoração em primos)."""
+    if not isinstance(n, int) or isinstance(n, bool):
+        raise Exception(f'O número a ser fatorado deve ser inteiro (recebido: {n!r}).')
+    if n < 2:
+        raise Exception(f'O número a ser fatorado deve ser maior ou igual a 2 (recebido: {n}).')
+
+def factorize(n, workers=None, timeout=None):
+    """Fatoração completa de n. Retorna a lista ordenada dos fatores primos (com multiplicidade).
+    'timeout' limita, em segundos, a busca de cada fator; FactorizationError indica que um fator não foi encontrado."""
+    _check_number(n)
+    factors = []
+    pending = [n]
+    while pending:
+        m = pending.pop()
+        if m == 1:
+            continue
+        if is_probable_prime(m):
+            factors.append(m)
+            continue
+        _, factor = find_factor(m, workers, timeout)
+        if factor is None:
+            raise FactorizationError(f'Não foi possível fatorar {m} com as estratégias disponíveis.')
+        pending.extend((factor, m // factor))
+    return sorted(factors)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fatoração de módulos RSA com estratégias em disputa.")
+    parser.add_argument("n", nargs="+", type=int, help="Números a serem fatorados.")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Processos da disputa (1 = sequencial).")
+    parser.add_argument("--timeout", type=float, default=None, help="Tempo máximo, em segundos, por fator.")
+    args = parser.parse_args()
+    for n in args.n:
+        start = time.perf_counter()
+        try:
+            factors = factorize(n, args.workers, args.timeout)
+        except Exception as ex:
+            print(f"{n}: {ex}", file=sys.stderr)
+            continue
+        print(f"{n} = {' × '.join(map(str, factors))} ({time.perf_counter() - start:.3f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+import hashlib
+import argparse
+import numpy as np
+from decifragem import read_chunks, CHUNK_SIZE
+
+# Diretório padrão dos livros de códigos gravados em disco
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../utils/livros")
+# Maior ponto de código Unicode + 1 (chr não aceita valores maiores)
+UNICODE_LIMIT = 0x110000
+# Substitutos UTF-16: não representam caracteres e não podem ser codificados em UTF-8
+SURROGATES = (0xD800, 0xE000)
+
+def message_space(n, charset=None):
+    """Mensagens possíveis de 'encrypt_plaintext': os pontos de código menores que n
+    (ou apenas os caracteres de 'charset'). Retorna um array uint32 ordenado e sem repetições."""
+    if charset is not None:
+        points = np.unique(np.array([ord(char) for char in charset], dtype=np.uint32))
+        return points[points < min(n, UNICODE_LIMIT)]
+    points = np.arange(min(n, UNICODE_LIMIT), dtype=np.uint32)
+    return points[(points < SURROGATES[0]) | (points >= SURROGATES[1])]
+
+def _pow_vector(base, e, n):
+    """Exponenciação modular vetorizada (quadrados sucessivos) para n < 2^32: os produtos cabem em uint64."""
+    base = base.astype(np.uint64) % np.uint64(n)
+    result = np.ones_like(base)
+    modulus = np.uint64(n)
+    while e:
+        if e & 1:
+            result = result * base % modulus
+        base = base * base % modulus
+        e >>= 1
+    return result
+
+def encrypt_space(points, e, n):
+    """Cifra todas as mensagens de uma vez. Retorna os valores cifrados como strings decimais,
+    no mesmo formato de 'encrypt_plaintext'."""
+    if n < 1 << 32:
+        return [str(c) for c in _pow_vector(points, e, n).tolist()]
+    # Sem um tipo inteiro que comporte os produtos: uma exponenciação por mensagem (feita uma única vez)
+    return [str(pow(m, e, n)) for m in points.tolist()]
+
+def build_codebook(e, n, charset=None):
+    """Constrói o livro de códigos da chave pública (e, n): dicionário valor cifrado (string) -> caractere.
+    Lança uma exceção se duas mensagens tiverem o mesmo valor cifrado (e não é um expoente RSA válido para n)."""
+    points = message_space(n, charset)
+    ciphers = encrypt_space(points, e, n)
+    codebook = dict(zip(ciphers, map(chr, points.tolist())))
+    if len(codebook) != len(ciphers):
+        raise Exception(f'A cifra de (e={e}, n={n}) não é injetiva: o texto não pode ser decifrado por consulta.')
+    return codebook
+
+def _cache_path(e, n, charset, cache_dir):
+    """Arquivo do livro de códigos, identificado pela impressão digital de (e, n, charset).
+    O charset entra como o conjunto ordenado dos seus caracteres (a ordem e as repetições não mudam o livro);
+    sem charset, o marcador 'full' distingue o livro completo do de um charset vazio."""
+    space = 'full' if charset is None else 'charset:' + ''.join(sorted(set(charset)))
+    fingerprint = hashlib.sha256(f"{e}:{n}:{space}".encode('utf-8', 'surrogatepass')).hexdigest()
+    return os.path.join(cache_dir, f"livro_{fingerprint[:32]}.npz")
+
+def save_codebook(path, codebook):
+    """Grava o livro de códigos, de forma atômica: os caracteres (uint32) e os valores cifrados (texto)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp.npz"
+    plain = np.array([ord(char) for char in codebook.values()], dtype=np.uint32)
+    cipher = np.frombuffer(' '.join(codebook).encode('ascii'), dtype=np.uint8)
+    np.savez(temporary, plain=plain, cipher=cipher)
+    os.replace(temporary, path)
+
+def read_codebook(path):
+    """Carrega um livro de códigos gravado em disco. Retorna None se o arquivo não existir ou for inválido."""
+    try:
+        with np.load(path) as data:
+            plain = data['plain']
+            cipher = data['cipher'].tobytes().decode('ascii').split()
+    except (OSError, KeyError, ValueError):
+        return None
+    if len(cipher) != len(plain):
+        return None
+    return dict(zip(cipher, map(chr, plain.tolist())))
+
+def get_codebook(e, n, charset=None, cache_dir=CACHE_DIR):
+    """Retorna o livro de códigos de (e, n): do disco, se já foi construído; senão o constrói e grava.
+    Se o diretório não puder ser gravado, o livro é apenas retornado."""
+    path = _cache_path(e, n, charset, cache_dir)
+    codebook = read_codebook(path)
+    if codebook is None:
+        codebook = build_codebook(e, n, charset)
+        try:
+            save_codebook(path, codebook)
+        except OSError:
+            pass
+    return codebook
+
+def decrypt_codebook(ciphertext, codebook):
+    """Decifra um texto cifrado apenas por consultas ao livro de códigos, sem fatoração nem exponenciação."""
+    values = ciphertext.split()
+    try:
+        return ''.join(map(codebook.__getitem__, values))
+    except KeyError:
+        # Aceita representações não canônicas (zeros à esquerda) antes de desistir
+        chars = []
+        for value in values:
+            char = codebook.get(value) or codebook.get(str(int(value)))
+            if char is None:
+                raise Exception(f"Valor cifrado {value} não está no livro de códigos (chave ou conjunto de caracteres incorreto).")
+            chars.append(char)
+        return ''.join(chars)
+
+def decrypt_stream_codebook(source, output, codebook, chunk_size=CHUNK_SIZE):
+    """Decifra um texto cifrado em fluxo, de 'source' para 'output', por consultas ao livro de códigos.
+    Retorna a quantidade de caracteres decifrados."""
+    written = 0
+    for text in read_chunks(source, chunk_size):
+        plain = decrypt_codebook(text, codebook)
+        output.write(plain)
+        written += len(plain)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Decifragem RSA por livro de códigos (textos cifrados caractere a caractere).")
+    parser.add_argument("arquivos", nargs="*", default=["-"], help="Arquivos cifrados ('-' ou nenhum: entrada padrão).")
+    parser.add_argument("-e", type=int, required=True, help="Expoente público e.")
+    parser.add_argument("-n", type=int, required=True, help="Módulo n.")
+    parser.add_argument("-o", "--saida", default=None, help="Arquivo de saída (padrão: saída padrão).")
+    parser.add_argument("--charset", default=None, help="Restringe o livro aos caracteres informados.")
+    parser.add_argument("--sem-cache", action="store_true", help="Não lê nem grava o livro de códigos em disco.")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    try:
+        if args.sem_cache:
+            codebook = build_codebook(args.e, args.n, args.charset)
+        else:
+            codebook = get_codebook(args.e, args.n, args.charset)
+    except Exception as ex:
+        print(f"Erro ao construir o livro de códigos: {ex}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Livro de códigos com {len(codebook)} entradas pronto em {time.perf_counter() - start:.3f} s", file=sys.stderr)
+    output = open(args.saida, "w", encoding="utf-8") if args.saida else sys.stdout
+    total = 0
+    try:
+        for path in args.arquivos:
+            source = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+            try:
+                total += decrypt_stream_codebook(source, output, codebook)
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+    except Exception as ex:
+        print(f"Erro na decifragem: {ex}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"{total} caracteres decifrados ({time.perf_counter() - start:.3f} s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
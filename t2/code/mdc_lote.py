@@ -0,0 +1,232 @@
+import os
+import re
+import sys
+import math
+import shutil
+import tempfile
+import time
+import argparse
+from itertools import islice
+from decimal import Decimal, Context, localcontext, MAX_PREC, MAX_EMAX, MIN_EMIN
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from quebraRSA import mod_inverse
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+# Inteiros de precisão arbitrária: GMP (gmpy2) quando disponível; senão, inteiros do módulo decimal.
+# A multiplicação do int do Python é Karatsuba e a sua divisão é quadrática; a libmpdec multiplica
+# por transformada (NTT) e divide pelo método de Newton, o que mantém as árvores quase lineares.
+_integer = gmpy2.mpz if gmpy2 is not None else Decimal
+# Contexto exato para os inteiros decimais: precisão e expoente máximos, sem arredondamento
+_CONTEXT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+# Módulos por bloco: limita a memória e o tamanho das tarefas enviadas aos processos
+CHUNK_SIZE = 1 << 12
+# Linha com exatamente dois inteiros: (e, n), como em utils/exemplos.txt ou "e n"
+_INTEGER = re.compile(r'\d+')
+
+def read_public_keys(path):
+    """Lê chaves públicas (e, n) de um arquivo (ou da entrada padrão, com '-'), linha a linha.
+    Linhas com exatamente dois inteiros são interpretadas como (e, n); as demais são ignoradas."""
+    source = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        for line in source:
+            numbers = _INTEGER.findall(line)
+            if len(numbers) == 2:
+                yield int(numbers[0]), int(numbers[1])
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+def _gcd(a, b):
+    """MDC de dois inteiros de qualquer um dos tipos (int, mpz ou Decimal inteiro)."""
+    if gmpy2 is not None:
+        return int(gmpy2.gcd(a, b))
+    return math.gcd(int(a), int(b))
+
+def product_tree(values):
+    """Árvore de produtos: o nível 0 são os valores e cada nível seguinte multiplica os pares do anterior.
+    O último nível contém um único elemento, o produto de todos os valores."""
+    tree = [list(values)]
+    with localcontext(_CONTEXT):
+        while len(tree[-1]) > 1:
+            level = tree[-1]
+            tree.append([level[i] * level[i + 1] if i + 1 < len(level) else level[i] for i in range(0, len(level), 2)])
+    return tree
+
+def remainder_tree(tree, value, square=False):
+    """Árvore de restos: reduz 'value' módulo cada nó, da raiz até as folhas.
+    Retorna value mod folha (ou value mod folha², com square=True) para cada folha da árvore de produtos."""
+    remainders = [value]
+    with localcontext(_CONTEXT):
+        for level in reversed(tree):
+            remainders = [remainders[i // 2] % (node * node if square else node) for i, node in enumerate(level)]
+    return remainders
+
+def batch_gcd(moduli):
+    """MDC em lote de Bernstein: para cada n_i, calcula mdc(n_i, produto dos demais módulos)
+    em tempo quase linear, com P mod n_i² e uma única divisão por n_i."""
+    moduli = [_integer(n) for n in moduli]
+    tree = product_tree(moduli)
+    remainders = remainder_tree(tree, tree[-1][0], square=True)
+    with localcontext(_CONTEXT):
+        return [_gcd(remainder // n, n) for remainder, n in zip(remainders, moduli)]
+
+def chunk_product(chunk):
+    """Produto dos módulos de um bloco (topo da sua árvore de produtos)."""
+    return product_tree([_integer(n) for n in chunk])[-1][0]
+
+def chunk_gcds(chunk, remainder):
+    """MDC em lote de um bloco, dado 'remainder' = P mod (produto do bloco)², onde P é o produto de todos os módulos.
+    Como n_i² divide o quadrado do produto do bloco, a árvore de restos do próprio bloco leva a P mod n_i².
+    Retorna mdc(n_i, (P mod n_i²) / n_i) para cada módulo do bloco."""
+    chunk = [_integer(n) for n in chunk]
+    remainders = remainder_tree(product_tree(chunk), remainder, square=True)
+    with localcontext(_CONTEXT):
+        return [_gcd(r // n, n) for r, n in zip(remainders, chunk)]
+
+def _chunks(iterable, size):
+    """Divide um iterável em listas de até 'size' elementos."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def _ordered(executor, function, tasks, window):
+    """Aplica 'function' às tarefas (tuplas de argumentos), no executor ou no próprio processo,
+    e gera os resultados na ordem das tarefas, com no máximo 'window' tarefas em andamento."""
+    if executor is None:
+        for task in tasks:
+            yield function(*task)
+        return
+    running = deque()
+    for task in tasks:
+        running.append(executor.submit(function, *task))
+        if len(running) >= window:
+            yield running.popleft().result()
+    while running:
+        yield running.popleft().result()
+
+def find_shared_factors(moduli, chunk_size=CHUNK_SIZE, workers=None):
+    """Encontra os módulos que compartilham um fator com algum outro, em duas passadas sobre 'moduli'
+    (um iterável que pode ser percorrido duas vezes, como um arquivo relido):
+    1. calcula o produto de cada bloco e uma árvore de produtos sobre esses produtos, cuja raiz é P;
+    2. relê os blocos e desce P mod (produto do bloco)² pela árvore de restos de cada bloco.
+    Apenas os produtos dos blocos ficam em memória; os blocos são distribuídos entre processos.
+    Retorna um dicionário índice -> divisor compartilhado (pode ser o próprio n, se ele
+    compartilhar os dois fatores com outros módulos ou for repetido)."""
+    executor = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+    window = 2 * (workers or os.cpu_count() or 1)
+    found = {}
+    try:
+        products = list(_ordered(executor, chunk_product, ((chunk,) for chunk in _chunks(moduli, chunk_size)), window))
+        if not products:
+            return found
+        # Árvore de produtos sobre os blocos: P mod (produto do bloco)² para cada bloco
+        tree = product_tree(products)
+        remainders = remainder_tree(tree, tree[-1][0], square=True)
+        del tree, products
+        tasks = zip(_chunks(moduli, chunk_size), remainders)
+        for number, gcds in enumerate(_ordered(executor, chunk_gcds, tasks, window)):
+            for offset, g in enumerate(gcds):
+                if g != 1:
+                    found[number * chunk_size + offset] = g
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return found
+
+def _split(n, others):
+    """Procura, entre outros módulos distintos, um que compartilhe apenas um fator com n. Retorna o fator ou None."""
+    for other in others:
+        g = math.gcd(n, other)
+        if 1 < g < n:
+            return g
+    return None
+
+def recover_keys(keys, shared):
+    """Para cada chave com fator compartilhado, obtém p e q e calcula d com 'mod_inverse'.
+    'keys' associa o índice de cada chave afetada ao par (e, n). Os módulos afetados são agrupados
+    por valor: cada valor distinto é separado uma única vez. Quando o divisor encontrado é o próprio n,
+    ele é comparado apenas com os demais valores distintos (um conjunto pequeno); o que não puder
+    ser separado é reportado como módulo repetido.
+    Retorna uma lista de dicionários com e, n, p, q, d e o status de cada chave."""
+    groups = {}
+    for index in sorted(shared):
+        groups.setdefault(keys[index][1], []).append(index)
+    distinct = list(groups)
+    factors = {}
+    for n, indices in groups.items():
+        g = max(shared[index] for index in indices)
+        if g == n:
+            g = _split(n, (other for other in distinct if other != n))
+        factors[n] = g if g is not None and g != n else None
+    results = []
+    for index in sorted(shared):
+        e, n = keys[index]
+        result = {"index": index, "e": e, "n": n, "p": None, "q": None, "d": None}
+        g = factors[n]
+        if g is None:
+            result["status"] = "duplicado"
+        else:
+            p, q = sorted((g, n // g))
+            result.update(p=p, q=q)
+            try:
+                result["d"] = mod_inverse(e, (p - 1) * (q - 1))
+                result["status"] = "quebrada"
+            except Exception:
+                # Os fatores foram encontrados, mas e não é coprimo com phi: d não existe
+                result["status"] = "fatorada"
+        results.append(result)
+    return results
+
+class _Moduli:
+    """Módulos de um arquivo de chaves, relido do início a cada iteração."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        return (n for _, n in read_public_keys(self.path))
+
+def audit(path, chunk_size=CHUNK_SIZE, workers=None):
+    """Audita as chaves públicas de um arquivo: encontra as que compartilham fatores e recupera as chaves privadas.
+    O arquivo é lido em fluxo (a entrada padrão é copiada para um arquivo temporário, para ser relida) e
+    apenas as chaves afetadas ficam em memória. Retorna (quantidade de chaves, resultados)."""
+    spool = None
+    if path == '-':
+        spool = tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.txt', delete=False)
+        with spool:
+            shutil.copyfileobj(sys.stdin, spool)
+        path = spool.name
+    try:
+        shared = find_shared_factors(_Moduli(path), chunk_size, workers)
+        # Última passada: guarda apenas (e, n) das chaves afetadas
+        keys = {}
+        total = 0
+        for index, key in enumerate(read_public_keys(path)):
+            total += 1
+            if index in shared:
+                keys[index] = key
+    finally:
+        if spool is not None:
+            os.remove(spool.name)
+    return total, recover_keys(keys, shared)
+
+def main():
+    parser = argparse.ArgumentParser(description="Ataque de MDC em lote sobre coleções de módulos RSA.")
+    parser.add_argument("arquivo", help="Arquivo com as chaves públicas (e, n), uma por linha ('-' para a entrada padrão).")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SIZE, help="Módulos por bloco.")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Processos dos cruzamentos entre blocos (1 = serial).")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    total, results = audit(args.arquivo, args.chunk, args.workers)
+    for result in results:
+        print(f"[{result['status']}] e={result['e']} n={result['n']} p={result['p']} q={result['q']} d={result['d']}")
+    print(f"{total} chaves, {len(results)} com fator compartilhado ({time.perf_counter() - start:.3f} s)",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,27 @@
-import math
+import argparse
+from crivo import primes_in_range
+from fatoracao import factorize, FactorizationError
+
+# Tempo máximo padrão, em segundos, para encontrar cada fator de n
+FACTOR_TIMEOUT = 30.0
 
 def sieve_of_eratosthenes(limit):
     """Gera todos os números primos menores que 'limit' usando o Crivo de Eratóstenes."""
-    # Inicializa uma lista que assume que todos os números são primos
-    sieve = [True] * limit
-    sieve[0:2] = [False, False]  # Define 0 e 1 como não primos
-    # Itera até a raiz quadrada de 'limit' para marcar múltiplos de cada número como não primos
-    for current in range(2, int(math.sqrt(limit)) + 1):
-        if sieve[current]:  # Verifica se o número é primo
-            for multiple in range(current * current, limit, current):
-                sieve[multiple] = False  # Marca os múltiplos como não primos
-    # Retorna a lista de números primos
-    primes = [num for num, is_prime in enumerate(sieve) if is_prime]
-    return primes
+    # O crivo segmentado e compactado em bits (crivo.py) fica em cache no disco e em memória,
+    # então chamadas repetidas não reconstroem a lista de números a cada vez
+    return list(primes_in_range(2, limit))
 
 def extended_gcd(a, b):
     """Algoritmo de Euclides estendido. gcd=Greatest Common Divisor
     Retorna uma tupla (gcd, x, y) tal que a*x + b*y = gcd."""
-    if b == 0:
-        return (a, 1, 0)  # Caso base
-    else:
-        gcd, x1, y1 = extended_gcd(b, a % b)
-        x = y1
-        y = x1 - (a // b) * y1
-        return (gcd, x, y)
+    # Versão iterativa: a recursiva excede o limite de recursão do Python para módulos de 2048 bits
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while b != 0:
+        quotient = a // b
+        a, b = b, a - quotient * b
+        x0, x1 = x1, x0 - quotient * x1
+        y0, y1 = y1, y0 - quotient * y1
+    return (a, x0, y0)
 
 def mod_inverse(e, phi):
     """Encontra o inverso modular de e mod phi."""
@@ -33,25 +31,21 @@ def mod_inverse(e, phi):
     else:
         return x % phi  # Ajusta o resultado para estar no intervalo [0, phi-1]
 
-def find_private_key(e, n):
-    """Encontra a chave privada d dado e & n."""
-    primes = sieve_of_eratosthenes(1024)  # Gera números primos entre 1 e 1024 para fatorar n
-    p = None
-    q = None
-    # Tenta encontrar os fatores primos "p" e "q" de n
-    for prime in primes:
-        if n % prime == 0:
-            p = prime
-            q = n // p
-            if q in primes:
-                break
-            else:
-                p = None
-                q = None
-    if p is None or q is None:
+def find_private_key(e, n, timeout=FACTOR_TIMEOUT):
+    """Encontra a chave privada d dado e & n.
+    'timeout' limita, em segundos, a busca de cada fator (None: sem limite)."""
+    # Fatora n com o motor de fatoração (a estratégia é escolhida pelo tamanho de n);
+    # um n inválido é reportado como tal, e não como fatores não encontrados
+    try:
+        factors = factorize(n, timeout=timeout)
+    except FactorizationError:
+        factors = []
+    # n deve ser o produto de dois primos p e q
+    if len(factors) != 2:
         raise Exception('Fatores primos p e q não encontrados com os limites fornecidos.')
-    # Calcula o totiente de n
-    phi = (p - 1) * (q - 1)
+    p, q = factors
+    # Calcula o totiente de n (p * (p - 1) quando p = q)
+    phi = p * (p - 1) if p == q else (p - 1) * (q - 1)
     # Calcula o inverso modular de e
     d = mod_inverse(e, phi)
     return d, p, q
@@ -62,21 +56,43 @@ def encrypt_plaintext(plaintext, e, n):
     ciphertext = [str(pow(ord(char), e, n)) for char in plaintext]
     return ' '.join(ciphertext)  # Retorna os valores cifrados como uma string
 
-def decrypt_ciphertext(ciphertext, d, n):
-    """Decifra o texto cifrado usando a chave privada d e módulo n."""
+def crt_key(d, p, q):
+    """Pré-calcula os parâmetros do Teorema Chinês do Resto (dp, dq, qInv) da chave privada.
+    Retorna None quando p = q, caso em que o TCR não se aplica."""
+    if p == q:
+        return None
+    # Expoentes reduzidos: c^d mod p = c^(d mod (p-1)) mod p, pelo pequeno teorema de Fermat
+    return p, q, d % (p - 1), d % (q - 1), mod_inverse(q, p)
+
+def decrypt_crt(c, key):
+    """Decifra um bloco com o TCR: duas exponenciações com metade do tamanho em vez de uma com o n inteiro."""
+    p, q, dp, dq, q_inv = key
+    m1 = pow(c, dp, p)
+    m2 = pow(c, dq, q)
+    # Recombinação de Garner: m = m2 + q * (qInv * (m1 - m2) mod p)
+    return m2 + q * (q_inv * (m1 - m2) % p)
+
+def decrypt_ciphertext(ciphertext, d, n, p=None, q=None):
+    """Decifra o texto cifrado usando a chave privada d e módulo n.
+    Se os fatores p e q forem informados, cada bloco é decifrado com o TCR."""
+    key = crt_key(d, p, q) if p is not None and q is not None else None
     decrypted_chars = []
     for num in ciphertext.split():  # Divide os blocos cifrados
        c = int(num)
        if c >= n:
            raise Exception(f"Valor cifrado {c} é maior ou igual a n={n}. Decriptação inválida.")
        # Calcula o valor decifrado usando m = c^d mod n
-       m = pow(c, d, n)
+       m = decrypt_crt(c, key) if key is not None else pow(c, d, n)
        decrypted_char = chr(m)  # Converte o valor decifrado de volta para um caractere
        decrypted_chars.append(decrypted_char)
     decrypted_text = ''.join(decrypted_chars)  # Junta os caracteres decifrados
     return decrypted_text
 
 def main():
+    parser = argparse.ArgumentParser(description="Cifragem e decifragem RSA a partir da chave pública {e, n}.")
+    parser.add_argument("--timeout", type=float, default=FACTOR_TIMEOUT,
+                        help=f"Tempo máximo, em segundos, para encontrar cada fator de n (padrão: {FACTOR_TIMEOUT:g}).")
+    args = parser.parse_args()
     # Entrada: Chave pública {e, n}
     print("=== RSA Cifragem e Decifragem ===")
     try:
@@ -87,7 +103,7 @@ def main():
         return
 
     try:
-        d, p, q = find_private_key(e, n)
+        d, p, q = find_private_key(e, n, args.timeout)
         print(f"\nChave privada encontrada:")
         print(f"d = {d}")
         print(f"p = {p}")
@@ -116,7 +132,7 @@ def main():
                 print("\nDigite o texto cifrado. Insira os números separados por espaço.")
                 ciphertext_input = input("Texto cifrado: ").strip()
                 try:
-                    decrypted_text = decrypt_ciphertext(ciphertext_input, d, n)
+                    decrypted_text = decrypt_ciphertext(ciphertext_input, d, n, p, q)
                     print(f"\nTexto decifrado:\n{decrypted_text}")
                 except Exception as ex:
                     print(f"Erro na decifragem: {ex}")